@@ -0,0 +1,172 @@
+"""
+Virtual waiting room for on-sale spikes
+
+When SEATING_WAITING_ROOM=1, requests to the seat map and best-seat
+endpoints must be admitted first. A visitor without an admitted
+`X-Queue-Token` gets a ticket at the back of the queue and a cheap 503
+(no seat data is touched) with its token, position and a Retry-After
+estimate; retrying with the token lets it in once its ticket number has
+been reached. When nobody is waiting, new visitors are admitted on their
+first request.
+
+Tickets are admitted at `rate` per second. The rate follows the measured
+latency of admitted requests (AIMD): it grows by a fixed step while the
+moving average stays under the target latency and is cut back
+multiplicatively when it goes over, so the seating engine runs near its
+efficient throughput instead of queueing work internally.
+
+Settings (environment):
+    SEATING_WAITING_ROOM      1 to enable (default off)
+    SEATING_ADMIT_RATE        initial admissions per second (default 50)
+    SEATING_TARGET_LATENCY    target booking-path latency in seconds (default 0.25)
+"""
+import math
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from src import metrics
+
+ENABLED = os.environ.get('SEATING_WAITING_ROOM', '0') == '1'
+ADMIT_RATE = float(os.environ.get('SEATING_ADMIT_RATE', '50'))
+TARGET_LATENCY = float(os.environ.get('SEATING_TARGET_LATENCY', '0.25'))
+
+TOKEN_HEADER = 'X-Queue-Token'
+# Last path segment of the endpoints behind the waiting room
+GUARDED_ENDPOINTS = {'seats', 'best-seats'}
+
+MIN_RATE = 1.0
+MAX_RATE = 5000.0
+RATE_STEP = 5.0             # additive increase per adjustment
+RATE_BACKOFF = 0.7          # multiplicative decrease per adjustment
+ADJUST_INTERVAL = 1.0       # seconds between rate adjustments
+LATENCY_SMOOTHING = 0.2     # weight of a new sample in the latency average
+TOKEN_TTL = 600             # seconds a token is remembered after its last use
+MAX_TOKENS = 200000
+MAX_WAITING = 100000        # visitors beyond this are turned away without a ticket
+
+
+class WaitingRoom:
+    """Ticket queue with a latency-driven admission rate"""
+
+    def __init__(self, rate=ADMIT_RATE, target_latency=TARGET_LATENCY, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.target_latency = target_latency
+        self.burst = burst
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()  # token -> (ticket number, last seen), least recent first
+        self.issued = 0              # highest ticket number handed out
+        # Tickets up to this number are admitted; an idle room admits at once
+        self.admitted = float(burst if burst is not None else rate)
+        self.latency = None          # moving average of admitted request latency
+        self.updated = clock()
+        self.adjusted = self.updated
+
+    def _advance(self, now):
+        # Admit tickets at the current rate; allow up to `burst` unused admissions
+        burst = self.burst if self.burst is not None else self.rate
+        self.admitted = min(self.admitted + (now - self.updated) * self.rate, self.issued + burst)
+        self.updated = now
+
+    def _forget_expired(self, now):
+        while self.tokens:
+            token, (_, last_seen) = next(iter(self.tokens.items()))
+            if len(self.tokens) <= MAX_TOKENS and now - last_seen < TOKEN_TTL:
+                break
+            self.tokens.popitem(last=False)
+
+    def enter(self, token=None):
+        """
+        Check a visitor in
+
+        Returns (admitted, token, position). Unknown or missing tokens get a
+        new ticket; the token is None when the queue is full.
+        """
+        with self.lock:
+            now = self.clock()
+            self._advance(now)
+            entry = self.tokens.get(token) if token else None
+            if entry is None:
+                if self.issued - self.admitted >= MAX_WAITING:
+                    return False, None, self.issued - int(self.admitted)
+                self.issued += 1
+                token = secrets.token_urlsafe(16)
+                ticket = self.issued
+            else:
+                ticket = entry[0]
+                self.tokens.move_to_end(token)
+            self.tokens[token] = (ticket, now)
+            self._forget_expired(now)
+            position = max(0, ticket - int(self.admitted))
+            return position == 0, token, position
+
+    def observe(self, seconds):
+        """Record the latency of an admitted request and adjust the rate"""
+        with self.lock:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+            now = self.clock()
+            if now - self.adjusted < ADJUST_INTERVAL:
+                return
+            self._advance(now)
+            self.adjusted = now
+            if self.latency > self.target_latency:
+                self.rate = max(MIN_RATE, self.rate * RATE_BACKOFF)
+            else:
+                self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+
+    def retry_after(self, position):
+        """Seconds until a ticket at `position` should be admitted"""
+        return max(1, math.ceil(position / self.rate))
+
+    def waiting(self):
+        with self.lock:
+            self._advance(self.clock())
+            return max(0, self.issued - int(self.admitted))
+
+
+ROOM = WaitingRoom()
+
+
+def install(blueprint, room=None):
+    """Put the guarded endpoints of `blueprint` behind the waiting room when enabled"""
+    if not ENABLED:
+        return
+    room = room or ROOM
+
+    from flask import g, jsonify, request
+
+    @blueprint.before_request
+    def _check_admission():
+        if request.path.rstrip('/').rsplit('/', 1)[-1] not in GUARDED_ENDPOINTS:
+            return None
+        admitted, token, position = room.enter(request.headers.get(TOKEN_HEADER))
+        if admitted:
+            g.admission_token = token
+            g.admission_started = time.perf_counter()
+            metrics.inc('seating_waiting_room_total', help_text='Waiting room decisions', result='admitted')
+            return None
+
+        retry_after = room.retry_after(position)
+        metrics.inc('seating_waiting_room_total', help_text='Waiting room decisions',
+                    result='queued' if token else 'rejected')
+        response = jsonify({"queued": token is not None, "token": token,
+                            "position": position, "retryAfter": retry_after})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(retry_after)
+        if token:
+            response.headers[TOKEN_HEADER] = token
+        return response
+
+    @blueprint.after_request
+    def _observe_admitted(response):
+        started = g.pop('admission_started', None)
+        if started is not None:
+            room.observe(time.perf_counter() - started)
+            response.headers[TOKEN_HEADER] = g.pop('admission_token')
+        return response
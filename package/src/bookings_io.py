@@ -0,0 +1,269 @@
+"""
+Streaming export and bulk import of bookings
+
+Exports read the showings' journals (src/data/showings/<id>.journal, and
+journals rotated aside when a showing was recreated) one line at a time
+and yield one row per seat that was booked or released, so memory use does
+not grow with the size of the export. Rows of a showing are in time order;
+showings follow each other in id order.
+
+    ts,showing,film,startsAt,event,row,col,seat,type,price,version,idempotencyKey
+
+Imports accept the same rows (NDJSON or CSV; only showing, row and col are
+required, `event`/`status` defaults to booked) and hand them to
+`src.routes.seating.bulk_import`, which applies them through each showing's
+writer in batches.
+
+Usage:
+    python -m src.bookings_io export --format csv --from 2025-06-01 --to 2025-07-01 > june.csv
+    python -m src.bookings_io export --showing default
+    python -m src.bookings_io import june.csv --batch-size 500
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timezone
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.booking_writer import WriterLocked
+from src.models.layout import compile_layout
+from src.models.seat_state import BOOKED, STATUS_CODES, SeatStateError, SeatStateFile
+
+FIELDS = ('ts', 'showing', 'film', 'startsAt', 'event', 'row', 'col', 'seat', 'type', 'price', 'version',
+          'idempotencyKey')
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Events an import row may carry, as the seat status they set
+IMPORT_EVENTS = {'booked': 'booked', 'released': 'available'}
+# Bytes of output collected before a chunk is yielded to the response
+CHUNK_SIZE = 64 * 1024
+# Rows that fail to import are counted; only the first ones are described
+MAX_REPORTED_ERRORS = 100
+
+
+def parse_time(value):
+    """Epoch seconds of an ISO 8601 date or date-time (naive times are UTC)"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def journal_files(showings_dir, showing=None):
+    """Current and rotated journals, grouped by showing id"""
+    if not os.path.isdir(showings_dir):
+        return []
+    files = []
+    for name in os.listdir(showings_dir):
+        showing_id, _, suffix = name.partition('.journal')
+        if not _ or suffix.endswith(('.keys', '.lock')) or '.tmp' in suffix:
+            continue
+        if showing is None or showing_id == showing:
+            # Rotated journals (<id>.journal.<stamp>.<pid>) come before the current one
+            files.append((showing_id, suffix == '', suffix, os.path.join(showings_dir, name)))
+    return [(showing_id, path) for showing_id, _, _, path in sorted(files)]
+
+
+def showing_meta(showings_dir, showing_id):
+    try:
+        with SeatStateFile(os.path.join(showings_dir, f"{showing_id}.seats")) as state:
+            return state.meta
+    except (OSError, SeatStateError):
+        return {}
+
+
+def journal_events(path, showing_id, meta, start=None, end=None):
+    """Booked/released seat events of one journal, oldest first"""
+    layout = None
+    booked = None
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                return  # torn final write
+            op = entry.get("op")
+            if op == 'config':
+                layout = compile_layout(entry["config"], entry["pricing"])
+                booked = bytearray(layout.size)
+                for row, col, status in entry.get("seats", []):
+                    booked[row * layout.columns + col] = STATUS_CODES.get(status) == BOOKED
+                continue
+            if layout is None or op not in ('update', 'reset'):
+                continue
+            ts = entry.get("ts", 0)
+            in_range = (start is None or ts >= start) and (end is None or ts < end)
+            timestamp = datetime.fromtimestamp(ts, timezone.utc).isoformat() if in_range else None
+            if op == 'reset':
+                changes = [(index // layout.columns, index % layout.columns, 'released')
+                           for index in range(layout.size) if booked[index]]
+            else:
+                changes = []
+                for seat in entry["seats"]:
+                    index = seat["row"] * layout.columns + seat["col"]
+                    if STATUS_CODES.get(seat["status"]) == BOOKED:
+                        if not booked[index]:
+                            changes.append((seat["row"], seat["col"], 'booked'))
+                    elif booked[index]:
+                        changes.append((seat["row"], seat["col"], 'released'))
+            for row, col, event in changes:
+                booked[row * layout.columns + col] = event == 'booked'
+                if in_range:
+                    seat = layout.seat(row, col)
+                    yield {
+                        "ts": timestamp,
+                        "showing": showing_id,
+                        "film": meta.get("film", ""),
+                        "startsAt": meta.get("startsAt", ""),
+                        "event": event,
+                        "row": row,
+                        "col": col,
+                        "seat": seat["id"],
+                        "type": seat["type"],
+                        "price": seat["price"],
+                        "version": entry.get("version"),
+                        "idempotencyKey": entry.get("idempotencyKey", "")
+                    }
+
+
+def booking_events(showings_dir, start=None, end=None, showing=None):
+    """Booking events of every showing (or one), in constant memory"""
+    meta_cache = {}
+    for showing_id, path in journal_files(showings_dir, showing):
+        if showing_id not in meta_cache:
+            meta_cache.clear()
+            meta_cache[showing_id] = showing_meta(showings_dir, showing_id)
+        yield from journal_events(path, showing_id, meta_cache[showing_id], start, end)
+
+
+def ndjson_lines(events):
+    """NDJSON text of the events, in chunks of about CHUNK_SIZE"""
+    chunk, size = [], 0
+    for event in events:
+        line = json.dumps(event) + '\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def csv_lines(events):
+    """CSV text of the events with a header row, in chunks of about CHUNK_SIZE"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(FIELDS)
+    for event in events:
+        writer.writerow([event[field] for field in FIELDS])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_lines(events, fmt):
+    return csv_lines(events) if fmt == 'csv' else ndjson_lines(events)
+
+
+class ImportSummary:
+    """Running totals of a bulk import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.conflicts = 0
+        self.failed = 0
+        self.errors = []
+        self.showings = set()
+
+    def error(self, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self):
+        return {
+            "imported": self.imported,
+            "conflicts": self.conflicts,
+            "failed": self.failed,
+            "errors": self.errors,
+            "showings": sorted(self.showings)
+        }
+
+
+def import_rows(lines, fmt, summary):
+    """Parse (showing, row, col, status) tuples from NDJSON or CSV text lines, skipping bad rows"""
+    if fmt == 'csv':
+        records = enumerate(csv.DictReader(lines), start=1)
+    else:
+        records = ((number, line) for number, line in enumerate(lines, start=1) if line.strip())
+    for number, record in records:
+        try:
+            if fmt != 'csv':
+                record = json.loads(record)
+            event = record.get("event") or record.get("status") or 'booked'
+            yield (str(record["showing"]), int(record["row"]), int(record["col"]),
+                   IMPORT_EVENTS.get(event, event))
+        except (KeyError, TypeError, ValueError, AttributeError) as error:
+            summary.error(f"record {number}: {type(error).__name__}: {error}")
+
+
+def detect_format(path):
+    return 'csv' if path.endswith('.csv') else 'ndjson'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or bulk import bookings")
+    parser.add_argument('--data-dir', help="data directory (default: SEATING_DATA_DIR or src/data)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="stream booking events to stdout")
+    export.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+    export.add_argument('--from', dest='start', type=parse_time, help="ISO date-time (inclusive)")
+    export.add_argument('--to', dest='end', type=parse_time, help="ISO date-time (exclusive)")
+    export.add_argument('--showing', help="only this showing")
+
+    load = commands.add_parser('import', help="apply bookings from a file in batches")
+    load.add_argument('file')
+    load.add_argument('--format', choices=sorted(FORMATS), help="default: from the file extension")
+    load.add_argument('--batch-size', type=int, default=500)
+
+    args = parser.parse_args(argv)
+    from src.routes import seating
+    if args.data_dir:
+        seating.configure_storage(args.data_dir)
+
+    if args.command == 'export':
+        for line in export_lines(booking_events(seating.SHOWINGS_DIR, args.start, args.end, args.showing),
+                                 args.format):
+            sys.stdout.write(line)
+        return 0
+
+    summary = ImportSummary()
+    try:
+        with open(args.file, newline='') as f:
+            seating.bulk_import(import_rows(f, args.format or detect_format(args.file), summary), summary,
+                                args.batch_size)
+    except FutureTimeout:
+        print("Timed out waiting for a showing's writer; rows before it were imported", file=sys.stderr)
+        print(json.dumps(summary.to_dict(), indent=2))
+        return 1
+    except WriterLocked as error:
+        # A running service owns the showing; only it can apply the rows
+        print(f"{error}; import through the service instead (POST /api/bookings/import)", file=sys.stderr)
+        return 1
+    finally:
+        seating.close_states()
+    print(json.dumps(summary.to_dict(), indent=2))
+    return 0 if not summary.failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
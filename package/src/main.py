@@ -6,31 +6,64 @@ import json
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.models.seating import SeatingModel
-from src.routes.seating import seating_bp
-
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Register blueprints
-app.register_blueprint(seating_bp, url_prefix='/api')
-
-# Serve static files
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-        return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+def create_app():
+    """Build the Flask app; no seat data is loaded until the first request needs it"""
+    from src import metrics
+    from src.models.user import db
+    from src.routes import seating
+    from src.routes.seating import seating_bp
+    from src.routes.user import user_bp
+
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    # Users and booking history; tables are created by the first request that needs them
+    app.config['SQLALCHEMY_DATABASE_URI'] = (os.environ.get('SEATING_DATABASE_URL') or
+                                             f"sqlite:///{os.path.join(seating.DATA_DIR, 'cinema.db')}")
+    db.init_app(app)
+
+    # Register blueprints (with SEATING_SHARDS=N the API is served by N worker processes)
+    shards = 1
+    if int(os.environ.get('SEATING_SHARDS', '1')) > 1:
+        from src.shard_router import ShardRouter, configured_shards, create_router_blueprint
+        shards = configured_shards()
+    api_bp = create_router_blueprint(ShardRouter(shards)) if shards > 1 else seating_bp
+    app.config['SHARDS'] = shards
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(user_bp, url_prefix='/api')
+    if metrics.ENABLED:
+        from src.routes.metrics import metrics_bp
+        app.register_blueprint(metrics_bp)
+
+    # Built assets (python -m src.static_assets) are served from memory
+    assets = None
+    if os.environ.get('SEATING_STATIC_BUILD', '1') != '0':
+        from src.static_assets import load_assets
+        assets = load_assets(app.static_folder)
+
+    # Serve static files
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if assets is not None:
+            return assets.response(path, request)
+
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+            return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
+
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # The reloader would start a second set of shard workers
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=app.config['SHARDS'] == 1)
@@ -0,0 +1,192 @@
+"""
+Request-level instrumentation for the seating service
+
+Keeps per-endpoint and per-stage timing histograms plus a few counters in
+process memory and renders them in the Prometheus text exposition format.
+
+Metrics are on by default; set SEATING_METRICS=0 to disable them. When
+disabled, `stage()` hands back a shared no-op context manager, counter
+updates return immediately and no request hooks are installed.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+ENABLED = os.environ.get('SEATING_METRICS', '1') != '0'
+
+# Latency buckets in seconds, from 50us up to 5s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_NULL_CONTEXT = nullcontext()
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self.values.get(_label_key(labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        # Copy under the lock: request threads may add a label set mid-scrape
+        with self.lock:
+            values = sorted(self.values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}  # label key -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        series = self.series.get(_label_key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        # Copy under the lock so every series is rendered as of one moment
+        with self.lock:
+            all_series = sorted((key, list(series)) for key, series in self.series.items())
+        for key, series in all_series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of named metrics"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        return self._get_or_create(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(name, lambda: Histogram(name, help_text, buckets))
+
+    def _get_or_create(self, name, factory):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.setdefault(name, factory())
+        return metric
+
+    def render(self):
+        lines = []
+        with self.lock:
+            metrics = sorted(self.metrics.items())
+        for _, metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'seating_request_duration_seconds', 'Time spent handling API requests by endpoint')
+STAGE_SECONDS = REGISTRY.histogram(
+    'seating_stage_duration_seconds', 'Time spent in each stage of request handling')
+
+
+class _StageTimer:
+    """Context manager that records the time spent in one stage"""
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, stage=self.name)
+        return False
+
+
+def stage(name):
+    """Time a block of code as the given stage (e.g. load, search, serialize)"""
+    if not ENABLED:
+        return _NULL_CONTEXT
+    return _StageTimer(name)
+
+
+def inc(name, amount=1, help_text='', **labels):
+    """Increment the counter `name`, creating it on first use"""
+    if not ENABLED:
+        return
+    REGISTRY.counter(name, help_text or name.replace('_', ' ')).inc(amount, **labels)
+
+
+def install(blueprint):
+    """Time every request handled by `blueprint` when metrics are enabled"""
+    if not ENABLED:
+        return
+
+    from flask import g, request
+
+    @blueprint.before_request
+    def _start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @blueprint.after_request
+    def _observe_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                    endpoint=request.endpoint or 'unknown',
+                                    method=request.method,
+                                    status=str(response.status_code))
+        return response
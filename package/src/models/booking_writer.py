@@ -0,0 +1,516 @@
+"""
+Single writer per showing with group commit
+
+All mutations of a showing's seat map go through its ShowingWriter: callers
+submit requests and get a Future back, and one writer thread drains the
+queue, checks and applies every queued request against an in-memory copy
+of the seat map, appends the whole batch to the showing's journal with a
+single write (and fsync), publishes it to the state file with one version
+bump and then resolves the callers' futures. Throughput on a hot showing
+is then bounded by batch size rather than by the number of fsyncs.
+
+The journal uses the replay format (see src/replay.py): a config line when
+the journal is created, then one update/reset line per accepted request,
+tagged with the state version of its batch. On start-up, batches newer than
+the state file are re-applied from the journal checkpoint onwards.
+
+Requests submitted with an idempotency key are journaled with it (rejected
+ones as "rejected" lines) and their outcomes kept in an IdempotencyStore,
+so a retry is answered from the store (see src/models/idempotency.py).
+
+A showing has at most one writer across all processes: the writer holds an
+exclusive flock on <journal>.lock for its lifetime, and a second writer for
+the same showing fails with WriterLocked instead of interleaving its
+batches into the same journal and state file. A state file left mid-write
+by a crashed owner is rolled back and its batch replayed from the journal
+before the next writer reads it.
+
+After each batch the writer publishes an immutable SeatSnapshot of the seat
+map as `published`; readers in the process use it instead of the state file
+and never wait for a write in progress. If the state file's version has
+moved past `published` when a batch starts, the writer reloads the seat map
+from it (and rebuilds its listeners) before validating anything.
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per data directory is assumed
+    fcntl = None
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src import metrics
+from src.models.idempotency import IdempotencyKeyReused, IdempotencyStore, keys_path
+from src.models.seat_state import AVAILABLE, BOOKED, STATUS_CODES, STATUSES, SeatSnapshot, SeatStateError
+
+# fsync the journal after every batch (set SEATING_JOURNAL_FSYNC=0 to skip)
+JOURNAL_FSYNC = os.environ.get('SEATING_JOURNAL_FSYNC', '1') != '0'
+MAX_BATCH = 512
+# Flush the state file and move the journal checkpoint every N batches
+CHECKPOINT_BATCHES = 1000
+
+BATCH_SIZE = metrics.REGISTRY.histogram(
+    'seating_writer_batch_size', 'Requests committed per writer batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+
+
+class BookingConflict(Exception):
+    """Raised when a booking includes seats that are no longer available"""
+
+    def __init__(self, seats):
+        super().__init__("One or more selected seats are not available")
+        self.seats = seats
+
+
+class WriterLocked(Exception):
+    """Raised when another process already owns a showing's writer"""
+
+    def __init__(self, journal_path):
+        super().__init__(f"{journal_path} is locked by another writer process")
+        self.journal_path = journal_path
+
+
+def lock_path(journal_path):
+    return f"{journal_path}.lock"
+
+
+def rotate_journal(journal_path):
+    """Move an existing journal aside so a new state file starts a fresh one"""
+    if os.path.exists(journal_path):
+        os.replace(journal_path, f"{journal_path}.{time.strftime('%Y%m%d%H%M%S')}.{os.getpid()}")
+    # Remembered idempotency keys belong to the old journal
+    if os.path.exists(keys_path(journal_path)):
+        os.remove(keys_path(journal_path))
+
+
+def isolated(item):
+    """Whether a queued item must be committed in a batch of its own"""
+    return item[0] == 'reset' and item[1] is not None
+
+
+def request_key(updates):
+    """Comparable, JSON-serializable form of a request's updates"""
+    return [[row, col, status] for row, col, status in updates]
+
+
+class ShowingWriter:
+    """Owns all writes to one showing's seat state"""
+
+    def __init__(self, state, journal_path, fsync=JOURNAL_FSYNC, max_batch=MAX_BATCH):
+        self.state = state
+        self.journal_path = journal_path
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.batches_since_checkpoint = 0
+        # Called with (changes, statuses) after each commit; changes is a list of
+        # (index, code), or None when every seat was rewritten (see SeatHeap.apply)
+        self.listeners = []
+        # Name -> callable returning immutable derived state (e.g. the blocked
+        # seats of a hall with distancing), captured into every published snapshot
+        self.views = {}
+        self.idempotency = IdempotencyStore()
+
+        self._lock = self._acquire_lock()
+        try:
+            self._recover()
+            self.journal = open(journal_path, 'ab')
+        except BaseException:
+            self._lock.close()
+            raise
+        if self.journal.tell() == 0:
+            self._write_journal([{
+                "op": "config",
+                "showing": state.name,
+                "config": state.layout.config,
+                "pricing": state.layout.pricing,
+                "seats": [[index // state.layout.columns, index % state.layout.columns, STATUSES[code]]
+                          for index, code in enumerate(state.snapshot()[1]) if code != AVAILABLE],
+                "layoutHash": state.layout.hash,
+                "version": state.version,
+                "ts": time.time()
+            }])
+            state.set_checkpoint(self.journal.tell())
+        self.published = SeatSnapshot(*state.snapshot())
+
+        self.thread = threading.Thread(target=self._run, name=f"writer-{state.name}", daemon=True)
+        self.thread.start()
+
+    # Caller side
+
+    def submit(self, updates, key=None):
+        """
+        Queue (row, col, status) updates to be applied atomically; returns a Future
+
+        With an idempotency key, a request whose outcome is already known is
+        answered at once with that outcome instead of being queued.
+        """
+        updates = list(updates)
+        future = Future()
+        if key is not None:
+            try:
+                outcome = self.idempotency.get(key, request_key(updates))
+            except IdempotencyKeyReused as error:
+                future.set_exception(error)
+                return future
+            if outcome is not None:
+                metrics.inc('seating_idempotent_replays_total', help_text='Requests answered from a stored outcome')
+                self._resolve(future, outcome)
+                return future
+        self.queue.put(('update', updates, future, key))
+        return future
+
+    def republish(self):
+        """Publish the current statuses again, e.g. after adding a view; only before the writer is shared"""
+        self._publish(self.published.version, self.published.statuses)
+
+    def add_listener(self, listener):
+        """
+        Queue adding a listener (e.g. one removed for a bulk import); returns a Future
+
+        The writer thread first calls it with (None, statuses) of its latest
+        batch, so no batch can slip between catching up and following along.
+        """
+        future = Future()
+        self.queue.put(('listen', listener, future, None))
+        return future
+
+    def reset(self, before=None):
+        """
+        Queue a reset of every seat to available; returns a Future
+
+        `before` is called in the writer thread with the published snapshot
+        the reset clears, before the reset is committed (e.g. to archive its
+        bookings); if it raises, the reset is not applied.
+        """
+        future = Future()
+        self.queue.put(('reset', before, future, None))
+        return future
+
+    def close(self):
+        """Commit everything queued so far, checkpoint and stop the writer thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self._checkpoint()
+        self.journal.close()
+        # Closing the lock file releases the flock for the next owner
+        self._lock.close()
+
+    def _acquire_lock(self):
+        """Take the showing's writer lock, or raise WriterLocked if another process holds it"""
+        lock = open(lock_path(self.journal_path), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                raise WriterLocked(self.journal_path)
+        return lock
+
+    # Writer thread
+
+    def _run(self):
+        carried = None
+        while True:
+            if carried is not None:
+                item, carried = carried, None
+            else:
+                item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            # A reset with a hook is a batch of its own, so the hook sees exactly the state it clears
+            while len(batch) < self.max_batch and not isolated(item):
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if isolated(item):
+                    carried = item
+                    break
+                batch.append(item)
+            try:
+                self._commit([item for item in batch if item[0] != 'listen'])
+            except Exception as error:
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            for kind, listener, future, _ in batch:
+                if kind == 'listen' and not future.done():
+                    self._attach(listener, future)
+            if stop:
+                return
+
+    def _attach(self, listener, future):
+        """Bring a listener up to the published seat map and start calling it after each batch"""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            listener(None, bytearray(self.published.statuses))
+        except Exception as error:
+            future.set_exception(error)
+            return
+        if listener not in self.listeners:
+            self.listeners = self.listeners + [listener]
+        future.set_result(self.published.version)
+
+    def _validate(self, updates, working):
+        """Turn one request into (index, code) writes, or raise"""
+        layout = self.state.layout
+        writes = []
+        conflicts = []
+        for row, col, status in updates:
+            if not (isinstance(row, int) and isinstance(col, int)
+                    and 0 <= row < layout.rows and 0 <= col < layout.columns):
+                raise SeatStateError(f"seat ({row}, {col}) out of range")
+            code = STATUS_CODES.get(status)
+            if code is None:
+                raise SeatStateError(f"unknown seat status {status!r}")
+            index = row * layout.columns + col
+            # Bookings only succeed on seats that are still available
+            if code == BOOKED and working[index] != AVAILABLE:
+                conflicts.append({"row": row, "col": col})
+            writes.append((index, code))
+        if any(layout.buffer) and not conflicts:
+            # Distancing: a booked seat outside this request must not be within a new seat's buffer
+            booking = {index for index, code in writes if code == BOOKED}
+            for index in sorted(booking):
+                if any(working[other] == BOOKED and other not in booking for other in layout.buffer_zone(index)):
+                    conflicts.append({"row": index // layout.columns, "col": index % layout.columns})
+        if conflicts:
+            raise BookingConflict(conflicts)
+        return writes
+
+    @staticmethod
+    def _resolve(future, outcome):
+        """Settle a future with a stored outcome"""
+        if "version" in outcome:
+            future.set_result(outcome["version"])
+        elif "conflicts" in outcome:
+            future.set_exception(BookingConflict(outcome["conflicts"]))
+        else:
+            future.set_exception(SeatStateError(outcome["error"]))
+
+    def _reload(self):
+        """Catch up with a state file that moved on without this writer (e.g. written by an earlier owner)"""
+        version, statuses = self.state.snapshot()
+        working = bytearray(statuses)
+        for listener in self.listeners:
+            listener(None, working)
+        self._publish(version, working)
+        metrics.inc('seating_writer_reloads_total', help_text='Writer seat maps reloaded from the state file')
+
+    def _commit(self, batch):
+        if self.state.version != self.published.version:
+            self._reload()
+        with metrics.stage('commit'):
+            # The last published snapshot is the state file as of the last batch
+            working = bytearray(self.published.statuses)
+            accepted = []
+            rejected = []
+            # Keyed requests of this batch: key -> (request, outcome); the outcome
+            # of an accepted request is its batch version, known after the write
+            keyed = {}
+            duplicates = []
+            changes = {}
+            full_rewrite = False
+            seats_booked = 0
+
+            # Apply every request in order against the in-memory copy
+            for kind, updates, future, key in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if kind == 'reset':
+                    if updates is not None:
+                        try:
+                            updates(self.published)
+                        except Exception as error:
+                            future.set_exception(error)
+                            continue
+                    working[:] = bytes(len(working))
+                    full_rewrite = True
+                    accepted.append((future, {"op": "reset"}))
+                    continue
+                seats = [{"row": row, "col": col, "status": status} for row, col, status in updates]
+                if key is not None:
+                    request = request_key(updates)
+                    try:
+                        if key in keyed:
+                            if keyed[key][0] != request:
+                                raise IdempotencyKeyReused(key)
+                            # Retry of a request earlier in this batch
+                            duplicates.append((future, key))
+                            continue
+                        outcome = self.idempotency.get(key, request)
+                    except IdempotencyKeyReused as error:
+                        future.set_exception(error)
+                        continue
+                    if outcome is not None:
+                        metrics.inc('seating_idempotent_replays_total', help_text='Requests answered from a stored outcome')
+                        self._resolve(future, outcome)
+                        continue
+                try:
+                    writes = self._validate(updates, working)
+                except BookingConflict as conflict:
+                    metrics.inc('seating_booking_conflicts_total', help_text='Booking requests rejected with conflicts')
+                    future.set_exception(conflict)
+                    if key is not None:
+                        keyed[key] = (request, {"conflicts": conflict.seats})
+                        rejected.append({"op": "rejected", "idempotencyKey": key, "seats": seats,
+                                         "conflicts": conflict.seats})
+                    continue
+                except SeatStateError as error:
+                    future.set_exception(error)
+                    if key is not None:
+                        keyed[key] = (request, {"error": str(error)})
+                        rejected.append({"op": "rejected", "idempotencyKey": key, "seats": seats,
+                                         "error": str(error)})
+                    continue
+                for index, code in writes:
+                    if code == BOOKED and working[index] != BOOKED:
+                        seats_booked += 1
+                    working[index] = code
+                    changes[index] = code
+                entry = {"op": "update", "seats": seats}
+                if key is not None:
+                    keyed[key] = (request, None)
+                    entry["idempotencyKey"] = key
+                accepted.append((future, entry))
+
+            if not accepted and not rejected:
+                return
+
+            # Write-ahead: one journal write for the whole batch. Rejections
+            # don't change the seats, so a batch of only those keeps its version
+            version = self.state.version + 2 if accepted else self.state.version
+            ts = time.time()
+            try:
+                self._write_journal([dict(entry, showing=self.state.name, version=version, ts=ts)
+                                     for entry in [entry for _, entry in accepted] + rejected])
+            except OSError as error:
+                for future, _ in accepted:
+                    future.set_exception(error)
+                for future, _ in duplicates:
+                    future.set_exception(error)
+                return
+
+            # Publish with a single version bump
+            if full_rewrite:
+                self.state.write_all(working)
+            elif accepted:
+                self.state.write_codes(sorted(changes.items()))
+
+            for key, (request, outcome) in keyed.items():
+                keyed[key] = (request, outcome or {"version": version})
+                self.idempotency.put(key, request, keyed[key][1], ts)
+
+        try:
+            if accepted:
+                for listener in self.listeners:
+                    listener(None if full_rewrite else sorted(changes.items()), working)
+        finally:
+            if accepted:
+                # Readers switch to the whole batch at once, before its callers are answered
+                self._publish(version, working)
+                BATCH_SIZE.observe(len(accepted))
+                metrics.inc('seating_seats_booked_total', seats_booked, help_text='Seats booked')
+            for future, _ in accepted:
+                future.set_result(version)
+            for future, key in duplicates:
+                metrics.inc('seating_idempotent_replays_total', help_text='Requests answered from a stored outcome')
+                self._resolve(future, keyed[key][1])
+
+        self.batches_since_checkpoint += 1
+        if self.batches_since_checkpoint >= CHECKPOINT_BATCHES:
+            self._checkpoint()
+
+    def _publish(self, version, statuses):
+        self.published = SeatSnapshot(version, statuses, {name: view() for name, view in self.views.items()})
+
+    def _write_journal(self, entries):
+        self.journal.write(''.join(json.dumps(entry) + '\n' for entry in entries).encode())
+        self.journal.flush()
+        if self.fsync:
+            os.fsync(self.journal.fileno())
+
+    def _checkpoint(self):
+        offset = self.journal.tell()
+        # Save the keys first: a checkpoint past the saved keys would hide keyed entries
+        self.idempotency.save(keys_path(self.journal_path), offset)
+        self.state.set_checkpoint(offset)
+        self.batches_since_checkpoint = 0
+
+    # Recovery
+
+    def _recover(self):
+        """Re-apply journaled batches that are newer than the state file and reload idempotency keys"""
+        # A previous owner died mid-write: its batch is journaled (write-ahead), so
+        # go back to the last committed version and replay from there
+        if self.state.repair_torn_write():
+            metrics.inc('seating_torn_writes_repaired_total', help_text='Interrupted state file writes rolled back')
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            first = f.readline()
+            try:
+                header = json.loads(first)
+            except ValueError:
+                header = {}
+            if header.get("layoutHash") != self.state.layout.hash:
+                # Journal belongs to an older layout of this showing
+                f.close()
+                rotate_journal(self.journal_path)
+                return
+
+            # Keys saved at the last checkpoint cover the journal up to their offset
+            keys_offset = self.idempotency.load(keys_path(self.journal_path))
+            f.seek(max(min(self.state.checkpoint, keys_offset), len(first)))
+            statuses = None
+            version = self.state.version
+            torn_at = None
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    torn_at = offset  # torn final write from a crash
+                    break
+                key = entry.get("idempotencyKey")
+                if key is not None:
+                    outcome = ({"version": entry["version"]} if entry["op"] == 'update' else
+                               {name: entry[name] for name in ("conflicts", "error") if name in entry})
+                    self.idempotency.put(key, request_key((seat["row"], seat["col"], seat["status"])
+                                                          for seat in entry["seats"]), outcome, entry.get("ts"))
+                if entry.get("version", 0) <= self.state.version:
+                    continue
+                if statuses is None:
+                    statuses = bytearray(self.state.snapshot()[1])
+                if entry["op"] == 'reset':
+                    statuses[:] = bytes(len(statuses))
+                elif entry["op"] == 'update':
+                    for seat in entry["seats"]:
+                        statuses[seat["row"] * self.state.layout.columns + seat["col"]] = STATUS_CODES[seat["status"]]
+                version = entry["version"]
+
+        if torn_at is not None:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(torn_at)
+        if statuses is not None:
+            self.state.restore(version, statuses)
+            metrics.inc('seating_journal_recoveries_total', help_text='State files repaired from the journal')
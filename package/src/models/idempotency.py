@@ -0,0 +1,104 @@
+"""
+Idempotency keys for booking and hold requests
+
+Clients that retry `POST /api/seats` after a timeout send the same
+`Idempotency-Key` header with every attempt. The showing's writer remembers
+the outcome of each keyed request (the committed state version, or the
+conflicts/error it was rejected with) in an IdempotencyStore, and a retry
+gets that outcome back without being validated or applied again.
+
+The store is bounded (least recently stored keys are evicted first) and
+entries expire after IDEMPOTENCY_TTL seconds. It is persisted alongside the
+showing's journal: keyed requests are journaled with their key, and every
+journal checkpoint also writes the store to `<journal>.keys` together with
+the journal offset it covers, so start-up only has to scan the journal tail.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds an outcome is remembered, and keys remembered per showing
+IDEMPOTENCY_TTL = 24 * 60 * 60
+MAX_KEYS = 10000
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when a key is sent again with a different request"""
+
+    def __init__(self, key):
+        super().__init__(f"Idempotency key {key!r} was already used for a different request")
+        self.key = key
+
+
+def keys_path(journal_path):
+    return f"{journal_path}.keys"
+
+
+class IdempotencyStore:
+    """Outcomes of keyed requests, bounded and TTL-evicted"""
+
+    def __init__(self, max_keys=MAX_KEYS, ttl=IDEMPOTENCY_TTL, clock=time.time):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (stored at, request, outcome), oldest first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, request):
+        """Stored outcome for a key, or None; raises if the request differs"""
+        with self.lock:
+            self._expire()
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] != request:
+            raise IdempotencyKeyReused(key)
+        return entry[2]
+
+    def put(self, key, request, outcome, stored_at=None):
+        stored_at = self.clock() if stored_at is None else stored_at
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (stored_at, request, outcome)
+            while len(self.entries) > self.max_keys:
+                self.entries.popitem(last=False)
+            self._expire()
+
+    def _expire(self):
+        deadline = self.clock() - self.ttl
+        while self.entries:
+            key, (stored_at, _, _) = next(iter(self.entries.items()))
+            if stored_at >= deadline:
+                break
+            del self.entries[key]
+
+    # Persistence
+
+    def save(self, path, offset):
+        """Write the store and the journal offset it covers (atomic replace)"""
+        with self.lock:
+            self._expire()
+            entries = [[key, stored_at, request, outcome]
+                       for key, (stored_at, request, outcome) in self.entries.items()]
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({"offset": offset, "entries": entries}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Load a saved store; returns the journal offset it covers (0 if none)"""
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        for key, stored_at, request, outcome in saved.get("entries", []):
+            self.put(key, request, outcome, stored_at)
+        return saved.get("offset", 0)
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src import metrics
+
+# Default hall: 15 rows (A-O) of 12 seats with an aisle after seat 6
+DEFAULT_CONFIG = {
+    "rows": 15,
+    "columns": 12,
+    "rowLabels": ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O'],
+    "vipRows": [9, 10, 11],  # J, K, L (0-indexed)
+    "vipColumns": [2, 3, 4, 5, 6, 7, 8, 9],  # 3-10 (0-indexed)
+    "accessibleSeats": [
+        {"row": 5, "col": 0}, {"row": 5, "col": 1},  # F1, F2
+        {"row": 5, "col": 10}, {"row": 5, "col": 11}  # F11, F12
+    ],
+    "discountRows": [0, 1],  # A, B (0-indexed)
+    "aisleAfterColumn": 5  # Aisle after column 6 (0-indexed)
+}
+
+DEFAULT_PRICING = {
+    "normal": 10.00,
+    "vip": 15.00,
+    "accessible": 10.00,
+    "discount": 7.50
+}
+
+# Seat type codes (index = code)
+SEAT_TYPES = ('normal', 'vip', 'accessible')
+TYPE_NORMAL, TYPE_VIP, TYPE_ACCESSIBLE = range(len(SEAT_TYPES))
+
+# Price class codes (index = code)
+PRICE_CLASSES = ('normal', 'vip', 'accessible', 'discount')
+PRICE_NORMAL, PRICE_VIP, PRICE_ACCESSIBLE, PRICE_DISCOUNT = range(len(PRICE_CLASSES))
+
+# Number of compiled layouts kept in memory
+LAYOUT_CACHE_SIZE = 128
+
+
+def row_label(index):
+    """Spreadsheet-style row label: A..Z, AA, AB, ..."""
+    label = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+
+def hall_config(rows, columns):
+    """Seating configuration of a rows x columns hall, scaled from the default 15x12 one"""
+    vip_start = rows * 3 // 5
+    accessible_row = rows // 3
+    return {
+        "rows": rows,
+        "columns": columns,
+        "rowLabels": [row_label(i) for i in range(rows)],
+        "vipRows": list(range(vip_start, max(vip_start + 1, rows * 4 // 5))),
+        "vipColumns": list(range(columns // 6, columns - columns // 6)),
+        "accessibleSeats": [
+            {"row": accessible_row, "col": 0}, {"row": accessible_row, "col": 1},
+            {"row": accessible_row, "col": columns - 2}, {"row": accessible_row, "col": columns - 1}
+        ],
+        "discountRows": [0, 1],
+        "aisleAfterColumn": columns // 2 - 1
+    }
+
+
+def layout_hash(config, pricing):
+    """Stable content hash of a configuration and its pricing"""
+    canonical = json.dumps({"config": config, "pricing": pricing}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class Layout:
+    """
+    Immutable compiled form of a seating configuration
+
+    Seat attributes are stored row-major (index = row * columns + col) as
+    byte strings of type and price-class codes, so deciding a seat's type is
+    an index lookup instead of a scan over the configuration. Layouts are
+    hashable and shared between every showing and request using the same
+    configuration.
+    """
+    __slots__ = ('hash', 'config', 'pricing', 'rows', 'columns', 'row_labels', 'aisle_after',
+                 'type_codes', 'price_codes', 'seat_ids', 'segments', 'prices',
+                 'vip_rows', 'accessible_rows', 'discount_rows', 'buffer')
+
+    def __init__(self, config, pricing, hash_value):
+        rows, columns = config["rows"], config["columns"]
+        set_attr = object.__setattr__
+        set_attr(self, 'hash', hash_value)
+        set_attr(self, 'config', config)
+        set_attr(self, 'pricing', pricing)
+        set_attr(self, 'rows', rows)
+        set_attr(self, 'columns', columns)
+
+        labels = list(config.get("rowLabels") or [])
+        labels += [row_label(i) for i in range(len(labels), rows)]
+        set_attr(self, 'row_labels', tuple(labels[:rows]))
+
+        # Seat types: VIP block first, accessible seats override it
+        type_codes = bytearray(rows * columns)
+        vip_columns = [j for j in config.get("vipColumns", []) if 0 <= j < columns]
+        vip_rows = frozenset(i for i in config.get("vipRows", []) if 0 <= i < rows)
+        for i in vip_rows:
+            for j in vip_columns:
+                type_codes[i * columns + j] = TYPE_VIP
+        accessible_rows = set()
+        for seat in config.get("accessibleSeats", []):
+            i, j = seat["row"], seat["col"]
+            if 0 <= i < rows and 0 <= j < columns:
+                type_codes[i * columns + j] = TYPE_ACCESSIBLE
+                accessible_rows.add(i)
+
+        # Price classes: discount applies to normal seats in discount rows
+        discount_rows = frozenset(i for i in config.get("discountRows", []) if 0 <= i < rows)
+        price_codes = bytearray(type_codes)
+        for i in discount_rows:
+            for index in range(i * columns, (i + 1) * columns):
+                if type_codes[index] == TYPE_NORMAL:
+                    price_codes[index] = PRICE_DISCOUNT
+
+        # Aisle splits every row into seat segments [start, end)
+        aisle_after = config.get("aisleAfterColumn")
+        if aisle_after is not None and 0 <= aisle_after < columns - 1:
+            segments = ((0, aisle_after + 1), (aisle_after + 1, columns))
+        else:
+            segments = ((0, columns),)
+
+        # Distancing: seats left empty beside (and optionally in front of and
+        # behind) every booked seat, as (seats sideways, rows front/back)
+        buffer = config.get("buffer") or {}
+        set_attr(self, 'buffer', (max(0, int(buffer.get("seats", 0))), max(0, int(buffer.get("rows", 0)))))
+
+        set_attr(self, 'aisle_after', aisle_after)
+        set_attr(self, 'type_codes', bytes(type_codes))
+        set_attr(self, 'price_codes', bytes(price_codes))
+        set_attr(self, 'seat_ids', tuple(f"{labels[i]}{j + 1}" for i in range(rows) for j in range(columns)))
+        set_attr(self, 'segments', segments)
+        set_attr(self, 'prices', tuple(pricing.get(name, pricing.get("normal", 0.0)) for name in PRICE_CLASSES))
+        set_attr(self, 'vip_rows', vip_rows)
+        set_attr(self, 'accessible_rows', frozenset(accessible_rows))
+        set_attr(self, 'discount_rows', discount_rows)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Layout objects are immutable")
+
+    def __hash__(self):
+        return hash(self.hash)
+
+    def __eq__(self, other):
+        return isinstance(other, Layout) and other.hash == self.hash
+
+    def __repr__(self):
+        return f'<Layout {self.rows}x{self.columns} {self.hash[:12]}>'
+
+    @property
+    def size(self):
+        return self.rows * self.columns
+
+    def index(self, row, col):
+        return row * self.columns + col
+
+    def seat_type(self, row, col):
+        return SEAT_TYPES[self.type_codes[row * self.columns + col]]
+
+    def price(self, row, col):
+        return self.prices[self.price_codes[row * self.columns + col]]
+
+    def buffer_zone(self, index):
+        """Indices of the seats a booking of seat `index` keeps empty (empty without a buffer)"""
+        seats, rows = self.buffer
+        row, col = divmod(index, self.columns)
+        # Buffers don't reach across an aisle
+        start, end = next((start, end) for start, end in self.segments if start <= col < end)
+        base = row * self.columns
+        zone = [base + j for j in range(max(start, col - seats), min(end, col + seats + 1)) if j != col]
+        zone += [i * self.columns + col for i in range(max(0, row - rows), min(self.rows, row + rows + 1)) if i != row]
+        return zone
+
+    def seat(self, row, col, status="available"):
+        """One seat object, as served by the API"""
+        index = row * self.columns + col
+        return {
+            "id": self.seat_ids[index],
+            "row": row,
+            "col": col,
+            "type": SEAT_TYPES[self.type_codes[index]],
+            "status": status,
+            "isDiscount": row in self.discount_rows,
+            "price": self.prices[self.price_codes[index]]
+        }
+
+    def build_seats(self):
+        """Create a fresh, all-available grid of seat objects"""
+        columns = self.columns
+        type_codes, price_codes, prices, seat_ids = self.type_codes, self.price_codes, self.prices, self.seat_ids
+        seats = []
+        for i in range(self.rows):
+            is_discount = i in self.discount_rows
+            base = i * columns
+            seats.append([{
+                "id": seat_ids[base + j],
+                "row": i,
+                "col": j,
+                "type": SEAT_TYPES[type_codes[base + j]],
+                "status": "available",
+                "isDiscount": is_discount,
+                "price": prices[price_codes[base + j]]
+            } for j in range(columns)])
+        return seats
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_layout(config, pricing=None):
+    """Return the shared compiled layout for a configuration"""
+    pricing = DEFAULT_PRICING if pricing is None else pricing
+    key = layout_hash(config, pricing)
+    with _cache_lock:
+        layout = _cache.get(key)
+        if layout is not None:
+            _cache.move_to_end(key)
+    if layout is not None:
+        metrics.inc('seating_layout_cache_total', help_text='Layout cache lookups by result', result='hit')
+        return layout
+
+    metrics.inc('seating_layout_cache_total', help_text='Layout cache lookups by result', result='miss')
+    # Compile from private copies so later edits to the caller's dicts can't leak in
+    layout = Layout(json.loads(json.dumps(config)), dict(pricing), key)
+    with _cache_lock:
+        layout = _cache.setdefault(key, layout)
+        while len(_cache) > LAYOUT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return layout
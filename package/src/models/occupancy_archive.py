@@ -0,0 +1,259 @@
+"""
+Columnar archive of finished showings
+
+When a showing is archived (explicitly, or by an admin reset that would
+otherwise throw its bookings away) its final seat statuses and the time
+each booked seat sold are appended to the archive of its layout:
+
+    archive/<layout hash>/layout.json       config and pricing
+    archive/<layout hash>/showings.ndjson   one record per archived showing, with its row
+    archive/<layout hash>/statuses.u8       uint8   (rows, seats)
+    archive/<layout hash>/sold_after.f32    float32 (rows, seats)
+
+`sold_after` is the number of seconds between the showing's sales opening
+(its journal being created) and the seat's final booking, NaN for seats
+that did not sell or whose booking time is unknown (e.g. seeded seat maps).
+Keeping one array per column and per layout lets every aggregation below
+run as a handful of numpy operations over all archived showings at once.
+Archiving only appends a row to each column and a line to the index, so its
+cost doesn't grow with the archive. Rows the index doesn't name (left by an
+interrupted archive) are never read.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: archiving is only serialized within the process
+    fcntl = None
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.models.layout import compile_layout
+from src.models.seat_state import BOOKED, DISABLED, STATUS_CODES
+
+_archive_lock = threading.Lock()
+
+# Column files of a layout's archive and their dtypes, one row of seats per archived showing
+COLUMNS = (('statuses.u8', np.uint8), ('sold_after.f32', np.float32))
+
+
+def booking_times(journal_path, layout):
+    """
+    Sales opening time and per-seat time of the last booking from a journal
+
+    Replays the journal's update/reset entries so released and re-booked
+    seats carry the time of their latest booking.
+    """
+    opened = None
+    times = np.full(layout.size, np.nan)
+    booked = np.zeros(layout.size, dtype=bool)
+    if not os.path.exists(journal_path):
+        return opened, times
+    with open(journal_path, 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # torn final write
+            op = entry.get("op")
+            ts = entry.get("ts")
+            if op == 'config':
+                opened = ts
+            elif op == 'reset':
+                times[:] = np.nan
+                booked[:] = False
+            elif op == 'update':
+                for seat in entry["seats"]:
+                    index = seat["row"] * layout.columns + seat["col"]
+                    if STATUS_CODES.get(seat["status"]) == BOOKED:
+                        if not booked[index]:
+                            times[index] = ts
+                            booked[index] = True
+                    else:
+                        times[index] = np.nan
+                        booked[index] = False
+    return opened, times
+
+
+class OccupancyArchive:
+    """Archived showings grouped by layout, stored as append-only numpy columns"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def layout_dir(self, layout_hash):
+        return os.path.join(self.directory, layout_hash)
+
+    def layouts(self):
+        """Summaries of every archived layout"""
+        summaries = []
+        if not os.path.isdir(self.directory):
+            return summaries
+        for layout_hash in sorted(os.listdir(self.directory)):
+            try:
+                layout, showings = self._index(layout_hash)
+            except (OSError, ValueError):
+                continue
+            summaries.append({"layoutHash": layout_hash, "rows": layout.rows,
+                              "columns": layout.columns, "showings": len(showings)})
+        return summaries
+
+    def archive(self, showing_id, state, journal_path, clock=time.time, statuses=None):
+        """
+        Append a showing's final statuses and booking times; returns its record
+
+        `statuses` are the committed statuses to archive (by default a
+        snapshot of the state file).
+        """
+        layout = state.layout
+        if statuses is None:
+            _, statuses = state.snapshot()
+        statuses = np.frombuffer(bytes(statuses), dtype=np.uint8)
+        opened, times = booking_times(journal_path, layout)
+        sold_after = np.where(statuses == BOOKED, times - opened if opened is not None else np.nan, np.nan)
+        record = {"showing": showing_id, **state.meta, "archivedAt": clock(), "salesOpenedAt": opened,
+                  "booked": int((statuses == BOOKED).sum())}
+
+        directory = self.layout_dir(layout.hash)
+        os.makedirs(directory, exist_ok=True)
+        with _archive_lock, open(os.path.join(directory, '.lock'), 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            layout_path = os.path.join(directory, 'layout.json')
+            if not os.path.exists(layout_path):
+                tmp_path = f"{layout_path}.tmp{os.getpid()}"
+                with open(tmp_path, 'w') as f:
+                    json.dump({"config": layout.config, "pricing": layout.pricing}, f)
+                os.replace(tmp_path, layout_path)
+            # Rows every column holds completely; a row cut short by a crash is overwritten
+            paths = [os.path.join(directory, name) for name, _ in COLUMNS]
+            row_sizes = [layout.size * np.dtype(dtype).itemsize for _, dtype in COLUMNS]
+            row = min(os.path.getsize(path) // size if os.path.exists(path) else 0
+                      for path, size in zip(paths, row_sizes))
+            for path, size, (_, dtype), values in zip(paths, row_sizes, COLUMNS, (statuses, sold_after)):
+                with open(path, 'ab') as f:
+                    f.truncate(row * size)
+                    f.write(values.astype(dtype).tobytes())
+            # Columns first: the index never lists a row the columns don't have
+            with open(os.path.join(directory, 'showings.ndjson'), 'a') as f:
+                f.write(json.dumps(dict(record, row=row)) + '\n')
+        return record
+
+    def load(self, layout_hash, film=None):
+        """(layout, showing records, statuses, sold_after) for one layout, optionally one film"""
+        layout, showings = self._index(layout_hash)
+        if film is not None:
+            showings = [record for record in showings
+                        if str(record.get("film", "")).casefold() == film.casefold()]
+        rows = [record.pop("row") for record in showings]
+        statuses, sold_after = (column[rows] for column in self._columns(layout_hash, layout))
+        return layout, showings, statuses, sold_after
+
+    def _index(self, layout_hash):
+        directory = self.layout_dir(layout_hash)
+        with open(os.path.join(directory, 'layout.json')) as f:
+            description = json.load(f)
+        showings = []
+        with open(os.path.join(directory, 'showings.ndjson')) as f:
+            for line in f:
+                try:
+                    showings.append(json.loads(line))
+                except ValueError:
+                    break  # torn final write
+        return compile_layout(description["config"], description["pricing"]), showings
+
+    def _columns(self, layout_hash, layout):
+        """Every archived row of each column, memory-mapped as (rows, seats)"""
+        columns = []
+        for name, dtype in COLUMNS:
+            path = os.path.join(self.layout_dir(layout_hash), name)
+            rows = os.path.getsize(path) // (layout.size * np.dtype(dtype).itemsize)
+            columns.append(np.memmap(path, dtype=dtype, mode='r', shape=(rows, layout.size)) if rows
+                           else np.empty((0, layout.size), dtype=dtype))
+        return columns
+
+
+# Aggregations over (showings, seats) arrays
+
+def _grid(values, layout):
+    """Per-seat values as rows of JSON numbers (None for NaN)"""
+    grid = np.asarray(values, dtype=np.float64).reshape(layout.rows, layout.columns)
+    return [[None if np.isnan(value) else round(value, 4) for value in row] for row in grid.tolist()]
+
+
+def heatmap(layout, statuses):
+    """Fraction of showings in which each seat sold (None where it was never sellable)"""
+    sellable = (statuses != DISABLED).sum(axis=0)
+    sold = (statuses == BOOKED).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(sellable > 0, sold / sellable, np.nan)
+    return _grid(fraction, layout)
+
+
+def sell_through(layout, sold_after, first=10):
+    """
+    How early each seat sells: its mean position in the sale order (0 = first
+    seat sold, 1 = last) and its median seconds to sell, plus the seats that
+    sell first on average
+    """
+    known = ~np.isnan(sold_after)
+    order = np.argsort(np.where(known, sold_after, np.inf), axis=1)
+    ranks = np.empty(order.shape, dtype=np.float32)
+    np.put_along_axis(ranks, order, np.arange(order.shape[1], dtype=np.float32)[None, :], axis=1)
+    sold_count = known.sum(axis=1, keepdims=True)
+    positions = np.where(known, ranks / np.maximum(sold_count - 1, 1), 0)
+
+    counts = known.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_position = np.where(counts > 0, positions.sum(axis=0) / counts, np.nan)
+    # Median of the known times per seat: NaNs sort last, so it sits in the first counts[seat] rows
+    ordered = np.sort(sold_after, axis=0)
+    low = np.take_along_axis(ordered, np.maximum(counts - 1, 0)[None, :] // 2, axis=0)[0] if len(ordered) else 0
+    high = np.take_along_axis(ordered, (counts // 2)[None, :], axis=0)[0] if len(ordered) else 0
+    median_seconds = np.where(counts > 0, (low + high) / 2, np.nan)
+
+    ranked = [int(index) for index in np.argsort(np.where(np.isnan(mean_position), np.inf, mean_position),
+                                                 kind='stable')[:first] if not np.isnan(mean_position[index])]
+    return {
+        "meanSalePosition": _grid(mean_position, layout),
+        "medianSecondsToSell": _grid(median_seconds, layout),
+        "firstToSell": [layout.seat(index // layout.columns, index % layout.columns)["id"] for index in ranked]
+    }
+
+
+def fill_curve(statuses, sold_after, bucket_seconds, buckets):
+    """
+    Share of sellable seats sold by the end of each time bucket after sales
+    opened (mean and median over showings), and time to sellout
+
+    Booked seats with an unknown booking time count as sold at opening.
+    """
+    count = len(statuses)
+    sellable = (statuses != DISABLED).sum(axis=1)
+    booked = statuses == BOOKED
+    offsets = np.where(booked, np.nan_to_num(sold_after, nan=0.0), np.inf)
+
+    # Bucket of every sale, counted per showing with one bincount
+    bucket = np.minimum(np.floor(offsets / bucket_seconds), buckets).astype(np.int64)
+    bucket = np.where(booked, bucket, buckets)
+    per_bucket = np.bincount((np.arange(count)[:, None] * (buckets + 1) + bucket).ravel(),
+                             minlength=count * (buckets + 1)).reshape(count, buckets + 1)[:, :buckets]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filled = np.cumsum(per_bucket, axis=1) / np.maximum(sellable, 1)[:, None]
+
+    sold_out = booked.sum(axis=1) == sellable
+    sellout_seconds = np.where(booked, offsets, 0).max(axis=1)[sold_out] if count else np.array([])
+    return {
+        "bucketSeconds": bucket_seconds,
+        "mean": [round(value, 4) for value in filled.mean(axis=0).tolist()] if count else [],
+        "median": [round(value, 4) for value in np.median(filled, axis=0).tolist()] if count else [],
+        "soldOut": int(sold_out.sum()),
+        "medianSecondsToSellout": float(np.median(sellout_seconds)) if len(sellout_seconds) else None
+    }
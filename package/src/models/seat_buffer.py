@@ -0,0 +1,106 @@
+"""
+Distancing buffers around booked seats
+
+A layout configured with `"buffer": {"seats": N, "rows": M}` keeps the N
+seats either side of every booked seat empty, within its aisle segment,
+and the M seats in front of and behind it in the same column. Seats a
+group books together don't block each other (see ShowingWriter._validate).
+
+The blocked seats of a seat map are its booked mask dilated by the buffer:
+one shifted OR per buffer step along the columns of each segment and along
+the rows, over the whole hall (or a stack of halls) at once. BufferMask
+keeps a showing's blocked seats current as the writer commits changes,
+recomputing only the rows within reach of the changed seats, and hands the
+writer a copy for each published snapshot.
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.models.seat_state import AVAILABLE, BOOKED, DISABLED
+
+
+def blocked_mask(layout, booked):
+    """Seats kept empty by the buffers, for a booked mask of shape (..., rows, columns)"""
+    seats, rows = layout.buffer
+    blocked = np.zeros_like(booked)
+    for start, end in layout.segments:
+        for k in range(1, min(seats, end - start - 1) + 1):
+            blocked[..., start + k:end] |= booked[..., start:end - k]
+            blocked[..., start:end - k] |= booked[..., start + k:end]
+    for k in range(1, min(rows, booked.shape[-2] - 1) + 1):
+        blocked[..., k:, :] |= booked[..., :-k, :]
+        blocked[..., :-k, :] |= booked[..., k:, :]
+    return blocked & ~booked
+
+
+def with_buffers(layout, statuses):
+    """Statuses of shape (..., rows, columns) with available seats inside a buffer marked disabled"""
+    blocked = blocked_mask(layout, statuses == BOOKED) & (statuses == AVAILABLE)
+    return np.where(blocked, np.uint8(DISABLED), statuses)
+
+
+class BufferMask:
+    """Blocked seats of one showing, kept up to date by its writer"""
+
+    def __init__(self, layout, statuses):
+        self.layout = layout
+        self.lock = threading.Lock()
+        self.rebuild(statuses)
+
+    def rebuild(self, statuses):
+        """Recompute every blocked seat from a full copy of the statuses"""
+        booked = np.frombuffer(bytes(statuses), dtype=np.uint8).reshape(self.layout.rows, self.layout.columns)
+        booked = booked == BOOKED
+        with self.lock:
+            self.booked = booked
+            self.blocked = blocked_mask(self.layout, booked)
+
+    def apply(self, changes, statuses=None):
+        """
+        Apply committed (index, code) changes
+
+        Only the rows a buffer can reach from the changed seats are
+        recomputed; with `changes` None the whole mask is rebuilt.
+        """
+        if changes is None:
+            self.rebuild(statuses)
+            return
+        if not changes:
+            return
+        reach = self.layout.buffer[1]
+        indices = np.fromiter((index for index, _ in changes), dtype=np.int64, count=len(changes))
+        codes = np.fromiter((code for _, code in changes), dtype=np.uint8, count=len(changes))
+        with self.lock:
+            self.booked.flat[indices] = codes == BOOKED
+            changed_rows = indices // self.layout.columns
+            low = max(0, int(changed_rows.min()) - reach)
+            high = min(self.layout.rows, int(changed_rows.max()) + reach + 1)
+            # The dilated rows [low, high) depend on booked rows up to `reach` beyond them
+            band_low = max(0, low - reach)
+            band = blocked_mask(self.layout, self.booked[band_low:min(self.layout.rows, high + reach)])
+            self.blocked[low:high] = band[low - band_low:high - band_low]
+
+    def view(self):
+        """Read-only copy of the blocked mask (flat), for the writer's published snapshots"""
+        with self.lock:
+            blocked = self.blocked.ravel().copy()
+        blocked.setflags(write=False)
+        return blocked
+
+    def blocked_available(self, statuses):
+        """Indices of available seats inside a buffer"""
+        return blocked_available(self.layout, statuses, self.view())
+
+
+def blocked_available(layout, statuses, blocked=None):
+    """Indices of available seats inside a buffer, from a flat mask or computed from the statuses"""
+    statuses = np.frombuffer(bytes(statuses), dtype=np.uint8)
+    if blocked is None:
+        blocked = blocked_mask(layout, statuses.reshape(layout.rows, layout.columns) == BOOKED).ravel()
+    return np.flatnonzero(blocked & (statuses == AVAILABLE))
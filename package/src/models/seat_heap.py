@@ -0,0 +1,149 @@
+"""
+Row-ranked heaps for single-seat and pair allocation
+
+Singles and pairs get exactly the seats the full search
+(routes/seating.find_best_seats_for_group) would pick: the first row in
+middle-out order that has a run of enough available seats of the requested
+type, and in that row the middle of the run whose middle is closest to the
+centre column (leftmost on ties). Runs never span the aisle.
+
+SeatHeap caches that choice per row and (group size, seat type), and keeps
+one heap per key of the rows that had a choice when pushed, ordered by row
+priority. A committed change only rescans the rows it touched; rows that
+lose their last run are discarded when they reach the top (lazy deletion),
+and rows that gain one are pushed back. The best single or pair is then
+found without scanning the whole hall.
+
+The showing's writer feeds every committed change into `apply()`.
+"""
+import heapq
+import os
+import sys
+import threading
+from functools import lru_cache
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.models.layout import LAYOUT_CACHE_SIZE, SEAT_TYPES
+from src.models.seat_state import AVAILABLE
+
+# Largest group size served from the heaps
+MAX_GROUP_SIZE = 2
+SEARCH_TYPES = ('any',) + SEAT_TYPES
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def row_ranks(layout):
+    """Rank of every row in the full search's middle-out order (ties go to the front row)"""
+    middle_row = layout.rows // 2
+    order = sorted(range(layout.rows), key=lambda row: abs(middle_row - row))
+    ranks = [0] * layout.rows
+    for rank, row in enumerate(order):
+        ranks[row] = rank
+    return tuple(ranks)
+
+
+def best_in_row(layout, statuses, row, seat_type):
+    """
+    First seat index of the full search's choice in one row for each group
+    size (None where the row has no run long enough), as a list by size - 1
+    """
+    code = None if seat_type == 'any' else SEAT_TYPES.index(seat_type)
+    # Doubled so the distance of a block's centre from the centre column stays an integer
+    center = 2 * (layout.columns // 2)
+    base = row * layout.columns
+    best = [None] * MAX_GROUP_SIZE
+    best_distance = [None] * MAX_GROUP_SIZE
+    for start, end in layout.segments:
+        run_start = None
+        for col in range(start, end + 1):
+            index = base + col
+            if col < end and statuses[index] == AVAILABLE and (code is None or layout.type_codes[index] == code):
+                if run_start is None:
+                    run_start = col
+                continue
+            if run_start is not None:
+                length = col - run_start
+                for size in range(1, min(length, MAX_GROUP_SIZE) + 1):
+                    first = run_start + (length - size) // 2
+                    distance = abs(2 * first + size - 1 - center)
+                    if best[size - 1] is None or distance < best_distance[size - 1]:
+                        best[size - 1] = base + first
+                        best_distance[size - 1] = distance
+                run_start = None
+    return best
+
+
+class SeatHeap:
+    """Best available single and pair of one showing"""
+
+    def __init__(self, layout, statuses):
+        self.layout = layout
+        self.ranks = row_ranks(layout)
+        self.lock = threading.Lock()
+        self.rebuild(statuses)
+
+    def rebuild(self, statuses):
+        """Reset every heap from a full copy of the statuses"""
+        with self.lock:
+            self.statuses = bytearray(statuses)
+            # (size, seat type) -> per-row first seat index of the row's choice, or None
+            self.choices = {(size, seat_type): [None] * self.layout.rows
+                            for size in range(1, MAX_GROUP_SIZE + 1) for seat_type in SEARCH_TYPES}
+            self.heaps = {key: [] for key in self.choices}
+            self.present = {key: bytearray(self.layout.rows) for key in self.choices}
+            for row in range(self.layout.rows):
+                self._scan(row)
+            for heap in self.heaps.values():
+                heapq.heapify(heap)
+
+    def _scan(self, row):
+        """Recompute a row's choices and push it where it gained one"""
+        for seat_type in SEARCH_TYPES:
+            for size, index in enumerate(best_in_row(self.layout, self.statuses, row, seat_type), 1):
+                key = (size, seat_type)
+                self.choices[key][row] = index
+                if index is not None and not self.present[key][row]:
+                    heapq.heappush(self.heaps[key], (self.ranks[row], row))
+                    self.present[key][row] = 1
+
+    def apply(self, changes, statuses=None):
+        """
+        Apply committed (index, code) changes
+
+        With `changes` None the whole seat map was replaced and the heaps
+        are rebuilt from `statuses`.
+        """
+        if changes is None:
+            self.rebuild(statuses)
+            return
+        with self.lock:
+            for index, code in changes:
+                self.statuses[index] = code
+            for row in {index // self.layout.columns for index, _ in changes}:
+                self._scan(row)
+
+    def best(self, group_size, seat_type='any'):
+        """First seat index of the best available group, or None"""
+        key = (group_size, seat_type if seat_type in SEARCH_TYPES else 'any')
+        with self.lock:
+            heap = self.heaps[key]
+            choices = self.choices[key]
+            while heap:
+                row = heap[0][1]
+                if choices[row] is not None:
+                    return choices[row]
+                heapq.heappop(heap)
+                self.present[key][row] = 0
+        return None
+
+    def best_seats(self, group_size, seat_type='any'):
+        """Best available seat objects for a group of 1 or 2, falling back to any type"""
+        index = self.best(group_size, seat_type)
+        if index is None and seat_type != 'any':
+            index = self.best(group_size, 'any')
+        if index is None:
+            return []
+        row, col = divmod(index, self.layout.columns)
+        return [self.layout.seat(row, col + k) for k in range(group_size)]
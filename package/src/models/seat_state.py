@@ -0,0 +1,373 @@
+"""
+Memory-mapped binary seat status files
+
+One file per showing. A fixed 64-byte header is followed by the layout
+description (JSON) and then one status byte per seat, row-major:
+
+    offset  size  field
+    0       4     magic b'CSMP'
+    4       2     format version
+    6       2     reserved
+    8       8     state version (even when stable, odd while a write is in progress)
+    16      20    layout hash (SHA-1 of config + pricing)
+    36      4     rows
+    40      4     columns
+    44      4     length of the layout JSON
+    48      4     offset of the seat bytes
+    52      8     journal checkpoint (offset up to which journaled writes are flushed here)
+    60      4     reserved
+
+Readers in any process map the file and read statuses without parsing or
+copying; `snapshot()` gives a consistent copy by checking that the version
+did not change while copying. A single seat update is a one-byte write
+between two version bumps.
+
+A process that dies between the two bumps leaves the version odd for good
+(a torn write). `snapshot()` gives up on a version that stays odd and
+raises TornWrite; the showing's next writer rolls the version back with
+`repair_torn_write()` and re-applies the interrupted batch from its journal
+(see ShowingWriter).
+
+Usage:
+    python -m src.models.seat_state to-binary seating.json default.seats
+    python -m src.models.seat_state to-json default.seats seating.json
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.models.layout import compile_layout
+
+MAGIC = b'CSMP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHQ20sIIIIQ4x')
+VERSION = struct.Struct('<Q')
+VERSION_OFFSET = 8
+CHECKPOINT_OFFSET = 52
+SEATS_ALIGNMENT = 64
+# Seconds a snapshot waits on an unchanged odd version before calling it a torn write
+SNAPSHOT_TIMEOUT = 0.5
+
+# Seat status codes (index = code)
+STATUSES = ('available', 'booked', 'disabled', 'selected')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+AVAILABLE, BOOKED, DISABLED, SELECTED = range(len(STATUSES))
+# Statuses the API derives for display, with the status they are stored as
+DERIVED_STATUSES = {'blocked': 'available'}
+
+
+class SeatStateError(Exception):
+    """Raised for missing, corrupt or mismatched seat state files"""
+
+
+class TornWrite(SeatStateError):
+    """Raised when a write to a state file was interrupted and never finished"""
+
+    def __init__(self, path, version):
+        super().__init__(f"{path}: write at version {version} never finished; its journal must be re-applied")
+        self.path = path
+        self.version = version
+
+
+def encode_statuses(seats):
+    """Convert a grid of seat objects into a row-major status byte string"""
+    return bytes(STATUS_CODES[DERIVED_STATUSES.get(seat["status"], seat["status"])] for row in seats for seat in row)
+
+
+class SeatSnapshot:
+    """
+    Immutable seat statuses of one committed version
+
+    A showing's writer publishes a new snapshot after every batch by
+    replacing a single reference, so readers take the current one without
+    locking and never see part of a batch. `views` holds immutable derived
+    state captured with the statuses (see ShowingWriter.views); values
+    computed from a snapshot with `derive()` are kept with it and shared by
+    every reader of that version.
+    """
+    __slots__ = ('version', 'statuses', 'views', '_derived')
+
+    def __init__(self, version, statuses, views=None):
+        self.version = version
+        self.statuses = bytes(statuses)
+        self.views = views or {}
+        self._derived = {}
+
+    def derive(self, name, compute):
+        """Value of `compute()` for this version, computed on first use"""
+        try:
+            return self._derived[name]
+        except KeyError:
+            # Two readers may both compute it; both get an equal value
+            return self._derived.setdefault(name, compute())
+
+
+class SeatStateFile:
+    """A showing's seat statuses backed by a memory-mapped file"""
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self.writable = writable
+        self.lock = threading.Lock()
+        self._file = open(path, 'r+b' if writable else 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SeatStateError(f"{path}: empty seat state file")
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise SeatStateError(f"{path}: truncated header")
+        (magic, format_version, _, _, layout_hash, rows, columns,
+         layout_length, seats_offset, _) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self.close()
+            raise SeatStateError(f"{path}: not a seat state file (format {format_version})")
+
+        description = json.loads(self._map[HEADER.size:HEADER.size + layout_length])
+        self.layout = compile_layout(description["config"], description["pricing"])
+        self.meta = description.get("meta", {})
+        if bytes.fromhex(self.layout.hash) != layout_hash or (rows, columns) != (self.layout.rows, self.layout.columns):
+            self.close()
+            raise SeatStateError(f"{path}: layout hash does not match the stored configuration")
+        if len(self._map) < seats_offset + rows * columns:
+            self.close()
+            raise SeatStateError(f"{path}: truncated seat data")
+
+        self.seats_offset = seats_offset
+        self.size = rows * columns
+
+    @classmethod
+    def create(cls, path, layout, statuses=None, meta=None):
+        """Write a new state file for `layout` (atomically) and open it for writing"""
+        description = json.dumps({"config": layout.config, "pricing": layout.pricing, "meta": meta or {}}).encode()
+        seats_offset = -(-(HEADER.size + len(description)) // SEATS_ALIGNMENT) * SEATS_ALIGNMENT
+        if statuses is None:
+            statuses = bytes(layout.size)
+        if len(statuses) != layout.size:
+            raise SeatStateError(f"expected {layout.size} statuses, got {len(statuses)}")
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, bytes.fromhex(layout.hash),
+                             layout.rows, layout.columns, len(description), seats_offset, 0)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(description)
+            f.write(bytes(seats_offset - HEADER.size - len(description)))
+            f.write(bytes(statuses))
+        os.replace(tmp_path, path)
+        return cls(path, writable=True)
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def name(self):
+        """File name without extension (the showing id)"""
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    @property
+    def version(self):
+        return VERSION.unpack_from(self._map, VERSION_OFFSET)[0]
+
+    @property
+    def checkpoint(self):
+        return VERSION.unpack_from(self._map, CHECKPOINT_OFFSET)[0]
+
+    def set_checkpoint(self, offset):
+        """Record that journaled writes up to `offset` are flushed to this file"""
+        self._check_writable()
+        self._map.flush()
+        VERSION.pack_into(self._map, CHECKPOINT_OFFSET, offset)
+        self._map.flush()
+
+    def statuses(self):
+        """Zero-copy view of the status bytes (may change under concurrent writes)"""
+        return memoryview(self._map)[self.seats_offset:self.seats_offset + self.size]
+
+    def snapshot(self):
+        """
+        Consistent copy of the statuses as (version, bytes)
+
+        Raises TornWrite if the same write stays in progress for
+        SNAPSHOT_TIMEOUT seconds.
+        """
+        odd_version = deadline = None
+        while True:
+            before = self.version
+            if before % 2 == 0:
+                data = self._map[self.seats_offset:self.seats_offset + self.size]
+                if self.version == before:
+                    return before, data
+            elif before != odd_version:
+                odd_version, deadline = before, time.monotonic() + SNAPSHOT_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise TornWrite(self.path, before)
+            # Let a writer in this process finish
+            time.sleep(0)
+
+    def repair_torn_write(self):
+        """
+        Roll an odd version back to the last committed one; returns whether it was odd
+
+        Only for the showing's writer: any other writer may be mid-write. The
+        statuses may hold part of the interrupted write, so the caller
+        re-applies its journal from that version on.
+        """
+        self._check_writable()
+        with self.lock:
+            version = self.version
+            if version % 2 == 0:
+                return False
+            VERSION.pack_into(self._map, VERSION_OFFSET, version - 1)
+            return True
+
+    def status(self, row, col):
+        return STATUSES[self._map[self.seats_offset + self.layout.index(row, col)]]
+
+    def _check_writable(self):
+        if not self.writable:
+            raise SeatStateError(f"{self.path}: opened read-only")
+
+    def set_status(self, row, col, status):
+        """Update one seat: a one-byte write between two version bumps"""
+        self.set_statuses([(row, col, status)])
+
+    def set_statuses(self, updates):
+        """Apply (row, col, status) updates as one versioned write"""
+        layout = self.layout
+        writes = []
+        for row, col, status in updates:
+            if not (0 <= row < layout.rows and 0 <= col < layout.columns):
+                raise SeatStateError(f"seat ({row}, {col}) out of range")
+            if status not in STATUS_CODES:
+                raise SeatStateError(f"unknown seat status {status!r}")
+            writes.append((row * layout.columns + col, STATUS_CODES[status]))
+        return self.write_codes(writes)
+
+    def write_codes(self, writes):
+        """Apply pre-validated (seat index, status code) writes as one versioned write"""
+        self._check_writable()
+        base = self.seats_offset
+        with self.lock:
+            version = self.version
+            VERSION.pack_into(self._map, VERSION_OFFSET, version + 1)
+            for index, code in writes:
+                self._map[base + index] = code
+            VERSION.pack_into(self._map, VERSION_OFFSET, version + 2)
+            return version + 2
+
+    def write_all(self, statuses):
+        """Replace every status in one versioned write"""
+        self._check_writable()
+        if len(statuses) != self.size:
+            raise SeatStateError(f"expected {self.size} statuses, got {len(statuses)}")
+        with self.lock:
+            version = self.version
+            VERSION.pack_into(self._map, VERSION_OFFSET, version + 1)
+            self._map[self.seats_offset:self.seats_offset + self.size] = bytes(statuses)
+            VERSION.pack_into(self._map, VERSION_OFFSET, version + 2)
+            return version + 2
+
+    def restore(self, version, statuses):
+        """Overwrite the statuses and set the version (journal recovery)"""
+        self._check_writable()
+        with self.lock:
+            VERSION.pack_into(self._map, VERSION_OFFSET, self.version | 1)
+            self._map[self.seats_offset:self.seats_offset + self.size] = bytes(statuses)
+            VERSION.pack_into(self._map, VERSION_OFFSET, version)
+
+    def fill(self, status):
+        return self.write_all(bytes([STATUS_CODES[status]]) * self.size)
+
+    def flush(self):
+        self._map.flush()
+
+    def to_seats(self, statuses=None):
+        """Build the grid of seat objects served by the API"""
+        if statuses is None:
+            statuses = self.snapshot()[1]
+        seats = self.layout.build_seats()
+        if any(statuses):
+            for index, code in enumerate(statuses):
+                if code:
+                    seats[index // self.layout.columns][index % self.layout.columns]["status"] = STATUSES[code]
+        return seats
+
+
+class SeatStateCopy:
+    """Layout, metadata and one snapshot of a state file, read without keeping the file open"""
+
+    def __init__(self, path):
+        with SeatStateFile(path) as state:
+            self.path = path
+            self.layout = state.layout
+            self.meta = state.meta
+            self._snapshot = state.snapshot()
+
+    @property
+    def name(self):
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def json_to_state(json_path, state_path, meta=None):
+    """Convert a seating.json file into a binary state file"""
+    with open(json_path) as f:
+        data = json.load(f)
+    layout = compile_layout(data["config"], data["pricing"])
+    state = SeatStateFile.create(state_path, layout, encode_statuses(data["seats"]), meta)
+    state.close()
+
+
+def state_to_json(state_path, json_path):
+    """Convert a binary state file back into the seating.json format"""
+    with SeatStateFile(state_path) as state:
+        data = {"config": state.layout.config, "pricing": state.layout.pricing, "seats": state.to_seats()}
+    with open(json_path, 'w') as f:
+        json.dump(data, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between seating.json and binary seat state files")
+    parser.add_argument('direction', choices=['to-binary', 'to-json'])
+    parser.add_argument('source')
+    parser.add_argument('target')
+    args = parser.parse_args(argv)
+
+    if args.direction == 'to-binary':
+        json_to_state(args.source, args.target)
+    else:
+        state_to_json(args.source, args.target)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Cross-showing seat search
+
+Finds the best block of seats for a group in every candidate showing at
+once. Showings sharing a layout are stacked into one (showings, rows,
+columns) occupancy array and evaluated with numpy: a cumulative sum along
+each row gives every window of `group_size` seats, windows that are fully
+available (and of the requested type) keep their static desirability score
+and the best window per showing is an argmin over the flattened hall.
+
+A block's score is the distance of its row from the middle row, then the
+distance of its centre from the centre column, ties broken by seat order.
+Aisles are modelled as an always-unavailable column so no block spans
+them, and in halls with distancing the seats inside a buffer are
+unavailable too (see src/models/seat_buffer.py).
+"""
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.models.layout import LAYOUT_CACHE_SIZE, SEAT_TYPES
+from src.models.seat_buffer import with_buffers
+from src.models.seat_state import AVAILABLE
+
+NO_MATCH = np.iinfo(np.int64).max
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _extended_columns(layout):
+    """Real column at each position of a row with one blocked column per aisle (-1)"""
+    columns = []
+    for start, end in layout.segments:
+        if columns:
+            columns.append(-1)
+        columns.extend(range(start, end))
+    return np.array(columns, dtype=np.int64)
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE * 4)
+def _window_scores(layout, group_size):
+    """Static score of every window start on the extended grid, shape (rows, windows)"""
+    extended = _extended_columns(layout)
+    windows = len(extended) - group_size + 1
+    if windows <= 0:
+        return None
+    starts = extended[:windows]
+    row_distance = np.abs(layout.rows // 2 - np.arange(layout.rows, dtype=np.int64))
+    center_distance = np.abs(2 * starts + group_size - 1 - 2 * (layout.columns // 2))
+    scale = 4 * layout.columns + 1
+    scores = row_distance[:, None] * scale + center_distance[None, :]
+    # Windows starting on an aisle are never fully available, but keep them out explicitly
+    scores[:, starts < 0] = NO_MATCH
+    return scores
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _type_codes(layout):
+    return np.frombuffer(layout.type_codes, dtype=np.uint8).reshape(layout.rows, layout.columns)
+
+
+def best_windows(layout, statuses, group_size, seat_type='any'):
+    """
+    Best window per showing for stacked statuses of shape (showings, rows, columns)
+
+    Returns (scores, first seat indices); the score is NO_MATCH where a
+    showing has no suitable block.
+    """
+    count = statuses.shape[0]
+    scores = _window_scores(layout, group_size)
+    if scores is None:
+        return np.full(count, NO_MATCH, dtype=np.int64), np.zeros(count, dtype=np.int64)
+
+    available = statuses == AVAILABLE
+    if seat_type != 'any':
+        code = SEAT_TYPES.index(seat_type) if seat_type in SEAT_TYPES else None
+        if code is None:
+            return np.full(count, NO_MATCH, dtype=np.int64), np.zeros(count, dtype=np.int64)
+        available &= _type_codes(layout) == code
+
+    # Copy into the extended grid; aisle columns stay unavailable
+    extended = _extended_columns(layout)
+    real = extended >= 0
+    grid = np.zeros((count, layout.rows, len(extended) + 1), dtype=np.int32)
+    grid[:, :, 1:][:, :, real] = available[:, :, extended[real]]
+    runs = np.cumsum(grid, axis=2)
+    fits = (runs[:, :, group_size:] - runs[:, :, :-group_size]) == group_size
+
+    candidate = np.where(fits, scores[None, :, :], NO_MATCH).reshape(count, -1)
+    best = candidate.argmin(axis=1)
+    best_scores = candidate[np.arange(count), best]
+    windows = scores.shape[1]
+    first_seats = (best // windows) * layout.columns + extended[best % windows]
+    return best_scores, first_seats
+
+
+def search_showings(showings, group_size, seat_type='any', limit=10):
+    """
+    Rank showings by the best block they can offer a group
+
+    `showings` is a list of (showing id, state file). A showing without a
+    block of the requested type falls back to any type, like the per-showing
+    search, and ranks after every showing that matched the type. Results
+    are ordered by type match, seat score and start time.
+    """
+    by_layout = {}
+    for showing_id, state in showings:
+        by_layout.setdefault(state.layout, []).append((showing_id, state))
+
+    results = []
+    for layout, members in by_layout.items():
+        stacked = np.frombuffer(b''.join(state.snapshot()[1] for _, state in members), dtype=np.uint8)
+        stacked = stacked.reshape(len(members), layout.rows, layout.columns)
+        if any(layout.buffer):
+            stacked = with_buffers(layout, stacked)
+
+        scores, first_seats = best_windows(layout, stacked, group_size, seat_type)
+        type_matched = scores != NO_MATCH
+        if seat_type != 'any' and not type_matched.all():
+            any_scores, any_seats = best_windows(layout, stacked, group_size, 'any')
+            scores = np.where(type_matched, scores, any_scores)
+            first_seats = np.where(type_matched, first_seats, any_seats)
+
+        scale = 4 * layout.columns + 1
+        for (showing_id, state), score, first, matched in zip(members, scores.tolist(), first_seats.tolist(),
+                                                             type_matched.tolist()):
+            if score == NO_MATCH:
+                continue
+            row, col = divmod(first, layout.columns)
+            results.append({
+                "showing": showing_id,
+                **state.meta,
+                "seats": [layout.seat(row, col + k) for k in range(group_size)],
+                "typeMatched": matched,
+                "rowDistance": score // scale,
+                "centerOffset": (score % scale) / 2
+            })
+
+    results.sort(key=rank_key)
+    return results[:limit] if limit else results
+
+
+def rank_key(result):
+    """Sort key for search results: type match, seat quality, then start time"""
+    return (not result["typeMatched"], result["rowDistance"], result["centerOffset"],
+            str(result.get("startsAt", "")), result["showing"])
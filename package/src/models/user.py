@@ -1,11 +1,35 @@
+import os
+import threading
+from datetime import datetime, timezone
+
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Database URLs whose tables have been created in this process
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+def ensure_schema():
+    """Create missing tables on first use, so importing the app writes nothing"""
+    url = db.engine.url
+    if str(url) in _schema_ready:
+        return
+    with _schema_lock:
+        if str(url) not in _schema_ready:
+            if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+                os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+            db.create_all()
+            _schema_ready.add(str(url))
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    bookings = db.relationship('Booking', back_populates='user', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -16,3 +40,52 @@ class User(db.Model):
             'username': self.username,
             'email': self.email
         }
+
+class Booking(db.Model):
+    """Seats a user booked in one request, committed at seat state `version`"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    showing_id = db.Column(db.String(64), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    idempotency_key = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utc_now)
+    user = db.relationship('User', back_populates='bookings')
+    # Seats of every booking in a result are loaded with one extra query
+    seats = db.relationship('BookingSeat', back_populates='booking', cascade='all, delete-orphan',
+                            order_by='BookingSeat.id', lazy='selectin')
+
+    # Listings page by id, newest first, per user (optionally per showing) and per showing
+    __table_args__ = (
+        db.Index('ix_booking_user_id_id', 'user_id', 'id'),
+        db.Index('ix_booking_user_id_showing_id_id', 'user_id', 'showing_id', 'id'),
+        db.Index('ix_booking_showing_id_id', 'showing_id', 'id'),
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_booking_user_id_idempotency_key'),
+    )
+
+    def __repr__(self):
+        return f'<Booking {self.id} {self.showing_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'userId': self.user_id,
+            'showing': self.showing_id,
+            'version': self.version,
+            'createdAt': self.created_at.isoformat(),
+            'seats': [seat.to_dict() for seat in self.seats]
+        }
+
+class BookingSeat(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=False, index=True)
+    row = db.Column(db.Integer, nullable=False)
+    col = db.Column(db.Integer, nullable=False)
+    seat_id = db.Column(db.String(16), nullable=False)
+    booking = db.relationship('Booking', back_populates='seats')
+
+    def to_dict(self):
+        return {
+            'id': self.seat_id,
+            'row': self.row,
+            'col': self.col
+        }
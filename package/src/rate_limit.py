@@ -0,0 +1,128 @@
+"""
+Per-client token-bucket rate limiting
+
+When SEATING_RATE_LIMIT=1, every `/api/*` request spends one token from its
+client's bucket for the request's budget:
+
+    read     GET requests
+    search   POST /api/best-seats (full scans of the seat map)
+    write    other POST/PUT/DELETE requests (bookings, resets, showings)
+
+Clients are identified by their `X-API-Key` header, or by remote address.
+Each bucket refills at `rate` tokens per second up to `burst`; a request
+that finds its bucket empty gets a 429 with Retry-After. State is a fixed
+list of buckets per client in an LRU of at most MAX_CLIENTS entries, so
+memory is O(1) per active client and bounded overall; an evicted client
+simply starts again with full buckets.
+
+Budgets can be set as `name:rate:burst` pairs, e.g.
+SEATING_RATE_LIMITS=read:20:40,search:2:10,write:5:10
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src import metrics
+
+ENABLED = os.environ.get('SEATING_RATE_LIMIT', '0') == '1'
+
+API_KEY_HEADER = 'X-API-Key'
+MAX_CLIENTS = 10000
+
+# Budget name -> (tokens per second, burst)
+DEFAULT_BUDGETS = {
+    'read': (20.0, 40.0),
+    'search': (2.0, 10.0),
+    'write': (5.0, 10.0),
+}
+SEARCH_ENDPOINTS = {'best-seats', 'search'}
+
+
+def parse_budgets(value):
+    """Parse 'name:rate:burst,...' into a budget dict on top of the defaults"""
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, rate, burst = item.split(':')
+        if name not in budgets:
+            raise ValueError(f"unknown rate limit budget: {name!r}")
+        budgets[name] = (float(rate), float(burst))
+    return budgets
+
+
+BUDGETS = parse_budgets(os.environ.get('SEATING_RATE_LIMITS', ''))
+
+
+class RateLimiter:
+    """Token buckets per client and budget, in a bounded LRU"""
+
+    def __init__(self, budgets=None, max_clients=MAX_CLIENTS, clock=time.monotonic):
+        self.budgets = budgets or BUDGETS
+        self.index = {name: i for i, name in enumerate(self.budgets)}
+        self.limits = list(self.budgets.values())
+        self.max_clients = max_clients
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.clients = OrderedDict()  # client -> [[tokens, updated] per budget]
+
+    def acquire(self, client, budget):
+        """Spend one token; returns 0 if allowed, else seconds until a token is available"""
+        i = self.index[budget]
+        rate, burst = self.limits[i]
+        with self.lock:
+            now = self.clock()
+            buckets = self.clients.get(client)
+            if buckets is None:
+                buckets = self.clients[client] = [[b, now] for _, b in self.limits]
+                if len(self.clients) > self.max_clients:
+                    self.clients.popitem(last=False)
+            else:
+                self.clients.move_to_end(client)
+
+            bucket = buckets[i]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+
+LIMITER = RateLimiter()
+
+
+def client_key(request):
+    api_key = request.headers.get(API_KEY_HEADER)
+    return f"key:{api_key}" if api_key else f"addr:{request.remote_addr}"
+
+
+def budget_for(request):
+    if request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return 'read'
+    if request.path.rstrip('/').rsplit('/', 1)[-1] in SEARCH_ENDPOINTS:
+        return 'search'
+    return 'write'
+
+
+def install(blueprint, limiter=None):
+    """Rate-limit every request handled by `blueprint` when enabled"""
+    if not ENABLED:
+        return
+    limiter = limiter or LIMITER
+
+    from flask import jsonify, request
+
+    @blueprint.before_request
+    def _check_rate_limit():
+        budget = budget_for(request)
+        wait = limiter.acquire(client_key(request), budget)
+        if not wait:
+            return None
+        metrics.inc('seating_rate_limited_total', help_text='Requests rejected by the rate limiter', budget=budget)
+        retry_after = max(1, math.ceil(wait))
+        response = jsonify({"error": f"Rate limit exceeded for {budget} requests", "retryAfter": retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
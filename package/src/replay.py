@@ -0,0 +1,265 @@
+"""
+Deterministic replay of booking journals
+
+A journal is a newline-delimited JSON file with one seat operation per line:
+
+    {"op": "config", "config": {...}, "pricing": {...}, "seats": [[row, col, status], ...]}
+    {"op": "best_seats", "groupSize": 4, "seatType": "any", "ts": 1718000000.1}
+    {"op": "update", "seats": [{"row": 7, "col": 4, "status": "booked"}], "ts": 1718000000.4}
+    {"op": "reset", "ts": 1718000100.0}
+    {"op": "rejected", "idempotencyKey": "...", "seats": [...], "conflicts": [...]}
+
+`config` (re)initializes the hall, optionally with the non-available seats
+at recording time. Entries may carry a "showing" id; one showing is
+replayed at a time. Set SEATING_RECORD_FILE to make the running service
+append its traffic to a journal in this format.
+
+The replay runs every best-seat query through both the basic
+(routes/seating.py) and the improved (routes/improved_seating.py) algorithm,
+counts how often their allocations differ and reports throughput.
+
+Usage:
+    python -m src.replay journal.ndjson
+    python -m src.replay journal.ndjson --pace recorded --speed 10
+    python -m src.replay journal.ndjson --book --json
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+RECORD_FILE = os.environ.get('SEATING_RECORD_FILE')
+
+
+class TrafficRecorder:
+    """Appends the service's seat operations to a replayable journal"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.configured = set()
+
+    def record(self, get_data, op, showing='default', **fields):
+        """Record one operation; `get_data()` returns the seating data it applies to"""
+        fields.update(op=op, showing=showing, ts=time.time())
+        with self.lock:
+            # Checked under the lock so each showing's config line is written once, before its operations
+            lines = [] if showing in self.configured else [config_entry(get_data(), showing)]
+            lines.append(fields)
+            with open(self.path, 'a') as f:
+                for line in lines:
+                    f.write(json.dumps(line) + '\n')
+            self.configured.add(showing)
+
+
+def config_entry(data, showing='default'):
+    """Journal line describing the hall and every seat that is not available"""
+    return {
+        "op": "config",
+        "showing": showing,
+        "config": data["config"],
+        "pricing": data["pricing"],
+        "seats": [[seat["row"], seat["col"], seat["status"]]
+                  for row in data["seats"] for seat in row if seat["status"] != "available"],
+        "ts": time.time()
+    }
+
+
+_recorder = TrafficRecorder(RECORD_FILE) if RECORD_FILE else None
+
+
+def record(get_data, op, showing='default', **fields):
+    """Record an operation when SEATING_RECORD_FILE is set"""
+    if _recorder is not None:
+        _recorder.record(get_data, op, showing, **fields)
+
+
+def read_journal(path):
+    """Yield the operations in a (optionally gzipped) journal file"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: invalid journal line")
+
+
+class Engine:
+    """One seating algorithm replaying the journal against its own seat map"""
+
+    def __init__(self, name, find_best_seats):
+        self.name = name
+        self.find_best_seats = find_best_seats
+        self.config = None
+        self.seats = []
+        self.search_seconds = 0.0
+        self.searches = 0
+        self.unplaced = 0
+        self.booked_groups = 0
+
+    def configure(self, entry, build_seats):
+        self.config = entry["config"]
+        self.seats = build_seats(entry["config"], entry["pricing"])
+        for row, col, status in entry.get("seats", []):
+            self.seats[row][col]["status"] = status
+
+    def search(self, group_size, seat_type):
+        t0 = time.perf_counter()
+        result = self.find_best_seats(self.seats, self.config, group_size, seat_type)
+        self.search_seconds += time.perf_counter() - t0
+        self.searches += 1
+        if not result:
+            self.unplaced += 1
+        return result
+
+    def apply(self, updates):
+        for update in updates:
+            row, col, status = update.get("row"), update.get("col"), update.get("status")
+            if row is not None and col is not None and status is not None:
+                self.seats[row][col]["status"] = status
+
+    def reset(self):
+        for row in self.seats:
+            for seat in row:
+                seat["status"] = "available"
+
+    def summary(self, wall_seconds):
+        seats = [seat for row in self.seats for seat in row]
+        booked = sum(1 for seat in seats if seat["status"] == "booked")
+        return {
+            "searches": self.searches,
+            "searchSeconds": round(self.search_seconds, 6),
+            "searchesPerSecond": round(self.searches / self.search_seconds, 1) if self.search_seconds else None,
+            "unplacedGroups": self.unplaced,
+            "bookedGroups": self.booked_groups,
+            "bookedSeats": booked,
+            "occupancyRate": round(booked / len(seats) * 100, 1) if seats else 0.0
+        }
+
+
+def replay(entries, pace='max', speed=1.0, book=False, showing=None):
+    """
+    Replay journal entries against both algorithms
+
+    With `book`, each engine books the seats it allocated for every query and
+    recorded bookings are ignored, so the two seat maps diverge the way they
+    would have in production. Without it, recorded updates are applied to
+    both maps and only the allocations are compared. Journals recorded from
+    several showings are filtered down to `showing` (default: the first one).
+    """
+    from src.routes import seating as basic_seating
+    from src.routes import improved_seating
+
+    engines = [
+        Engine('basic', basic_seating.find_best_seats_for_group),
+        Engine('improved', improved_seating.find_best_seats_for_group),
+    ]
+    operations = 0
+    mismatches = 0
+    first_ts = None
+    started = time.perf_counter()
+
+    for entry in entries:
+        op = entry.get("op")
+        ts = entry.get("ts")
+        entry_showing = entry.get("showing", "default")
+        if showing is None:
+            showing = entry_showing
+        if entry_showing != showing:
+            continue
+
+        # Sleep until the recorded offset when replaying at recorded pace
+        if pace == 'recorded' and ts is not None:
+            if first_ts is None:
+                first_ts = ts
+            delay = (ts - first_ts) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        if op == 'config':
+            for engine in engines:
+                engine.configure(entry, basic_seating.build_seats)
+        elif engines[0].config is None:
+            raise ValueError("journal must start with a config entry")
+        elif op == 'best_seats':
+            group_size = entry.get("groupSize", 1)
+            seat_type = entry.get("seatType", "any")
+            allocations = []
+            for engine in engines:
+                result = engine.search(group_size, seat_type)
+                allocations.append(sorted(seat["id"] for seat in result))
+                if book and result:
+                    engine.apply([{"row": s["row"], "col": s["col"], "status": "booked"} for s in result])
+                    engine.booked_groups += 1
+            if any(allocation != allocations[0] for allocation in allocations[1:]):
+                mismatches += 1
+        elif op == 'update':
+            updates = entry.get("seats", [])
+            if book:
+                # Engines book their own allocations; keep only admin changes
+                updates = [u for u in updates if u.get("status") != "booked"]
+            for engine in engines:
+                engine.apply(updates)
+        elif op == 'reset':
+            for engine in engines:
+                engine.reset()
+        elif op == 'rejected':
+            # Keyed request the service turned down; the seats didn't change
+            pass
+        else:
+            raise ValueError(f"unknown journal operation: {op!r}")
+        operations += 1
+
+    wall_seconds = time.perf_counter() - started
+    queries = engines[0].searches
+    return {
+        "operations": operations,
+        "wallSeconds": round(wall_seconds, 3),
+        "operationsPerSecond": round(operations / wall_seconds, 1) if wall_seconds else None,
+        "queries": queries,
+        "allocationMismatches": mismatches,
+        "mismatchRate": round(mismatches / queries, 4) if queries else 0.0,
+        "engines": {engine.name: engine.summary(wall_seconds) for engine in engines}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a booking journal against the seating algorithms")
+    parser.add_argument('journal', help="NDJSON journal (.gz supported)")
+    parser.add_argument('--pace', choices=['max', 'recorded'], default='max',
+                        help="replay as fast as possible or at the recorded pace")
+    parser.add_argument('--speed', type=float, default=1.0, help="speed-up factor for --pace recorded")
+    parser.add_argument('--book', action='store_true',
+                        help="let each algorithm book its own allocations instead of the recorded ones")
+    parser.add_argument('--showing', help="showing to replay from a multi-showing journal (default: the first)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = replay(read_journal(args.journal), pace=args.pace, speed=args.speed, book=args.book,
+                    showing=args.showing)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Replayed {report['operations']} operations in {report['wallSeconds']} s "
+          f"({report['operationsPerSecond']} ops/s)")
+    print(f"Allocations differed in {report['allocationMismatches']} of {report['queries']} queries "
+          f"({report['mismatchRate']:.1%})")
+    for name, summary in report["engines"].items():
+        print(f"{name:<9} {summary['searchesPerSecond']} searches/s, "
+              f"{summary['unplacedGroups']} unplaced, occupancy {summary['occupancyRate']}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -100,14 +100,18 @@ def find_best_seats_for_group(seats, config, group_size, seat_type):
     # Store all possible seat groups
     all_possible_groups = []
     
+    # Rows that can hold the requested seat type, computed once per search
+    vip_rows = set(config["vipRows"])
+    accessible_rows = {seat["row"] for seat in config["accessibleSeats"]}
+    
     # Check each row for consecutive available seats
     for row_index in row_priority:
         row = seats[row_index]
         
         # Skip if we're looking for specific seat types that don't match this row
-        if seat_type == 'vip' and row_index not in config["vipRows"]:
+        if seat_type == 'vip' and row_index not in vip_rows:
             continue
-        if seat_type == 'accessible' and not any(seat["row"] == row_index for seat in config["accessibleSeats"]):
+        if seat_type == 'accessible' and row_index not in accessible_rows:
             continue
         
         # Find consecutive available seats in this row
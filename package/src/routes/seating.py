@@ -1,156 +1,563 @@
-from flask import Blueprint, jsonify, request
+from flask import (Blueprint, Response, abort, current_app, g, has_request_context, jsonify, make_response, request,
+                   stream_with_context)
+from datetime import datetime
+from concurrent.futures import TimeoutError as FutureTimeout, wait
+from functools import partial
+import atexit
+import io
+import itertools
 import json
 import os
+import re
+import sys
+import threading
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src import admission, bookings_io, metrics, rate_limit, replay
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.booking_writer import BookingConflict, ShowingWriter, WriterLocked, rotate_journal
+from src.models.idempotency import MAX_KEY_LENGTH, IdempotencyKeyReused
+from src.models.seat_heap import MAX_GROUP_SIZE as HEAP_GROUP_SIZE, SeatHeap
+from src.models.seat_state import (AVAILABLE, BOOKED, DISABLED, STATUS_CODES, SeatSnapshot, SeatStateCopy,
+                                   SeatStateError, SeatStateFile, TornWrite, encode_statuses, json_to_state)
 
 seating_bp = Blueprint('seating', __name__)
+metrics.install(seating_bp)
+# Rate limiting runs first so abusive clients never take a waiting-room ticket
+rate_limit.install(seating_bp)
+admission.install(seating_bp)
+
+# Seat statuses are stored per showing in memory-mapped binary files
+# (data/showings/<id>.seats); seating.json is the legacy seat map that
+# seeds the default showing on first use. Nothing is read or written at
+# import time: storage is created lazily by the first request that needs it.
+DATA_DIR = os.environ.get('SEATING_DATA_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+SEATING_DATA_FILE = os.path.join(DATA_DIR, 'seating.json')
+SHOWINGS_DIR = os.path.join(DATA_DIR, 'showings')
+# Finished showings, one columnar store per layout (see src/models/occupancy_archive.py)
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+
+DEFAULT_SHOWING = 'default'
+SHOWING_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+LAYOUT_HASH_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+# Seconds a request waits for its showing's writer to commit it
+WRITE_TIMEOUT = 10
+
+# Seconds a client is asked to wait before retrying a write its showing's writer couldn't take
+WRITER_RETRY_AFTER = 1
+
+# Header carrying the client's idempotency key for booking and hold requests
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Response header naming the seat map version a read was served from
+SEATS_VERSION_HEADER = 'X-Seats-Version'
+
+# Results returned by a cross-showing search by default and at most
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+
+# Seats a bulk import commits per writer request by default and at most
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_BATCH_SIZE = 10000
+
+# Showings kept open per process; the least recently used idle ones are closed
+# beyond this (an open showing holds its state file and, once written, a writer
+# thread with its journal and lock files)
+MAX_OPEN_SHOWINGS = int(os.environ.get('SEATING_MAX_OPEN_SHOWINGS', '128'))
+
+# Open state files, their writers, desirability heaps and distancing buffers by showing id
+_states = {}
+_writers = {}
+_heaps = {}
+_buffers = {}
+# Snapshots read straight from the state files, for showings whose writer hasn't published their latest version
+_snapshots = {}
+# Showing id -> tick of its last use, and -> number of requests using it (never closed while in use)
+_last_used = {}
+_pins = {}
+_clock = itertools.count()
+_states_lock = threading.Lock()
 
-# In-memory storage for seating data
-# In a production app, this would be stored in a database
-SEATING_DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'seating.json')
+# 503 for a write the showing's writer couldn't take or didn't confirm in time
+def writer_unavailable(message, reason, **fields):
+    metrics.inc('seating_writer_unavailable_total', help_text='Writes refused because no writer could take them',
+                reason=reason)
+    response = jsonify({"success": False, "error": message, **fields})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(WRITER_RETRY_AFTER)
+    return response
 
-# Ensure data directory exists
-os.makedirs(os.path.dirname(SEATING_DATA_FILE), exist_ok=True)
+# Another process owns the showing's writer (see ShowingWriter); only its owner can change it
+@seating_bp.errorhandler(WriterLocked)
+def writer_locked(error):
+    return writer_unavailable("Showing is being written by another process", 'locked')
+
+# A request still queued behind a stuck or backlogged writer may yet be committed
+WRITE_TIMED_OUT = "Timed out waiting for the showing's writer; the change may still be applied"
+
+# Generate the seat grid for a configuration
+def build_seats(seating_config, pricing):
+    return compile_layout(seating_config, pricing).build_seats()
 
 # Initialize seating data if it doesn't exist
 def initialize_seating_data():
     if not os.path.exists(SEATING_DATA_FILE):
-        # Default seating configuration
-        seating_config = {
-            "rows": 15,
-            "columns": 12,
-            "rowLabels": ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O'],
-            "vipRows": [9, 10, 11],  # J, K, L (0-indexed)
-            "vipColumns": [2, 3, 4, 5, 6, 7, 8, 9],  # 3-10 (0-indexed)
-            "accessibleSeats": [
-                {"row": 5, "col": 0}, {"row": 5, "col": 1},  # F1, F2
-                {"row": 5, "col": 10}, {"row": 5, "col": 11}  # F11, F12
-            ],
-            "discountRows": [0, 1],  # A, B (0-indexed)
-            "aisleAfterColumn": 5  # Aisle after column 6 (0-indexed)
-        }
-        
-        # Pricing
-        pricing = {
-            "normal": 10.00,
-            "vip": 15.00,
-            "accessible": 10.00,
-            "discount": 7.50
-        }
-        
-        # Generate seats
-        seats = []
-        for i in range(seating_config["rows"]):
-            row = []
-            for j in range(seating_config["columns"]):
-                # Determine seat type
-                seat_type = 'normal'
-                
-                # Check if VIP
-                if i in seating_config["vipRows"] and j in seating_config["vipColumns"]:
-                    seat_type = 'vip'
-                
-                # Check if accessible
-                is_accessible = any(seat["row"] == i and seat["col"] == j for seat in seating_config["accessibleSeats"])
-                if is_accessible:
-                    seat_type = 'accessible'
-                
-                # Check if discount
-                is_discount = i in seating_config["discountRows"]
-                
-                # Calculate price
-                price = pricing["normal"]
-                if is_discount and seat_type == 'normal':
-                    price = pricing["discount"]
-                elif seat_type == 'vip':
-                    price = pricing["vip"]
-                elif seat_type == 'accessible':
-                    price = pricing["accessible"]
-                
-                # Create seat object
-                row.append({
-                    "id": f"{seating_config['rowLabels'][i]}{j + 1}",
-                    "row": i,
-                    "col": j,
-                    "type": seat_type,
-                    "status": "available",
-                    "isDiscount": is_discount,
-                    "price": price
-                })
-            seats.append(row)
+        layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        os.makedirs(os.path.dirname(SEATING_DATA_FILE), exist_ok=True)
         
-        # Save to file
-        with open(SEATING_DATA_FILE, 'w') as f:
+        # Save to a temporary file first so concurrent workers never see a partial file
+        tmp_path = f"{SEATING_DATA_FILE}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
             json.dump({
-                "config": seating_config,
-                "pricing": pricing,
-                "seats": seats
+                "config": layout.config,
+                "pricing": layout.pricing,
+                "seats": layout.build_seats()
             }, f)
+        os.replace(tmp_path, SEATING_DATA_FILE)
+
+# Point the blueprint at another data directory (used by tools and tests)
+def configure_storage(data_dir):
+    global DATA_DIR, SEATING_DATA_FILE, SHOWINGS_DIR, ARCHIVE_DIR
+    close_states()
+    DATA_DIR = data_dir
+    SEATING_DATA_FILE = os.path.join(data_dir, 'seating.json')
+    SHOWINGS_DIR = os.path.join(data_dir, 'showings')
+    ARCHIVE_DIR = os.path.join(data_dir, 'archive')
+
+# Stop every writer and close every open state file
+def close_states():
+    with _states_lock:
+        for showing_id in list(_states):
+            close_showing(showing_id)
+        _pins.clear()
+
+# Stop a showing's writer and close its state file; call with _states_lock held
+def close_showing(showing_id):
+    writer = _writers.pop(showing_id, None)
+    if writer is not None:
+        writer.close()
+    _heaps.pop(showing_id, None)
+    _buffers.pop(showing_id, None)
+    _snapshots.pop(showing_id, None)
+    _last_used.pop(showing_id, None)
+    state = _states.pop(showing_id, None)
+    if state is not None:
+        state.close()
+
+# Mark a showing used, and in use until the end of the current request; call with _states_lock held
+def use_showing(showing_id):
+    _last_used[showing_id] = next(_clock)
+    if has_request_context():
+        g.setdefault('pinned_showings', []).append(showing_id)
+        _pins[showing_id] = _pins.get(showing_id, 0) + 1
+
+@seating_bp.teardown_app_request
+def release_showings(error=None):
+    pinned = g.pop('pinned_showings', None)
+    if pinned:
+        with _states_lock:
+            for showing_id in pinned:
+                count = _pins.pop(showing_id, 0) - 1
+                if count > 0:
+                    _pins[showing_id] = count
+            # Showings kept open past the limit while in use
+            close_idle_showings()
+
+# Close the least recently used idle showings beyond MAX_OPEN_SHOWINGS; call with _states_lock held
+def close_idle_showings(keep=None):
+    excess = len(_states) - MAX_OPEN_SHOWINGS
+    if excess > 0:
+        idle = sorted((other for other in _states if other != keep and not _pins.get(other)), key=_last_used.get)
+        for other in idle[:excess]:
+            close_showing(other)
+            metrics.inc('seating_showings_closed_total', help_text='Idle showings closed to stay under the open limit')
 
-# Initialize seating data
-initialize_seating_data()
+# Add an opened state file; call with _states_lock held
+def open_showing(showing_id, state):
+    _states[showing_id] = state
+    use_showing(showing_id)
+    close_idle_showings(keep=showing_id)
+    return state
 
-# Get seating data
-def get_seating_data():
+atexit.register(close_states)
+
+def showing_path(showing_id):
+    return os.path.join(SHOWINGS_DIR, f"{showing_id}.seats")
+
+def journal_path(showing_id):
+    return os.path.join(SHOWINGS_DIR, f"{showing_id}.journal")
+
+# Get the state file of a showing, or None if the showing doesn't exist; it
+# stays open at least until the end of the current request
+def get_showing_state(showing_id=DEFAULT_SHOWING):
+    with _states_lock:
+        state = _states.get(showing_id)
+        if state is not None:
+            use_showing(showing_id)
+            return state
+        path = showing_path(showing_id)
+        if not os.path.exists(path):
+            if showing_id != DEFAULT_SHOWING:
+                return None
+            # Seed the default showing from the legacy JSON seat map
+            initialize_seating_data()
+            json_to_state(SEATING_DATA_FILE, path)
+        return open_showing(showing_id, SeatStateFile(path, writable=True))
+
+# A showing's open state file, or a copy read from disk without keeping it open
+# (listings and searches touch every showing), or None if it doesn't exist
+def peek_showing(showing_id):
+    if showing_id in _states:
+        return get_showing_state(showing_id)
     try:
-        with open(SEATING_DATA_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        initialize_seating_data()
-        with open(SEATING_DATA_FILE, 'r') as f:
-            return json.load(f)
-
-# Save seating data
-def save_seating_data(data):
-    with open(SEATING_DATA_FILE, 'w') as f:
-        json.dump(data, f)
+        return SeatStateCopy(showing_path(showing_id))
+    except FileNotFoundError:
+        # The default showing is seeded on first use
+        return get_showing_state(showing_id) if showing_id == DEFAULT_SHOWING else None
+    except TornWrite:
+        # Left mid-write by a crashed writer: open it and let a writer repair it
+        state = get_showing_state(showing_id)
+        current_snapshot(state)
+        return state
+
+# Get the single writer that applies all changes to a showing
+def get_writer(state):
+    writer = _writers.get(state.name)
+    if writer is None:
+        with _states_lock:
+            writer = _writers.get(state.name)
+            if writer is None:
+                writer = ShowingWriter(state, journal_path(state.name))
+                # The heap sees every change because all changes go through the writer
+                heap = _heaps[state.name] = SeatHeap(state.layout, state.snapshot()[1])
+                writer.listeners.append(heap.apply)
+                if any(state.layout.buffer):
+                    # numpy is only needed for halls with distancing
+                    from src.models.seat_buffer import BufferMask
+                    buffers = _buffers[state.name] = BufferMask(state.layout, state.snapshot()[1])
+                    writer.listeners.append(buffers.apply)
+                    writer.views['blocked'] = buffers.view
+                    writer.republish()
+                _writers[state.name] = writer
+    return writer
+
+# Get the desirability heap used for single-seat and pair allocation
+def get_seat_heap(state):
+    get_writer(state)
+    return _heaps[state.name]
+
+# Whether the showing's seat heap follows this process's writer (not paused by an
+# import) and the writer has published the latest version
+def heap_is_current(state):
+    writer = _writers.get(state.name)
+    heap = _heaps.get(state.name)
+    return (writer is not None and heap is not None and heap.apply in writer.listeners
+            and writer.published.version == state.version)
+
+# Latest committed seat map of a showing: the one its writer published when
+# that is current (no lock taken), otherwise a copy read from the state file.
+# Reads never start a writer, except to repair a write a crashed writer left torn
+def current_snapshot(state):
+    writer = _writers.get(state.name)
+    if writer is not None:
+        snapshot = writer.published
+        if snapshot.version == state.version:
+            return snapshot
+    snapshot = _snapshots.get(state.name)
+    if snapshot is None or snapshot.version != state.version:
+        try:
+            snapshot = SeatSnapshot(*state.snapshot())
+        except TornWrite:
+            # Raises WriterLocked (503) if another process owns the showing's writer
+            snapshot = get_writer(state).published
+        _snapshots[state.name] = snapshot
+    return snapshot
+
+# Available seats of a snapshot inside a distancing buffer (none without distancing)
+def blocked_seats(state, snapshot):
+    if not any(state.layout.buffer):
+        return ()
+
+    def compute():
+        # numpy is only needed for halls with distancing
+        from src.models.seat_buffer import blocked_available
+        return tuple(blocked_available(state.layout, snapshot.statuses, snapshot.views.get('blocked')).tolist())
+    return snapshot.derive('blocked', compute)
+
+# Create a new showing with its own state file (and a fresh journal)
+def create_showing(showing_id, layout, statuses=None, meta=None):
+    with _states_lock:
+        close_showing(showing_id)
+        rotate_journal(journal_path(showing_id))
+        return open_showing(showing_id, SeatStateFile.create(showing_path(showing_id), layout, statuses, meta))
+
+# List the ids of all showings on disk
+def list_showings():
+    ids = {DEFAULT_SHOWING}
+    if os.path.isdir(SHOWINGS_DIR):
+        ids.update(name[:-len('.seats')] for name in os.listdir(SHOWINGS_DIR) if name.endswith('.seats'))
+    return sorted(ids)
+
+# Get seating data in the {config, pricing, seats} form served by the API
+def get_seating_data(showing_id=DEFAULT_SHOWING):
+    state = get_showing_state(showing_id)
+    if state is None:
+        raise SeatStateError(f"Unknown showing: {showing_id}")
+    return seating_data(state)
+
+def seating_data(state, snapshot=None):
+    snapshot = snapshot or current_snapshot(state)
+    with metrics.stage('load'):
+        seats = state.to_seats(snapshot.statuses)
+        # Seats inside a distancing buffer are served as "blocked"
+        for index in blocked_seats(state, snapshot):
+            seats[index // state.layout.columns][index % state.layout.columns]["status"] = "blocked"
+        return {
+            "config": state.layout.config,
+            "pricing": state.layout.pricing,
+            "seats": seats
+        }
+
+# Save seating data, replacing the showing's state file
+def save_seating_data(data, showing_id=DEFAULT_SHOWING):
+    with metrics.stage('save'):
+        layout = compile_layout(data["config"], data["pricing"])
+        state = get_showing_state(showing_id)
+        create_showing(showing_id, layout, encode_statuses(data["seats"]), state.meta if state is not None else None)
+
+# Resolve the showing named by the ?showing= query parameter
+def requested_state():
+    showing_id = request.args.get("showing", DEFAULT_SHOWING)
+    state = get_showing_state(showing_id) if SHOWING_ID_PATTERN.match(showing_id) else None
+    if state is None:
+        abort(make_response(jsonify({"error": f"Unknown showing: {showing_id}"}), 404))
+    return state
+
+def showing_summary(showing_id, state):
+    return {
+        "id": showing_id,
+        "rows": state.layout.rows,
+        "columns": state.layout.columns,
+        "layoutHash": state.layout.hash,
+        "version": state.version,
+        **state.meta
+    }
+
+@seating_bp.route('/showings', methods=['GET'])
+def get_showings():
+    """List all showings"""
+    showings = []
+    for showing_id in list_showings():
+        state = peek_showing(showing_id)
+        if state is not None:
+            showings.append(showing_summary(showing_id, state))
+    return jsonify(showings)
+
+@seating_bp.route('/showings', methods=['POST'])
+def add_showing():
+    """Create a showing, optionally with its own configuration"""
+    request_data = request.json or {}
+    showing_id = str(request_data.get("id", ""))
+    
+    if not SHOWING_ID_PATTERN.match(showing_id):
+        return jsonify({"error": "Showing id must be 1-64 letters, digits, '-' or '_'"}), 400
+    if get_showing_state(showing_id) is not None:
+        return jsonify({"error": f"Showing {showing_id} already exists"}), 409
+    
+    layout = compile_layout(request_data.get("config", DEFAULT_CONFIG), request_data.get("pricing", DEFAULT_PRICING))
+    meta = {key: request_data[key] for key in ("film", "startsAt") if key in request_data}
+    state = create_showing(showing_id, layout, meta=meta)
+    return jsonify(showing_summary(showing_id, state)), 201
 
 @seating_bp.route('/config', methods=['GET'])
 def get_config():
     """Get seating configuration"""
-    data = get_seating_data()
-    return jsonify({
-        "config": data["config"],
-        "pricing": data["pricing"]
-    })
+    state = requested_state()
+    with metrics.stage('serialize'):
+        return jsonify({
+            "config": state.layout.config,
+            "pricing": state.layout.pricing
+        })
 
 @seating_bp.route('/seats', methods=['GET'])
 def get_seats():
     """Get all seats"""
-    data = get_seating_data()
-    return jsonify(data["seats"])
+    state = requested_state()
+    snapshot = current_snapshot(state)
+
+    # Every reader of a version shares one serialized seat map
+    def serialize():
+        seats = seating_data(state, snapshot)["seats"]
+        with metrics.stage('serialize'):
+            return current_app.json.dumps(seats)
+    body = snapshot.derive('seats.json', serialize)
+    return current_app.response_class(body, mimetype='application/json',
+                                      headers={SEATS_VERSION_HEADER: str(snapshot.version)})
 
 @seating_bp.route('/seats', methods=['POST'])
 def update_seats():
     """Update seats (used for booking or admin changes)"""
-    data = get_seating_data()
+    state = requested_state()
     request_data = request.json
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        return jsonify({"success": False, "error": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"}), 400
+
+    # Bookings made with ?user=<id> are added to that user's booking history
+    user_id = request.args.get("user")
+    if user_id is not None:
+        from src.routes.user import record_booking, user_exists
+        if not user_id.isdigit() or not user_exists(int(user_id)):
+            return jsonify({"success": False, "error": f"Unknown user: {user_id}"}), 404
+        user_id = int(user_id)
+    # Recorded once validated, against the seat map it was checked against
+    recorded_data = partial(seating_data, state, current_snapshot(state))
     
-    # Update seats based on request
+    # Collect the seat updates from the request
+    updates = []
     for seat_update in request_data:
         row = seat_update.get("row")
         col = seat_update.get("col")
         status = seat_update.get("status")
         
         if row is not None and col is not None and status is not None:
-            data["seats"][row][col]["status"] = status
+            updates.append((row, col, status))
     
-    # Save updated data
-    save_seating_data(data)
-    return jsonify({"success": True})
+    # The showing's writer checks and commits the updates atomically
+    try:
+        version = get_writer(state).submit(updates, key).result(timeout=WRITE_TIMEOUT)
+    except IdempotencyKeyReused as error:
+        return jsonify({"success": False, "error": str(error)}), 422
+    except BookingConflict as conflict:
+        replay.record(recorded_data, 'rejected', state.name, seats=request_data, conflicts=conflict.seats)
+        return jsonify({"success": False, "error": str(conflict), "conflicts": conflict.seats}), 409
+    except SeatStateError as error:
+        replay.record(recorded_data, 'rejected', state.name, seats=request_data, error=str(error))
+        return jsonify({"success": False, "error": str(error)}), 400
+    except FutureTimeout:
+        return writer_unavailable(WRITE_TIMED_OUT, 'timeout')
+    replay.record(recorded_data, 'update', state.name, version=version,
+                  seats=[{"row": row, "col": col, "status": status} for row, col, status in updates])
+
+    booked = [state.layout.seat(row, col) for row, col, status in updates if status == "booked"]
+    if user_id is not None and booked:
+        booking = record_booking(user_id, state.name, booked, version, key)
+        return jsonify({"success": True, "version": version, "bookingId": booking.id})
+    return jsonify({"success": True, "version": version})
 
 @seating_bp.route('/best-seats', methods=['POST'])
 def find_best_seats():
     """Find best seats for a group"""
-    data = get_seating_data()
+    state = requested_state()
     request_data = request.json
     
     group_size = request_data.get("groupSize", 1)
     seat_type = request_data.get("seatType", "any")
     
-    # Call the seating algorithm to find best seats
-    best_seats = find_best_seats_for_group(data["seats"], data["config"], group_size, seat_type)
+    if any(state.layout.buffer) and isinstance(group_size, int) and not isinstance(group_size, bool) \
+            and group_size >= 1:
+        # With distancing, blocks are searched on the seat map with its buffers filled in
+        with metrics.stage('search'):
+            best_seats = buffered_best_seats(state, group_size, seat_type)
+    elif isinstance(group_size, int) and 1 <= group_size <= HEAP_GROUP_SIZE and heap_is_current(state):
+        # Singles and pairs come straight off the showing's desirability heap
+        # (only up to date in the process that owns the showing's writer, outside imports)
+        with metrics.stage('search'):
+            best_seats = get_seat_heap(state).best_seats(group_size, seat_type)
+    else:
+        # Call the seating algorithm to find best seats
+        data = seating_data(state)
+        with metrics.stage('search'):
+            best_seats = find_best_seats_for_group(data["seats"], data["config"], group_size, seat_type)
+    metrics.inc('seating_best_seat_searches_total', help_text='Best-seat searches by result',
+                result='found' if best_seats else 'none')
+    if isinstance(group_size, int) and not isinstance(group_size, bool) and group_size >= 1:
+        replay.record(partial(seating_data, state), 'best_seats', state.name, groupSize=group_size,
+                      seatType=seat_type)
     
-    return jsonify(best_seats)
+    with metrics.stage('serialize'):
+        return jsonify(best_seats)
+
+# Best block of a showing with distancing, falling back to any seat type like the other searches
+def buffered_best_seats(state, group_size, seat_type):
+    import numpy as np
+    from src.models.showing_search import NO_MATCH, best_windows
+
+    snapshot = current_snapshot(state)
+    layout = state.layout
+    grid = np.frombuffer(snapshot.statuses, dtype=np.uint8).copy()
+    grid[list(blocked_seats(state, snapshot))] = DISABLED
+    grid = grid.reshape(1, layout.rows, layout.columns)
+    for search_type in dict.fromkeys((seat_type, 'any')):
+        scores, first_seats = best_windows(layout, grid, group_size, search_type)
+        if scores[0] != NO_MATCH:
+            row, col = divmod(int(first_seats[0]), layout.columns)
+            return [layout.seat(row, col + k) for k in range(group_size)]
+    return []
+
+# Parse an ISO 8601 start time, or None if it isn't one
+def parse_start(value):
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+# Ids and state files (or copies of them) of the showings a cross-showing search should consider
+def search_candidates(film=None, starts_from=None, starts_to=None):
+    candidates = []
+    for showing_id in list_showings():
+        state = peek_showing(showing_id)
+        if state is None:
+            continue
+        if film is not None and str(state.meta.get("film", "")).casefold() != film.casefold():
+            continue
+        if starts_from is not None or starts_to is not None:
+            starts_at = parse_start(state.meta.get("startsAt", ""))
+            if starts_at is None:
+                continue
+            try:
+                if (starts_from is not None and starts_at < starts_from) or \
+                        (starts_to is not None and starts_at > starts_to):
+                    continue
+            except TypeError:
+                # Offset-aware vs naive times can't be compared
+                continue
+        candidates.append((showing_id, state))
+    return candidates
+
+@seating_bp.route('/search', methods=['POST'])
+def search_across_showings():
+    """Find the showings with the best seats for a group"""
+    request_data = request.json or {}
+    group_size = request_data.get("groupSize", 1)
+    seat_type = request_data.get("seatType", "any")
+    limit = request_data.get("limit", SEARCH_LIMIT)
+    if not isinstance(group_size, int) or isinstance(group_size, bool) or group_size < 1:
+        return jsonify({"error": "groupSize must be a positive integer"}), 400
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_SEARCH_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_LIMIT}"}), 400
+
+    window = {}
+    for key in ("from", "to"):
+        if request_data.get(key) is not None:
+            window[key] = parse_start(request_data[key])
+            if window[key] is None:
+                return jsonify({"error": f"{key} must be an ISO 8601 date-time"}), 400
+
+    # numpy is only needed here, so it stays off the startup path
+    from src.models.showing_search import search_showings as search
+
+    with metrics.stage('search'):
+        candidates = search_candidates(request_data.get("film"), window.get("from"), window.get("to"))
+        results = search(candidates, group_size, seat_type, limit)
+    metrics.inc('seating_showing_searches_total', help_text='Cross-showing searches by result',
+                result='found' if results else 'none')
+
+    with metrics.stage('serialize'):
+        return jsonify({"results": results, "showingsSearched": len(candidates)})
 
 def find_best_seats_for_group(seats, config, group_size, seat_type):
     """Algorithm to find best seats for a group"""
@@ -158,14 +565,18 @@ def find_best_seats_for_group(seats, config, group_size, seat_type):
     middle_row = config["rows"] // 2
     row_priority = sorted(range(config["rows"]), key=lambda i: abs(middle_row - i))
     
+    # Rows that can hold the requested seat type, computed once per search
+    vip_rows = set(config["vipRows"])
+    accessible_rows = {seat["row"] for seat in config["accessibleSeats"]}
+    
     # Check each row for consecutive available seats
     for row_index in row_priority:
         row = seats[row_index]
         
         # Skip if we're looking for specific seat types that don't match this row
-        if seat_type == 'vip' and row_index not in config["vipRows"]:
+        if seat_type == 'vip' and row_index not in vip_rows:
             continue
-        if seat_type == 'accessible' and not any(seat["row"] == row_index for seat in config["accessibleSeats"]):
+        if seat_type == 'accessible' and row_index not in accessible_rows:
             continue
         
         # Find consecutive available seats in this row
@@ -232,41 +643,227 @@ def find_consecutive_available_seats(row, config, group_size, seat_type):
 @seating_bp.route('/reset', methods=['POST'])
 def reset_seats():
     """Reset all seats to available (admin function)"""
-    data = get_seating_data()
-    
+    state = requested_state()
+    recorded_data = partial(seating_data, state, current_snapshot(state))
+    writer = get_writer(state)
+
+    # Keep the bookings being cleared in the occupancy archive: the writer
+    # archives exactly the seat map it resets, and only if it resets it
+    def archive(snapshot):
+        if BOOKED in snapshot.statuses:
+            archive_showing(state, snapshot.statuses)
+
     # Reset all seats to available
-    for row in data["seats"]:
-        for seat in row:
-            seat["status"] = "available"
-    
-    # Save updated data
-    save_seating_data(data)
+    try:
+        writer.reset(before=archive).result(timeout=WRITE_TIMEOUT)
+    except FutureTimeout:
+        return writer_unavailable(WRITE_TIMED_OUT, 'timeout')
+    replay.record(recorded_data, 'reset', state.name)
+    metrics.inc('seating_resets_total', help_text='Admin resets of the seat map')
     return jsonify({"success": True})
 
+# numpy is only needed by the archive, so it stays off the startup path
+def occupancy_archive():
+    from src.models.occupancy_archive import OccupancyArchive
+    return OccupancyArchive(ARCHIVE_DIR)
+
+# Append a showing's final statuses and booking times to the archive of its layout
+def archive_showing(state, statuses=None):
+    with metrics.stage('archive'):
+        record = occupancy_archive().archive(state.name, state, journal_path(state.name), statuses=statuses)
+    metrics.inc('seating_showings_archived_total', help_text='Showings added to the occupancy archive')
+    return record
+
+# Load the archived showings of a layout named in the URL (optionally ?film=)
+def archived_showings(layout_hash):
+    if not LAYOUT_HASH_PATTERN.match(layout_hash):
+        abort(make_response(jsonify({"error": f"Unknown layout: {layout_hash}"}), 404))
+    try:
+        with metrics.stage('load'):
+            return occupancy_archive().load(layout_hash, request.args.get("film"))
+    except (OSError, ValueError):
+        abort(make_response(jsonify({"error": f"No archived showings for layout {layout_hash}"}), 404))
+
+@seating_bp.route('/archive', methods=['POST'])
+def archive_current_showing():
+    """Archive a finished showing's bookings for occupancy analytics"""
+    state = requested_state()
+    record = archive_showing(state)
+    return jsonify({"layoutHash": state.layout.hash, **record}), 201
+
+@seating_bp.route('/archive', methods=['GET'])
+def get_archived_layouts():
+    """List archived layouts and how many showings each has"""
+    return jsonify(occupancy_archive().layouts())
+
+@seating_bp.route('/archive/<layout_hash>/heatmap', methods=['GET'])
+def get_archive_heatmap(layout_hash):
+    """Share of archived showings in which each seat sold"""
+    from src.models.occupancy_archive import heatmap
+    layout, showings, statuses, _ = archived_showings(layout_hash)
+    with metrics.stage('aggregate'):
+        grid = heatmap(layout, statuses)
+    return jsonify({"layoutHash": layout_hash, "showings": len(showings), "soldFraction": grid})
+
+@seating_bp.route('/archive/<layout_hash>/sell-through', methods=['GET'])
+def get_archive_sell_through(layout_hash):
+    """How early each seat sells across archived showings"""
+    from src.models.occupancy_archive import sell_through
+    layout, showings, _, sold_after = archived_showings(layout_hash)
+    with metrics.stage('aggregate'):
+        result = sell_through(layout, sold_after)
+    return jsonify({"layoutHash": layout_hash, "showings": len(showings), **result})
+
+@seating_bp.route('/archive/<layout_hash>/fill-curve', methods=['GET'])
+def get_archive_fill_curve(layout_hash):
+    """Fill rate over time since sales opened, and time to sellout"""
+    from src.models.occupancy_archive import fill_curve
+    bucket_seconds = request.args.get("bucket", 3600, type=float)
+    buckets = request.args.get("buckets", 48, type=int)
+    if not bucket_seconds > 0 or not 1 <= buckets <= 1000:
+        return jsonify({"error": "bucket must be positive and buckets between 1 and 1000"}), 400
+    _, showings, statuses, sold_after = archived_showings(layout_hash)
+    with metrics.stage('aggregate'):
+        result = fill_curve(statuses, sold_after, bucket_seconds, buckets)
+    return jsonify({"layoutHash": layout_hash, "showings": len(showings), **result})
+
+# Read the format, time window and showing of an export request (used by the shard router too)
+def export_params():
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in bookings_io.FORMATS:
+        abort(make_response(jsonify({"error": f"format must be one of {sorted(bookings_io.FORMATS)}"}), 400))
+    window = {}
+    for key in ("from", "to"):
+        if request.args.get(key):
+            try:
+                window[key] = bookings_io.parse_time(request.args[key])
+            except ValueError:
+                abort(make_response(jsonify({"error": f"{key} must be an ISO 8601 date-time"}), 400))
+    showing_id = request.args.get("showing")
+    if showing_id is not None and not SHOWING_ID_PATTERN.match(showing_id):
+        abort(make_response(jsonify({"error": f"Unknown showing: {showing_id}"}), 404))
+    return fmt, window.get("from"), window.get("to"), showing_id
+
+# Stream booking events from the journals under a showings directory as NDJSON or CSV
+def export_response(showings_dir, fmt, start, end, showing_id):
+    lines = bookings_io.export_lines(bookings_io.booking_events(showings_dir, start, end, showing_id), fmt)
+    metrics.inc('seating_booking_exports_total', help_text='Booking exports started by format', format=fmt)
+    return Response(stream_with_context(lines), mimetype=bookings_io.FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename=bookings.{fmt}"})
+
+@seating_bp.route('/bookings/export', methods=['GET'])
+def export_bookings():
+    """Stream booked/released seat events, optionally for a time window (?from=&to=) or one showing"""
+    return export_response(SHOWINGS_DIR, *export_params())
+
+def bulk_import(rows, summary, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Apply (showing, row, col, status) rows through each showing's writer in batches
+
+    Rows are buffered per showing and committed batch_size at a time, so a
+    large import is a few journal writes rather than one per seat. The
+    showings' desirability heaps stop following the writers while the
+    import runs (best-seats uses the full search meanwhile) and are rebuilt
+    once from the final seat map by each writer's thread. Seats that
+    are no longer available are left out of their batch and counted as
+    conflicts.
+    """
+    pending = {}
+    paused = {}
+
+    def commit(showing_id, updates):
+        state = get_showing_state(showing_id)
+        if state is None:
+            for _ in updates:
+                summary.error(f"unknown showing {showing_id!r}")
+            return
+        writer = get_writer(state)
+        if showing_id not in paused:
+            heap = get_seat_heap(state)
+            paused[showing_id] = (writer, heap)
+            writer.listeners = [listener for listener in writer.listeners if listener != heap.apply]
+        layout = state.layout
+        valid = []
+        for row, col, status in updates:
+            if not (0 <= row < layout.rows and 0 <= col < layout.columns) or status not in STATUS_CODES:
+                summary.error(f"{showing_id}: invalid seat update ({row}, {col}, {status!r})")
+            else:
+                valid.append((row, col, status))
+        while valid:
+            try:
+                writer.submit(valid).result(timeout=WRITE_TIMEOUT)
+            except BookingConflict as conflict:
+                taken = {(seat["row"], seat["col"]) for seat in conflict.seats}
+                summary.conflicts += sum((row, col) in taken for row, col, _ in valid)
+                valid = [update for update in valid if (update[0], update[1]) not in taken]
+                continue
+            summary.imported += len(valid)
+            summary.showings.add(showing_id)
+            break
+
+    try:
+        with metrics.stage('import'):
+            for showing_id, row, col, status in rows:
+                if not SHOWING_ID_PATTERN.match(showing_id):
+                    summary.error(f"invalid showing id {showing_id!r}")
+                    continue
+                batch = pending.setdefault(showing_id, [])
+                batch.append((row, col, status))
+                if len(batch) >= batch_size:
+                    commit(showing_id, pending.pop(showing_id))
+            for showing_id, batch in pending.items():
+                commit(showing_id, batch)
+    finally:
+        # One heap rebuild per showing instead of one update per batch, done by
+        # the writer thread so no batch lands between the rebuild and the reattach
+        wait([writer.add_listener(heap.apply) for writer, heap in paused.values()], timeout=WRITE_TIMEOUT)
+    metrics.inc('seating_bookings_imported_total', summary.imported, help_text='Seat updates applied by bulk imports')
+    return summary
+
+@seating_bp.route('/bookings/import', methods=['POST'])
+def import_bookings():
+    """Apply bookings from an NDJSON or CSV request body in batches"""
+    fmt = request.args.get("format") or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    batch_size = request.args.get("batchSize", IMPORT_BATCH_SIZE, type=int)
+    if fmt not in bookings_io.FORMATS:
+        return jsonify({"error": f"format must be one of {sorted(bookings_io.FORMATS)}"}), 400
+    if not 1 <= batch_size <= MAX_IMPORT_BATCH_SIZE:
+        return jsonify({"error": f"batchSize must be between 1 and {MAX_IMPORT_BATCH_SIZE}"}), 400
+
+    # Read the body as it arrives instead of loading it whole
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    summary = bookings_io.ImportSummary()
+    try:
+        bulk_import(bookings_io.import_rows(lines, fmt, summary), summary, batch_size)
+    except FutureTimeout:
+        # Rows committed before the timeout stay imported
+        return writer_unavailable(WRITE_TIMED_OUT, 'timeout', summary=summary.to_dict())
+    return jsonify(summary.to_dict())
+
 @seating_bp.route('/stats', methods=['GET'])
 def get_stats():
     """Get seating statistics"""
-    data = get_seating_data()
-    
-    total_seats = 0
-    available_seats = 0
-    booked_seats = 0
+    state = requested_state()
     
-    # Count seats by status
-    for row in data["seats"]:
-        for seat in row:
-            total_seats += 1
-            if seat["status"] == "available":
-                available_seats += 1
-            elif seat["status"] == "booked":
-                booked_seats += 1
+    # Count seats by status straight from the status bytes, once per version
+    snapshot = current_snapshot(state)
+    with metrics.stage('load'):
+        statuses = snapshot.statuses
+        total_seats = len(statuses)
+        booked_seats, available_seats, blocked_count = snapshot.derive('counts', lambda: (
+            statuses.count(BOOKED), statuses.count(AVAILABLE), len(blocked_seats(state, snapshot))))
+    # Seats kept empty by distancing buffers can't be sold
+    available_seats -= blocked_count
     
     # Calculate occupancy rate
     occupancy_rate = (booked_seats / total_seats) * 100 if total_seats > 0 else 0
     
-    return jsonify({
-        "totalSeats": total_seats,
-        "availableSeats": available_seats,
-        "bookedSeats": booked_seats,
-        "occupancyRate": round(occupancy_rate, 1)
-    })
+    with metrics.stage('serialize'):
+        return jsonify({
+            "totalSeats": total_seats,
+            "availableSeats": available_seats,
+            "bookedSeats": booked_seats,
+            "blockedSeats": blocked_count,
+            "occupancyRate": round(occupancy_rate, 1),
+            "version": snapshot.version
+        })
@@ -1,16 +1,81 @@
-from flask import Blueprint, jsonify, request
-from src.models.user import User, db
+from flask import Blueprint, abort, jsonify, make_response, request
+from sqlalchemy.exc import IntegrityError
+from src.models.user import Booking, BookingSeat, User, db, ensure_schema
 
 user_bp = Blueprint('user', __name__)
 
+# Page size of the listing endpoints by default and at most
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+@user_bp.before_request
+def create_tables():
+    ensure_schema()
+
+# Read the keyset cursor and page size of a listing request (400 when either is malformed)
+def page_params(cursor_name):
+    cursor = request.args.get(cursor_name)
+    if cursor is not None:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            abort(make_response(jsonify({'error': f'{cursor_name} must be an integer'}), 400))
+    try:
+        limit = int(request.args.get('limit', PAGE_SIZE))
+    except ValueError:
+        limit = None
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        abort(make_response(jsonify({'error': f'limit must be an integer from 1 to {MAX_PAGE_SIZE}'}), 400))
+    return cursor, limit
+
+# Fetch one row more than a page to know whether there is a next page
+def page(query, order_column, limit, key, name):
+    rows = query.order_by(order_column).limit(limit + 1).all()
+    items = rows[:limit]
+    return jsonify({
+        name: [item.to_dict() for item in items],
+        'nextCursor': key(items[-1]) if len(rows) > limit else None
+    })
+
+def keyed_booking(user_id, idempotency_key):
+    return Booking.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+
+# Record the seats a user booked in a committed request (retries with the same key record nothing)
+def record_booking(user_id, showing_id, seats, version, idempotency_key=None):
+    ensure_schema()
+    if idempotency_key is not None:
+        existing = keyed_booking(user_id, idempotency_key)
+        if existing is not None:
+            return existing
+    booking = Booking(user_id=user_id, showing_id=showing_id, version=version, idempotency_key=idempotency_key,
+                      seats=[BookingSeat(row=seat['row'], col=seat['col'], seat_id=seat['id']) for seat in seats])
+    db.session.add(booking)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key recorded the booking first
+        db.session.rollback()
+        existing = keyed_booking(user_id, idempotency_key) if idempotency_key is not None else None
+        if existing is None:
+            raise
+        return existing
+    return booking
+
+def user_exists(user_id):
+    ensure_schema()
+    return db.session.get(User, user_id) is not None
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    after, limit = page_params('after')
+    query = User.query
+    if after is not None:
+        query = query.filter(User.id > after)
+    return page(query, User.id, limit, lambda user: user.id, 'users')
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
-    
+
     data = request.json
     user = User(username=data['username'], email=data['email'])
     db.session.add(user)
@@ -37,3 +102,27 @@ def delete_user(user_id):
     db.session.delete(user)
     db.session.commit()
     return '', 204
+
+@user_bp.route('/users/<int:user_id>/bookings', methods=['GET'])
+def get_user_bookings(user_id):
+    """Booking history of a user, newest first, optionally for one showing"""
+    db.get_or_404(User, user_id)
+    before, limit = page_params('before')
+    query = Booking.query.filter(Booking.user_id == user_id)
+    if request.args.get('showing'):
+        query = query.filter(Booking.showing_id == request.args['showing'])
+    if before is not None:
+        query = query.filter(Booking.id < before)
+    return page(query, Booking.id.desc(), limit, lambda booking: booking.id, 'bookings')
+
+@user_bp.route('/bookings', methods=['GET'])
+def get_showing_bookings():
+    """Bookings of a showing, newest first"""
+    showing_id = request.args.get('showing')
+    if not showing_id:
+        return jsonify({'error': 'showing is required'}), 400
+    before, limit = page_params('before')
+    query = Booking.query.filter(Booking.showing_id == showing_id)
+    if before is not None:
+        query = query.filter(Booking.id < before)
+    return page(query, Booking.id.desc(), limit, lambda booking: booking.id, 'bookings')
@@ -0,0 +1,291 @@
+"""
+Sharding showings across worker processes
+
+With SEATING_SHARDS=N (N > 1) the app starts N worker processes. Each one
+owns the showings whose id hashes to it: only that worker opens their
+writers and holds their seat maps in memory. The `/api/*` blueprint of the
+front process is then replaced by a router that forwards every request to
+the owning worker over a local Unix socket (multiprocessing.connection)
+and relays the response. There is no cross-process locking on the booking
+path because each showing has exactly one writer process.
+
+Requests are routed by the `?showing=` query parameter (or the "id" of a
+new showing on POST /api/showings); requests without one go to the owner of
+the default showing. GET /api/showings and POST /api/search are sent to
+every worker and merged. Booking exports are streamed by the router itself
+straight from the journals; bulk imports are split by owner and forwarded
+in chunks.
+"""
+import atexit
+import io
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from multiprocessing.connection import Client, Listener
+
+from flask import Blueprint, Response, jsonify, request
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+DEFAULT_SHOWING = 'default'
+CONNECT_TIMEOUT = 30
+
+# Environment of the worker processes: they serve the seating blueprint
+# themselves, and rate limiting and the waiting room run once, in the router
+WORKER_ENVIRONMENT = {'SEATING_SHARDS': '1', 'SEATING_RATE_LIMIT': '0', 'SEATING_WAITING_ROOM': '0'}
+
+# Hop-by-hop headers that must not be relayed
+SKIPPED_HEADERS = {'host', 'content-length', 'transfer-encoding', 'connection'}
+
+# Rows of a bulk import forwarded to a worker in one request
+IMPORT_CHUNK_ROWS = 20000
+
+
+def configured_shards():
+    """Number of worker processes requested with SEATING_SHARDS (1 = no sharding)"""
+    # Worker processes (and spawn's re-import of __main__) never shard again
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return max(1, int(os.environ.get('SEATING_SHARDS', '1')))
+
+
+def shard_for(showing_id, shards):
+    """Index of the worker that owns a showing"""
+    return zlib.crc32(showing_id.encode()) % shards
+
+
+def worker_main(address, data_dir):
+    """Entry point of a worker process: serve forwarded requests from the router"""
+    from src.main import app
+    from src.routes import seating
+
+    if data_dir:
+        seating.configure_storage(data_dir)
+
+    listener = Listener(address, family='AF_UNIX')
+
+    # Exit with the router, even when it is killed without running atexit
+    def watch_parent():
+        multiprocessing.parent_process().join()
+        os._exit(0)
+
+    threading.Thread(target=watch_parent, daemon=True).start()
+
+    def serve(connection):
+        client = app.test_client()
+        with connection:
+            while True:
+                try:
+                    method, path, query_string, headers, body = connection.recv()
+                except (EOFError, OSError):
+                    return
+                response = client.open(path, method=method, query_string=query_string,
+                                       headers=headers, data=body)
+                connection.send((response.status_code,
+                                 [(k, v) for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS],
+                                 response.get_data()))
+
+    while True:
+        connection = listener.accept()
+        threading.Thread(target=serve, args=(connection,), daemon=True).start()
+
+
+class ShardRouter:
+    """Starts the worker processes and forwards requests to them"""
+
+    def __init__(self, shards, data_dir=None):
+        self.shards = shards
+        self.data_dir = data_dir
+        self.socket_dir = tempfile.mkdtemp(prefix='seating-shards-')
+        self.addresses = [os.path.join(self.socket_dir, f'worker-{i}.sock') for i in range(shards)]
+        self.pools = [queue.LifoQueue() for _ in range(shards)]
+        context = multiprocessing.get_context('spawn')
+        self.processes = [context.Process(target=worker_main, args=(address, data_dir),
+                                          name=f'seating-shard-{i}', daemon=True)
+                          for i, address in enumerate(self.addresses)]
+        # Spawned children inherit the environment as it is at start()
+        saved = {name: os.environ.get(name) for name in WORKER_ENVIRONMENT}
+        os.environ.update(WORKER_ENVIRONMENT)
+        try:
+            for process in self.processes:
+                process.start()
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        atexit.register(self.close)
+
+    def _connect(self, shard):
+        # Workers create their sockets after start-up; wait for them
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return Client(self.addresses[shard], family='AF_UNIX')
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline or not self.processes[shard].is_alive():
+                    raise
+                time.sleep(0.05)
+
+    def forward(self, shard, method, path, query_string, headers, body):
+        """Send one request to a worker and return (status, headers, body)"""
+        try:
+            connection = self.pools[shard].get_nowait()
+        except queue.Empty:
+            connection = self._connect(shard)
+        try:
+            connection.send((method, path, query_string, headers, body))
+            result = connection.recv()
+        except Exception:
+            connection.close()
+            raise
+        self.pools[shard].put(connection)
+        return result
+
+    def close(self):
+        for pool in self.pools:
+            while not pool.empty():
+                pool.get_nowait().close()
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=5)
+        shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+
+def requested_showing():
+    """Showing id a request is about"""
+    showing_id = request.args.get("showing")
+    if showing_id is None and request.method == 'POST' and request.path.rstrip('/').endswith('/showings'):
+        showing_id = str((request.get_json(silent=True) or {}).get("id", ""))
+    return showing_id or DEFAULT_SHOWING
+
+
+def create_router_blueprint(router):
+    """Blueprint that stands in for seating_bp and forwards to the shard owners"""
+    from src import admission, rate_limit
+
+    router_bp = Blueprint('router', __name__)
+    # Rate limiting runs first so abusive clients never take a waiting-room ticket
+    rate_limit.install(router_bp)
+    admission.install(router_bp)
+
+    @router_bp.route('/showings', methods=['GET'])
+    def get_showings():
+        """List showings by asking every worker and keeping each owner's answer"""
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in SKIPPED_HEADERS]
+        showings = []
+        for shard in range(router.shards):
+            try:
+                status, _, body = router.forward(shard, 'GET', request.path, request.query_string.decode(),
+                                                 headers, b'')
+            except (EOFError, OSError):
+                return jsonify({"error": f"Shard worker {shard} is unavailable"}), 502
+            if status != 200:
+                return Response(body, status=status, mimetype='application/json')
+            showings.extend(showing for showing in json.loads(body)
+                            if shard_for(showing["id"], router.shards) == shard)
+        showings.sort(key=lambda showing: showing["id"])
+        return jsonify(showings)
+
+    @router_bp.route('/search', methods=['POST'])
+    def search_across_showings():
+        """Search every worker and merge the owners' results in rank order"""
+        from src.models.showing_search import rank_key
+
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in SKIPPED_HEADERS]
+        body = request.get_data()
+        results, searched = [], 0
+        for shard in range(router.shards):
+            try:
+                status, _, response = router.forward(shard, 'POST', request.path, '', headers, body)
+            except (EOFError, OSError):
+                return jsonify({"error": f"Shard worker {shard} is unavailable"}), 502
+            if status != 200:
+                return Response(response, status=status, mimetype='application/json')
+            answer = json.loads(response)
+            # Every worker sees every showing on disk; only the owner's view is current
+            searched = answer["showingsSearched"]
+            results.extend(result for result in answer["results"]
+                           if shard_for(result["showing"], router.shards) == shard)
+        results.sort(key=rank_key)
+        limit = (request.get_json(silent=True) or {}).get("limit", len(results))
+        return jsonify({"results": results[:limit], "showingsSearched": searched})
+
+    @router_bp.route('/bookings/export', methods=['GET'])
+    def export_bookings():
+        """Stream the export from the journals here rather than buffering a worker's response"""
+        from src.routes import seating
+        showings_dir = os.path.join(router.data_dir, 'showings') if router.data_dir else seating.SHOWINGS_DIR
+        return seating.export_response(showings_dir, *seating.export_params())
+
+    @router_bp.route('/bookings/import', methods=['POST'])
+    def import_bookings():
+        """Split an import by owning worker and forward it in NDJSON chunks"""
+        from src import bookings_io
+        from src.routes import seating
+
+        fmt = request.args.get("format") or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+        if fmt not in bookings_io.FORMATS:
+            return jsonify({"error": f"format must be one of {sorted(bookings_io.FORMATS)}"}), 400
+        headers = [(k, v) for k, v in request.headers.items()
+                   if k.lower() not in SKIPPED_HEADERS and k.lower() != 'content-type']
+        query = f"format=ndjson&batchSize={request.args.get('batchSize', seating.IMPORT_BATCH_SIZE)}"
+        summary = bookings_io.ImportSummary()
+        chunks = [[] for _ in range(router.shards)]
+
+        def send(shard):
+            body = ''.join(chunks[shard]).encode()
+            chunks[shard] = []
+            try:
+                status, _, response = router.forward(shard, 'POST', request.path, query, headers, body)
+            except (EOFError, OSError):
+                return jsonify({"error": f"Shard worker {shard} is unavailable"}), 502
+            if status != 200:
+                return Response(response, status=status, mimetype='application/json')
+            answer = json.loads(response)
+            summary.imported += answer["imported"]
+            summary.conflicts += answer["conflicts"]
+            summary.showings.update(answer["showings"])
+            summary.failed += answer["failed"] - len(answer["errors"])
+            for message in answer["errors"]:
+                summary.error(message)
+            return None
+
+        lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        for showing_id, row, col, status in bookings_io.import_rows(lines, fmt, summary):
+            shard = shard_for(showing_id, router.shards)
+            chunks[shard].append(json.dumps({"showing": showing_id, "row": row, "col": col, "status": status}) + '\n')
+            if len(chunks[shard]) >= IMPORT_CHUNK_ROWS:
+                error = send(shard)
+                if error is not None:
+                    return error
+        for shard in range(router.shards):
+            if chunks[shard]:
+                error = send(shard)
+                if error is not None:
+                    return error
+        return jsonify(summary.to_dict())
+
+    @router_bp.route('/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+    def forward(path):
+        """Forward an API request to the worker owning its showing"""
+        shard = shard_for(requested_showing(), router.shards)
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in SKIPPED_HEADERS]
+        try:
+            status, response_headers, body = router.forward(
+                shard, request.method, request.path, request.query_string.decode(), headers, request.get_data())
+        except (EOFError, OSError):
+            return jsonify({"error": f"Shard worker {shard} is unavailable"}), 502
+        return Response(body, status=status, headers=response_headers)
+
+    return router_bp
@@ -0,0 +1,340 @@
+"""
+Monte-Carlo simulation of seat allocation policies
+
+Each simulated showing starts from an empty hall and serves a seeded,
+synthetic stream of arriving groups (group size and seat-type preference
+drawn from weighted distributions) until the stream is exhausted. Every
+group is offered the block a policy picks and books it; a group the policy
+can't place is turned away. Showings are independent, so they run in
+parallel across a process pool, and every policy sees the same arrival
+streams (showing i uses seed + i) so differences come from the policy alone.
+
+Policies:
+    basic          best-seat search of routes/seating.py
+    heap           what POST /api/best-seats serves: the seat heap of
+                   models/seat_heap.py for singles and pairs, basic otherwise
+    improved       best-seat search of routes/improved_seating.py
+    basic-nogap    basic, turning a group away rather than leave a single-seat gap
+    improved-nogap improved, with the same gap rule
+    windows        vectorized window search of models/showing_search.py
+
+The report gives, per policy, the final occupancy (mean and percentiles),
+stranded single seats (available seats with no available neighbour in their
+aisle segment), revenue, groups seated and turned away, and allocations per
+second of search time.
+
+Usage:
+    python -m src.simulator
+    python -m src.simulator --showings 2000 --workers 8 --policies basic,improved-nogap
+    python -m src.simulator --hall 30x24 --demand 1.5 --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout, hall_config
+from src.models.seat_state import AVAILABLE, BOOKED
+
+POLICIES = ('basic', 'heap', 'improved', 'basic-nogap', 'improved-nogap', 'windows')
+
+# Arrival mix: relative weights of group sizes and seat-type preferences
+GROUP_SIZES = {1: 15, 2: 35, 3: 12, 4: 20, 5: 8, 6: 6, 7: 2, 8: 2}
+SEAT_TYPES = {"any": 85, "vip": 10, "accessible": 5}
+
+# Seats requested by a showing's arrivals, as a multiple of the hall's capacity
+DEFAULT_DEMAND = 1.2
+DEFAULT_SHOWINGS = 200
+PERCENTILES = (5, 50, 95)
+
+
+def arrivals(seed, capacity, demand=DEFAULT_DEMAND, group_sizes=GROUP_SIZES, seat_types=SEAT_TYPES):
+    """Seeded (group size, seat type) stream requesting about `demand` x `capacity` seats"""
+    rng = random.Random(seed)
+    sizes, size_weights = list(group_sizes), list(group_sizes.values())
+    types, type_weights = list(seat_types), list(seat_types.values())
+    stream = []
+    requested = 0
+    while requested < capacity * demand:
+        group_size = rng.choices(sizes, size_weights)[0]
+        stream.append((group_size, rng.choices(types, type_weights)[0]))
+        requested += group_size
+    return stream
+
+
+def stranded_seats(layout, statuses):
+    """Available seats with no available neighbour in their aisle segment"""
+    count = 0
+    for row in range(layout.rows):
+        base = row * layout.columns
+        for start, end in layout.segments:
+            for col in range(start, end):
+                if statuses[base + col] != AVAILABLE:
+                    continue
+                left = col > start and statuses[base + col - 1] == AVAILABLE
+                right = col < end - 1 and statuses[base + col + 1] == AVAILABLE
+                if not left and not right:
+                    count += 1
+    return count
+
+
+def single_gaps(layout, statuses, rows):
+    """Available seats in `rows` with taken seats on both sides, within their aisle segment"""
+    count = 0
+    for row in rows:
+        base = row * layout.columns
+        for start, end in layout.segments:
+            for index in range(base + start + 1, base + end - 1):
+                if statuses[index] == AVAILABLE and statuses[index - 1] != AVAILABLE \
+                        and statuses[index + 1] != AVAILABLE:
+                    count += 1
+    return count
+
+
+class Showing:
+    """One simulated showing: the dict seat map the search functions read and its status codes"""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.seats = layout.build_seats()
+        self.statuses = bytearray(layout.size)
+        # SeatHeap kept up to date with every booking, for the heap policy
+        self.heap = None
+
+    def book(self, block):
+        changes = []
+        for seat in block:
+            self.seats[seat["row"]][seat["col"]]["status"] = "booked"
+            index = self.layout.index(seat["row"], seat["col"])
+            self.statuses[index] = BOOKED
+            changes.append((index, BOOKED))
+        if self.heap is not None:
+            self.heap.apply(changes)
+
+    def leaves_gap(self, block):
+        """
+        Whether booking the block would leave a new single-seat gap
+
+        Same rule as SeatingModel.would_create_single_gap: an available seat
+        with taken seats on both sides of it, within its aisle segment.
+        """
+        rows = {seat["row"] for seat in block}
+        after = bytearray(self.statuses)
+        for seat in block:
+            after[self.layout.index(seat["row"], seat["col"])] = BOOKED
+        return single_gaps(self.layout, after, rows) > single_gaps(self.layout, self.statuses, rows)
+
+
+def windows_search(showing, group_size, seat_type):
+    """Best block from the vectorized window search, falling back to any seat type"""
+    import numpy as np
+    from src.models.showing_search import NO_MATCH, best_windows
+
+    layout = showing.layout
+    grid = np.frombuffer(bytes(showing.statuses), dtype=np.uint8).reshape(1, layout.rows, layout.columns)
+    for search_type in dict.fromkeys((seat_type, 'any')):
+        scores, first_seats = best_windows(layout, grid, group_size, search_type)
+        if scores[0] != NO_MATCH:
+            row, col = divmod(int(first_seats[0]), layout.columns)
+            return [showing.seats[row][col + k] for k in range(group_size)]
+    return []
+
+
+def heap_search(showing, group_size, seat_type):
+    """Best block as the API picks it: singles and pairs off the seat heap, larger groups by the basic search"""
+    from src.models.seat_heap import MAX_GROUP_SIZE, SeatHeap
+    from src.routes.seating import find_best_seats_for_group
+
+    if group_size > MAX_GROUP_SIZE:
+        return find_best_seats_for_group(showing.seats, showing.layout.config, group_size, seat_type)
+    if showing.heap is None:
+        showing.heap = SeatHeap(showing.layout, showing.statuses)
+    return showing.heap.best_seats(group_size, seat_type)
+
+
+def policy_search(policy):
+    """(search(showing, group_size, seat_type), gap rule) of a policy"""
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy: {policy!r}")
+    if policy == 'windows':
+        return windows_search, False
+    if policy == 'heap':
+        return heap_search, False
+    if policy.startswith('improved'):
+        from src.routes.improved_seating import find_best_seats_for_group
+    else:
+        from src.routes.seating import find_best_seats_for_group
+
+    def search(showing, group_size, seat_type):
+        return find_best_seats_for_group(showing.seats, showing.layout.config, group_size, seat_type)
+    return search, policy.endswith('-nogap')
+
+
+def simulate_showing(policy, config, pricing, seed, demand=DEFAULT_DEMAND):
+    """Run one showing's arrival stream through a policy and measure the result"""
+    layout = compile_layout(config, pricing)
+    search, no_gaps = policy_search(policy)
+    showing = Showing(layout)
+    seated = turned_away = 0
+    search_seconds = 0.0
+    stream = arrivals(seed, layout.size, demand)
+
+    for group_size, seat_type in stream:
+        t0 = time.perf_counter()
+        block = search(showing, group_size, seat_type)
+        if len(block) != group_size or (no_gaps and showing.leaves_gap(block)):
+            block = None
+        search_seconds += time.perf_counter() - t0
+        if block is None:
+            turned_away += 1
+            continue
+        showing.book(block)
+        seated += 1
+
+    booked = [index for index, code in enumerate(showing.statuses) if code == BOOKED]
+    return {
+        "policy": policy,
+        "seed": seed,
+        "groups": len(stream),
+        "seatedGroups": seated,
+        "turnedAway": turned_away,
+        "bookedSeats": len(booked),
+        "occupancyRate": round(len(booked) / layout.size * 100, 2),
+        "strandedSeats": stranded_seats(layout, showing.statuses),
+        "revenue": round(sum(layout.prices[layout.price_codes[index]] for index in booked), 2),
+        "searchSeconds": search_seconds
+    }
+
+
+def _simulate_task(task):
+    return simulate_showing(*task)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results):
+    """Per-policy report from the results of every simulated showing"""
+    by_policy = {}
+    for result in results:
+        by_policy.setdefault(result["policy"], []).append(result)
+
+    report = {}
+    for policy, runs in by_policy.items():
+        count = len(runs)
+        occupancy = sorted(run["occupancyRate"] for run in runs)
+        searches = sum(run["groups"] for run in runs)
+        search_seconds = sum(run["searchSeconds"] for run in runs)
+        report[policy] = {
+            "showings": count,
+            "occupancyRate": round(sum(occupancy) / count, 2),
+            "occupancyPercentiles": {f"p{p}": percentile(occupancy, p) for p in PERCENTILES},
+            "strandedSeats": round(sum(run["strandedSeats"] for run in runs) / count, 2),
+            "revenue": round(sum(run["revenue"] for run in runs) / count, 2),
+            "seatedGroups": round(sum(run["seatedGroups"] for run in runs) / count, 2),
+            "turnedAway": round(sum(run["turnedAway"] for run in runs) / count, 2),
+            "allocationsPerSecond": round(searches / search_seconds, 1) if search_seconds else None
+        }
+    return report
+
+
+def simulate(policies=POLICIES, showings=DEFAULT_SHOWINGS, config=None, pricing=None, seed=0,
+             demand=DEFAULT_DEMAND, workers=None):
+    """
+    Simulate `showings` showings per policy and report the results
+
+    Showings are spread over `workers` processes (default: one per CPU);
+    with a single worker they run in this process.
+    """
+    config = DEFAULT_CONFIG if config is None else config
+    pricing = DEFAULT_PRICING if pricing is None else pricing
+    for policy in policies:
+        policy_search(policy)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(policy, config, pricing, seed + i, demand) for i in range(showings) for policy in policies]
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_simulate_task(task) for task in tasks]
+    else:
+        # Spawned workers don't inherit threads or open seat state files from this process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_simulate_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    wall_seconds = time.perf_counter() - started
+
+    return {
+        "hall": f"{config['rows']}x{config['columns']}",
+        "showings": showings,
+        "demand": demand,
+        "seed": seed,
+        "workers": workers,
+        "wallSeconds": round(wall_seconds, 3),
+        "showingsPerSecond": round(len(tasks) / wall_seconds, 1) if wall_seconds else None,
+        "policies": summarize(results)
+    }
+
+
+def parse_hall(value):
+    try:
+        rows, columns = (int(n) for n in value.split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("hall must look like ROWSxCOLUMNS, e.g. 15x12")
+    if rows < 1 or columns < 2:
+        raise argparse.ArgumentTypeError("a hall needs at least 1 row and 2 columns")
+    return rows, columns
+
+
+def parse_policies(value):
+    policies = [policy.strip() for policy in value.split(',') if policy.strip()]
+    unknown = [policy for policy in policies if policy not in POLICIES]
+    if unknown or not policies:
+        raise argparse.ArgumentTypeError(f"policies must be a list of: {', '.join(POLICIES)}")
+    return policies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare seat allocation policies on simulated showings")
+    parser.add_argument('--showings', type=int, default=DEFAULT_SHOWINGS, help="showings simulated per policy")
+    parser.add_argument('--policies', type=parse_policies, default=list(POLICIES),
+                        help="comma-separated policies to compare (default: all)")
+    parser.add_argument('--hall', type=parse_hall, help="ROWSxCOLUMNS hall instead of the default 15x12 one")
+    parser.add_argument('--demand', type=float, default=DEFAULT_DEMAND,
+                        help="seats requested per showing as a multiple of capacity")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first showing's arrival stream")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    config = hall_config(*args.hall) if args.hall else None
+    report = simulate(args.policies, args.showings, config, seed=args.seed, demand=args.demand,
+                      workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Simulated {report['showings']} showings x {len(report['policies'])} policies of a "
+          f"{report['hall']} hall in {report['wallSeconds']} s on {report['workers']} workers")
+    print(f"{'policy':<15} {'occupancy':>9} {'p5':>6} {'p95':>6} {'stranded':>8} {'revenue':>9} "
+          f"{'turned away':>11} {'alloc/s':>9}")
+    for policy, summary in report["policies"].items():
+        p = summary["occupancyPercentiles"]
+        print(f"{policy:<15} {summary['occupancyRate']:>8}% {p['p5']:>6} {p['p95']:>6} "
+              f"{summary['strandedSeats']:>8} {summary['revenue']:>9} {summary['turnedAway']:>11} "
+              f"{summary['allocationsPerSecond']:>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+// Canvas seat map renderer for large halls
+//
+// Draws the same seat data as the DOM renderer in seating.js onto a single
+// canvas. The canvas is only as large as the visible viewport: scrolling
+// redraws the seats in view, and seat changes mark just those seats dirty so
+// the next animation frame repaints them and nothing else. Clicks are mapped
+// back to seats arithmetically (no per-seat elements or listeners).
+
+const SEAT_COLORS = {
+    available: '#4caf50',
+    selected: '#2196f3',
+    booked: '#f44336',
+    disabled: '#9e9e9e',
+    blocked: '#cfd8dc'
+};
+const VIP_BORDER = 'gold';
+const ROW_LABEL_COLOR = '#1a237e';
+
+class SeatCanvas {
+    constructor(container, options = {}) {
+        this.seatSize = options.seatSize || 30;
+        this.gap = options.gap || 8;
+        this.rowGap = options.rowGap || 10;
+        this.aisleWidth = options.aisleWidth || 20;
+        this.labelWidth = options.labelWidth || 30;
+        this.onSeatClick = options.onSeatClick || null;
+
+        this.config = null;
+        this.seats = [];
+        this.dirty = new Set();
+        this.fullRedraw = false;
+        this.frameRequested = false;
+
+        // Scrollable viewport > full-size spacer > viewport-sized canvas
+        this.viewport = document.createElement('div');
+        this.viewport.className = 'seat-canvas-viewport';
+        this.spacer = document.createElement('div');
+        this.spacer.className = 'seat-canvas-spacer';
+        this.canvas = document.createElement('canvas');
+        this.canvas.className = 'seat-canvas';
+        this.spacer.appendChild(this.canvas);
+        this.viewport.appendChild(this.spacer);
+        container.appendChild(this.viewport);
+        this.ctx = this.canvas.getContext('2d');
+
+        this.viewport.addEventListener('scroll', () => this.invalidate());
+        this.canvas.addEventListener('click', event => this.handleClick(event));
+        this.canvas.addEventListener('mousemove', event => this.handleHover(event));
+        if (typeof window !== 'undefined') {
+            window.addEventListener('resize', () => this.resize());
+        }
+    }
+
+    // Horizontal distance between seat origins
+    get pitchX() {
+        return this.seatSize + this.gap;
+    }
+
+    // Vertical distance between row origins
+    get pitchY() {
+        return this.seatSize + this.rowGap;
+    }
+
+    // Replace the layout and seat data, then redraw everything
+    setSeats(config, seats) {
+        this.config = config;
+        this.seats = seats;
+        this.hasAisle = config.aisleAfterColumn !== undefined && config.aisleAfterColumn !== null &&
+            config.aisleAfterColumn >= 0 && config.aisleAfterColumn < config.columns - 1;
+        this.aisleX = this.hasAisle ? (config.aisleAfterColumn + 1) * this.pitchX : Infinity;
+        this.contentWidth = this.labelWidth + config.columns * this.pitchX - this.gap +
+            (this.hasAisle ? this.aisleWidth : 0);
+        this.contentHeight = config.rows * this.pitchY - this.rowGap;
+        this.spacer.style.width = `${this.contentWidth}px`;
+        this.spacer.style.height = `${this.contentHeight}px`;
+        this.resize();
+    }
+
+    // Match the canvas to the visible part of the viewport
+    resize() {
+        if (!this.config) return;
+        const ratio = (typeof window !== 'undefined' && window.devicePixelRatio) || 1;
+        this.width = Math.min(this.viewport.clientWidth || this.contentWidth, this.contentWidth);
+        this.height = Math.min(this.viewport.clientHeight || this.contentHeight, this.contentHeight);
+        this.ratio = ratio;
+        this.canvas.width = Math.round(this.width * ratio);
+        this.canvas.height = Math.round(this.height * ratio);
+        this.canvas.style.width = `${this.width}px`;
+        this.canvas.style.height = `${this.height}px`;
+        this.invalidate();
+    }
+
+    // X coordinate of a seat's left edge in content space
+    seatX(col) {
+        return this.labelWidth + col * this.pitchX + (col > this.config.aisleAfterColumn && this.hasAisle ? this.aisleWidth : 0);
+    }
+
+    // Y coordinate of a row's top edge in content space
+    seatY(row) {
+        return row * this.pitchY;
+    }
+
+    // Seat under a point in content space, or null for gaps, aisle and labels
+    hitTest(x, y) {
+        if (!this.config) return null;
+        const row = Math.floor(y / this.pitchY);
+        if (row < 0 || row >= this.config.rows || y - row * this.pitchY >= this.seatSize) return null;
+
+        let offset = x - this.labelWidth;
+        if (offset < 0) return null;
+        if (offset >= this.aisleX) {
+            offset -= this.aisleWidth;
+            if (offset < this.aisleX) return null;
+        }
+        const col = Math.floor(offset / this.pitchX);
+        if (col < 0 || col >= this.config.columns || offset - col * this.pitchX >= this.seatSize) return null;
+        return { row, col };
+    }
+
+    // Seat under a mouse event
+    seatAt(event) {
+        const rect = this.canvas.getBoundingClientRect();
+        return this.hitTest(event.clientX - rect.left + this.viewport.scrollLeft,
+                            event.clientY - rect.top + this.viewport.scrollTop);
+    }
+
+    handleClick(event) {
+        const hit = this.seatAt(event);
+        if (hit && this.onSeatClick) this.onSeatClick(hit.row, hit.col);
+    }
+
+    handleHover(event) {
+        const hit = this.seatAt(event);
+        const status = hit ? this.seats[hit.row][hit.col].status : null;
+        this.canvas.style.cursor = !hit ? 'default' :
+            (status === 'booked' || status === 'disabled' || status === 'blocked' ? 'not-allowed' : 'pointer');
+    }
+
+    // Repaint one seat on the next frame
+    markDirty(row, col) {
+        this.dirty.add(row * this.config.columns + col);
+        this.schedule();
+    }
+
+    // Repaint everything in view on the next frame
+    invalidate() {
+        this.fullRedraw = true;
+        this.schedule();
+    }
+
+    schedule() {
+        if (this.frameRequested) return;
+        this.frameRequested = true;
+        requestAnimationFrame(() => this.flush());
+    }
+
+    // Paint pending changes now; returns the number of seats drawn
+    flush() {
+        this.frameRequested = false;
+        if (!this.config) return 0;
+        const ctx = this.ctx;
+        const scrollX = this.viewport.scrollLeft;
+        const scrollY = this.viewport.scrollTop;
+
+        // Keep the canvas over the visible part of the content
+        this.canvas.style.left = `${scrollX}px`;
+        this.canvas.style.top = `${scrollY}px`;
+        ctx.setTransform(this.ratio, 0, 0, this.ratio, -scrollX * this.ratio, -scrollY * this.ratio);
+
+        let drawn = 0;
+        if (this.fullRedraw) {
+            ctx.clearRect(scrollX, scrollY, this.width, this.height);
+            const firstRow = Math.max(0, Math.floor(scrollY / this.pitchY));
+            const lastRow = Math.min(this.config.rows - 1, Math.floor((scrollY + this.height) / this.pitchY));
+            const firstCol = Math.max(0, Math.floor((scrollX - this.labelWidth - this.aisleWidth) / this.pitchX));
+            const lastCol = Math.min(this.config.columns - 1, Math.floor((scrollX + this.width - this.labelWidth) / this.pitchX));
+            for (let i = firstRow; i <= lastRow; i++) {
+                this.drawRowLabel(i);
+                for (let j = firstCol; j <= lastCol; j++) {
+                    this.drawSeat(i, j);
+                    drawn++;
+                }
+            }
+        } else {
+            const columns = this.config.columns;
+            for (const index of this.dirty) {
+                const i = Math.floor(index / columns);
+                const j = index % columns;
+                const x = this.seatX(j);
+                const y = this.seatY(i);
+                // Skip seats outside the viewport; they are drawn when scrolled into view
+                if (x + this.seatSize < scrollX || x > scrollX + this.width ||
+                    y + this.seatSize < scrollY || y > scrollY + this.height) continue;
+                this.drawSeat(i, j);
+                drawn++;
+            }
+        }
+        this.dirty.clear();
+        this.fullRedraw = false;
+        return drawn;
+    }
+
+    drawRowLabel(row) {
+        const ctx = this.ctx;
+        ctx.fillStyle = ROW_LABEL_COLOR;
+        ctx.font = 'bold 12px Arial, sans-serif';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        const label = this.config.rowLabels ? this.config.rowLabels[row] : String(row + 1);
+        ctx.fillText(label, this.labelWidth / 2, this.seatY(row) + this.seatSize / 2);
+    }
+
+    drawSeat(row, col) {
+        const ctx = this.ctx;
+        const seat = this.seats[row][col];
+        const x = this.seatX(col);
+        const y = this.seatY(row);
+        const size = this.seatSize;
+        const radius = Math.min(5, size / 4);
+
+        ctx.clearRect(x - 1, y - 1, size + 2, size + 2);
+
+        // Seat body with rounded top corners
+        ctx.beginPath();
+        ctx.moveTo(x, y + size);
+        ctx.lineTo(x, y + radius);
+        ctx.quadraticCurveTo(x, y, x + radius, y);
+        ctx.lineTo(x + size - radius, y);
+        ctx.quadraticCurveTo(x + size, y, x + size, y + radius);
+        ctx.lineTo(x + size, y + size);
+        ctx.closePath();
+        ctx.fillStyle = SEAT_COLORS[seat.status] || SEAT_COLORS.available;
+        ctx.fill();
+
+        if (seat.type === 'vip') {
+            ctx.lineWidth = 2;
+            ctx.strokeStyle = VIP_BORDER;
+            ctx.stroke();
+        }
+
+        ctx.fillStyle = '#fff';
+        if (seat.type === 'accessible') {
+            // Simple wheelchair-user glyph
+            ctx.beginPath();
+            ctx.arc(x + size / 2, y + size * 0.25, size * 0.08, 0, Math.PI * 2);
+            ctx.fill();
+            ctx.fillRect(x + size * 0.45, y + size * 0.38, size * 0.1, size * 0.3);
+            ctx.fillRect(x + size * 0.3, y + size * 0.62, size * 0.4, size * 0.08);
+        } else if (size >= 16) {
+            ctx.font = `${Math.round(size / 3)}px Arial, sans-serif`;
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'middle';
+            ctx.fillText(String(col + 1), x + size / 2, y + size / 2);
+        }
+    }
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { SeatCanvas };
+}
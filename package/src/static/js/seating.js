@@ -26,10 +26,20 @@ let seats = [];
 let selectedSeats = [];
 let userMode = true; // true for user mode, false for admin mode
 
+// Halls with at least this many seats are drawn on a canvas (see seat-canvas.js)
+const CANVAS_SEAT_THRESHOLD = 600;
+let seatCanvas = null;
+
 // Initialize the seating layout
 function initializeSeating() {
     seats = [];
     
+    // Compile the configuration into lookup sets once instead of scanning it per seat
+    const vipRows = new Set(seatingConfig.vipRows);
+    const vipColumns = new Set(seatingConfig.vipColumns);
+    const discountRows = new Set(seatingConfig.discountRows);
+    const accessibleSeats = new Set(seatingConfig.accessibleSeats.map(seat => seat.row * seatingConfig.columns + seat.col));
+    
     // Create seat data structure
     for (let i = 0; i < seatingConfig.rows; i++) {
         const row = [];
@@ -38,20 +48,17 @@ function initializeSeating() {
             let type = 'normal';
             
             // Check if VIP
-            if (seatingConfig.vipRows.includes(i) && seatingConfig.vipColumns.includes(j)) {
+            if (vipRows.has(i) && vipColumns.has(j)) {
                 type = 'vip';
             }
             
             // Check if accessible
-            const isAccessible = seatingConfig.accessibleSeats.some(seat => 
-                seat.row === i && seat.col === j
-            );
-            if (isAccessible) {
+            if (accessibleSeats.has(i * seatingConfig.columns + j)) {
                 type = 'accessible';
             }
             
             // Check if discount
-            const isDiscount = seatingConfig.discountRows.includes(i);
+            const isDiscount = discountRows.has(i);
             
             // Create seat object
             row.push({
@@ -90,6 +97,19 @@ function calculatePrice(type, isDiscount) {
 // Render the seating layout
 function renderSeating() {
     const seatingLayout = document.getElementById('seating-layout');
+    
+    // Large halls: one canvas instead of one element per seat
+    if (typeof SeatCanvas !== 'undefined' &&
+        seatingConfig.rows * seatingConfig.columns >= CANVAS_SEAT_THRESHOLD) {
+        if (!seatCanvas) {
+            seatingLayout.innerHTML = '';
+            seatCanvas = new SeatCanvas(seatingLayout, { onSeatClick: handleSeatClick });
+        }
+        seatCanvas.setSeats(seatingConfig, seats);
+        return;
+    }
+    
+    seatCanvas = null;
     seatingLayout.innerHTML = '';
     
     for (let i = 0; i < seatingConfig.rows; i++) {
@@ -133,6 +153,15 @@ function renderSeating() {
     }
 }
 
+// Redraw only the given seats when the canvas renderer is active
+function refreshSeats(changedSeats) {
+    if (!seatCanvas) {
+        renderSeating();
+        return;
+    }
+    changedSeats.forEach(seat => seatCanvas.markDirty(seat.row, seat.col));
+}
+
 // Handle seat click
 function handleSeatClick(row, col) {
     const seat = seats[row][col];
@@ -143,14 +172,14 @@ function handleSeatClick(row, col) {
         const newStatus = statusSelect.value;
         
         seat.status = newStatus;
-        renderSeating();
+        refreshSeats([seat]);
         updateStats();
         return;
     }
     
     // User mode - handle seat selection
-    if (seat.status === 'booked' || seat.status === 'disabled') {
-        return; // Can't select booked or disabled seats
+    if (seat.status === 'booked' || seat.status === 'disabled' || seat.status === 'blocked') {
+        return; // Can't select booked, disabled or distancing-blocked seats
     }
     
     // Toggle selection
@@ -162,7 +191,7 @@ function handleSeatClick(row, col) {
         selectedSeats.push(seat);
     }
     
-    renderSeating();
+    refreshSeats([seat]);
     updateSelectedSeats();
 }
 
@@ -227,6 +256,7 @@ function updateStats() {
 // Auto-select best seats for a group
 function autoSelectBestSeats() {
     // Clear current selection
+    const previousSelection = selectedSeats;
     selectedSeats.forEach(seat => {
         seats[seat.row][seat.col].status = 'available';
     });
@@ -246,9 +276,10 @@ function autoSelectBestSeats() {
             selectedSeats.push(seats[row][col]);
         });
         
-        renderSeating();
+        refreshSeats(previousSelection.concat(selectedSeats));
         updateSelectedSeats();
     } else {
+        refreshSeats(previousSelection);
         alert('Could not find suitable seats for your group. Please try a different seat type or group size.');
     }
 }
@@ -359,8 +390,8 @@ function confirmBooking() {
         seats[seat.row][seat.col].status = 'booked';
     });
     
+    refreshSeats(selectedSeats);
     selectedSeats = [];
-    renderSeating();
     updateSelectedSeats();
     updateStats();
     
@@ -373,8 +404,8 @@ function clearSelection() {
         seats[seat.row][seat.col].status = 'available';
     });
     
+    refreshSeats(selectedSeats);
     selectedSeats = [];
-    renderSeating();
     updateSelectedSeats();
 }
 
@@ -436,8 +467,8 @@ document.addEventListener('DOMContentLoaded', () => {
             seats[seat.row][seat.col].status = newStatus;
         });
         
+        refreshSeats(selectedSeats);
         selectedSeats = [];
-        renderSeating();
         updateSelectedSeats();
         updateStats();
     });
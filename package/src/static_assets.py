@@ -0,0 +1,282 @@
+"""
+Static asset pipeline
+
+`build()` turns src/static into production assets under src/static/dist:
+
+- CSS and JS files are minified and written under a content-fingerprinted
+  name (css/styles.<hash>.css), so they can be cached forever
+- index.html is rewritten to reference the fingerprinted names
+- every asset gets precompressed .gz and, when the optional `brotli`
+  package is installed, .br variants
+- manifest.json lists each asset with its fingerprinted path, ETag,
+  content type and available encodings
+
+At start-up the app loads the manifest and every variant into memory
+(`load_assets()`), so serving a static file is a dict lookup plus
+content negotiation, with immutable cache headers for fingerprinted files
+and ETag/If-None-Match revalidation for everything else; each encoding of
+an asset has its own ETag. Without a build, or when a source file is newer
+than the build, the app serves src/static directly, as in development.
+
+Usage:
+    python -m src.static_assets
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+DIST_NAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+FINGERPRINTED_TYPES = ('.css', '.js')
+COMPRESSIBLE_TYPES = ('.css', '.js', '.html', '.json', '.svg', '.txt')
+# Don't bother compressing tiny files
+MIN_COMPRESS_SIZE = 256
+
+# ETag suffix of each precompressed variant (identity has none)
+ETAG_SUFFIXES = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+def minify_css(text):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{}:;,>])\s*', r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """
+    Conservative line-based JS minification
+
+    Drops indentation, blank lines, whole-line // comments and block
+    comments that start a line; code and string contents are left alone.
+    """
+    lines = []
+    in_comment = False
+    for line in text.splitlines():
+        line = line.strip()
+        if in_comment:
+            if '*/' in line:
+                in_comment = False
+                line = line.split('*/', 1)[1].strip()
+            else:
+                continue
+        if line.startswith('/*'):
+            if '*/' not in line:
+                in_comment = True
+                continue
+            line = line.split('*/', 1)[1].strip()
+        if not line or line.startswith('//'):
+            continue
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def minify_html(text):
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip()) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js, '.html': minify_html}
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _source_files(static_dir):
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not (root == static_dir and d == DIST_NAME))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_dir).replace(os.sep, '/'), path
+
+
+def _write_variants(dist_dir, rel_path, data):
+    """Write an asset and its precompressed variants; return the encodings available"""
+    target = os.path.join(dist_dir, rel_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+    encodings = []
+    if rel_path.endswith(COMPRESSIBLE_TYPES) and len(data) >= MIN_COMPRESS_SIZE:
+        if brotli is not None:
+            with open(target + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+            encodings.append('br')
+        with open(target + '.gz', 'wb') as f:
+            # mtime=0 keeps builds reproducible
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        encodings.append('gzip')
+    return encodings
+
+
+def build(static_dir=STATIC_DIR, verbose=False):
+    """Build dist/ and its manifest from `static_dir`; returns the manifest"""
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+    sources = {}
+    for rel_path, path in _source_files(static_dir):
+        with open(path, 'rb') as f:
+            data = f.read()
+        minify = MINIFIERS.get(os.path.splitext(rel_path)[1])
+        if minify is not None:
+            data = minify(data.decode('utf-8')).encode('utf-8')
+        sources[rel_path] = data
+
+    # Fingerprint CSS/JS first so HTML can reference the new names
+    renamed = {}
+    for rel_path, data in sources.items():
+        stem, ext = os.path.splitext(rel_path)
+        if ext in FINGERPRINTED_TYPES:
+            renamed[rel_path] = f"{stem}.{fingerprint(data)}{ext}"
+
+    assets = {}
+    for rel_path, data in sources.items():
+        if rel_path.endswith('.html'):
+            text = data.decode('utf-8')
+            for original, hashed in renamed.items():
+                text = re.sub(r'''((?:src|href)=["'])(?:\./)?''' + re.escape(original) + r'''(["'])''',
+                              r'\g<1>' + DIST_NAME + '/' + hashed + r'\g<2>', text)
+            data = text.encode('utf-8')
+        target = renamed.get(rel_path, rel_path)
+        assets[rel_path] = {
+            "path": f"{DIST_NAME}/{target}",
+            "etag": fingerprint(data),
+            "contentType": mimetypes.guess_type(rel_path)[0] or 'application/octet-stream',
+            "immutable": rel_path in renamed,
+            "encodings": _write_variants(dist_dir, target, data),
+            "size": len(data)
+        }
+        if verbose:
+            print(f"{rel_path:<30} -> {assets[rel_path]['path']:<45} {len(data):>7} bytes "
+                  f"{' '.join(assets[rel_path]['encodings'])}")
+
+    manifest = {"assets": assets}
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class Asset:
+    """One static file held in memory with its precompressed variants"""
+    __slots__ = ('content_type', 'etag', 'cache_control', 'bodies')
+
+    def __init__(self, content_type, etag, cache_control, bodies):
+        self.content_type = content_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.bodies = bodies  # encoding ('identity', 'gzip', 'br') -> bytes
+
+
+class StaticAssets:
+    """In-memory lookup table of built assets by URL path"""
+
+    def __init__(self, assets, index):
+        self.assets = assets
+        self.index = index
+
+    def lookup(self, path):
+        """Asset for a URL path; unknown paths get index.html (client-side routing)"""
+        return self.assets.get(path, self.index)
+
+    def response(self, path, request):
+        from flask import Response
+
+        asset = self.lookup(path)
+        if asset is None:
+            return "index.html not found", 404
+        accepted = request.accept_encodings
+        encoding = next((e for e in ('br', 'gzip') if e in asset.bodies and accepted[e]), 'identity')
+        # Variants differ byte for byte, so each encoding is validated by its own ETag
+        etag = asset.etag + ETAG_SUFFIXES[encoding]
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset.bodies[encoding], mimetype=asset.content_type, headers=headers)
+
+
+def stale_sources(static_dir=STATIC_DIR):
+    """Source files changed since the last build (all of them without a build)"""
+    try:
+        built_at = os.path.getmtime(os.path.join(static_dir, DIST_NAME, MANIFEST_NAME))
+    except FileNotFoundError:
+        return [rel_path for rel_path, _ in _source_files(static_dir)]
+    return [rel_path for rel_path, path in _source_files(static_dir) if os.path.getmtime(path) > built_at]
+
+
+def load_assets(static_dir=STATIC_DIR):
+    """Load a built dist/ into memory, or return None if there is no build or it is out of date"""
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    stale = stale_sources(static_dir)
+    if stale:
+        # Edited sources win over an old build until `python -m src.static_assets` is run again
+        print(f"Static build is older than {', '.join(stale[:3])}{' ...' if len(stale) > 3 else ''}; "
+              f"serving src/static directly", file=sys.stderr)
+        return None
+
+    assets = {}
+    for rel_path, entry in manifest["assets"].items():
+        file_path = os.path.join(static_dir, entry["path"])
+        bodies = {}
+        with open(file_path, 'rb') as f:
+            bodies['identity'] = f.read()
+        for encoding in entry["encodings"]:
+            with open(file_path + ('.br' if encoding == 'br' else '.gz'), 'rb') as f:
+                bodies[encoding] = f.read()
+        asset = Asset(entry["contentType"], entry["etag"],
+                      IMMUTABLE_CACHE if entry["immutable"] else REVALIDATE_CACHE, bodies)
+        # Fingerprinted files are immutable under their hashed path only
+        assets[entry["path"]] = asset
+        assets[rel_path] = asset if not entry["immutable"] else \
+            Asset(asset.content_type, asset.etag, REVALIDATE_CACHE, bodies)
+
+    index = assets.get('index.html')
+    if index is not None:
+        assets[''] = index
+    return StaticAssets(assets, index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    args = parser.parse_args(argv)
+    manifest = build(args.static_dir, verbose=True)
+    print(f"Built {len(manifest['assets'])} assets into {os.path.join(args.static_dir, DIST_NAME)}"
+          f"{'' if brotli is not None else ' (brotli not installed: gzip only)'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
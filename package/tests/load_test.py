@@ -0,0 +1,232 @@
+"""
+Load-test harness simulating a premiere on-sale rush
+
+Starts the Flask app on a local port in a background thread (no external
+services needed) and drives the /api/best-seats + /api/seats booking flow
+from many concurrent simulated customers. Reports throughput, p50/p99
+latency and the conflict rate, then checks the final seat map against the
+bookings customers were told succeeded.
+
+Usage:
+    python -m tests.load_test
+    python -m tests.load_test --customers 2000 --concurrency 64 --hall 50x40
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src and tests directories to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from werkzeug.serving import make_server
+
+from src.models.layout import hall_config
+from src.routes import seating as basic_seating
+from run_benchmarks import make_seats, parse_halls
+
+# Group sizes seen on a typical opening night (size: weight)
+GROUP_SIZE_WEIGHTS = {1: 15, 2: 40, 3: 15, 4: 18, 5: 7, 6: 3, 7: 2}
+SEAT_TYPE_WEIGHTS = {"any": 88, "vip": 9, "accessible": 3}
+PRICING = {"normal": 10.00, "vip": 15.00, "accessible": 10.00, "discount": 7.50}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LoadTest:
+    """Shared state for one load-test run"""
+
+    def __init__(self, base_url, seed, max_attempts):
+        self.base_url = base_url
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = Counter()
+        self.claims = defaultdict(list)  # (row, col) -> customer ids told they own it
+
+    def call(self, method, path, payload=None):
+        """Issue one HTTP request, returning (status, decoded JSON body)"""
+        body = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as response:
+                status, raw = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, raw = error.code, error.read()
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            self.latencies[f"{method} {path}"].append(elapsed)
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+    def pick(self, weights):
+        with self.rng_lock:
+            return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def customer(self, customer_id):
+        """One customer: ask for the best seats, then try to book them"""
+        group_size = self.pick(GROUP_SIZE_WEIGHTS)
+        seat_type = self.pick(SEAT_TYPE_WEIGHTS)
+        t0 = time.perf_counter()
+
+        for _ in range(self.max_attempts):
+            status, best = self.call('POST', '/api/best-seats', {"groupSize": group_size, "seatType": seat_type})
+            if status == 429 or status == 503:
+                self.record(customer_id, 'throttled', t0)
+                return
+            if status != 200 or not best:
+                self.record(customer_id, 'sold_out' if status == 200 else 'error', t0)
+                return
+
+            booking = [{"row": s["row"], "col": s["col"], "status": "booked"} for s in best]
+            status, _ = self.call('POST', '/api/seats', booking)
+            if status == 200:
+                self.record(customer_id, 'booked', t0, [(s["row"], s["col"]) for s in best])
+                return
+            if status == 409:
+                # Somebody else got there first; search again
+                with self.lock:
+                    self.outcomes['conflict_retry'] += 1
+                continue
+            self.record(customer_id, 'error', t0)
+            return
+
+        self.record(customer_id, 'gave_up', t0)
+
+    def record(self, customer_id, outcome, t0, seats=()):
+        with self.lock:
+            self.outcomes[outcome] += 1
+            self.latencies['booking flow'].append(time.perf_counter() - t0)
+            for seat in seats:
+                self.claims[seat].append(customer_id)
+
+    def verify(self):
+        """Compare the final seat map with what customers were told"""
+        status, seats = self.call('GET', '/api/seats')
+        if status != 200 or seats is None:
+            # Concurrent writers can leave the data file torn and unreadable
+            return {"seatMapReadable": False, "claimedSeats": len(self.claims), "consistent": False}
+        booked = {(s["row"], s["col"]) for row in seats for s in row if s["status"] == "booked"}
+        double_booked = {seat: owners for seat, owners in self.claims.items() if len(owners) > 1}
+        lost = [seat for seat in self.claims if seat not in booked]
+        unclaimed = [seat for seat in booked if seat not in self.claims]
+        return {
+            "seatMapReadable": True,
+            "bookedSeats": len(booked),
+            "claimedSeats": len(self.claims),
+            "doubleBookedSeats": len(double_booked),
+            "lostUpdates": len(lost),
+            "unclaimedBookedSeats": len(unclaimed),
+            "consistent": not double_booked and not lost and not unclaimed
+        }
+
+
+def start_server(host='127.0.0.1'):
+    """Serve the Flask app on a free local port in a daemon thread"""
+    from src.main import app
+
+    # Per-request access logging would dominate the measurement
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server(host, 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def run(customers, concurrency, hall, seed=7, max_attempts=3):
+    """Run one load test and return the report dictionary"""
+    rows, columns = hall
+    config = hall_config(rows, columns)
+    original_data_dir = basic_seating.DATA_DIR
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Serve a fresh hall from a scratch data directory so src/data is untouched
+        basic_seating.configure_storage(data_dir)
+        basic_seating.save_seating_data({"config": config, "pricing": PRICING, "seats": make_seats(config)})
+        server, base_url = start_server()
+        try:
+            test = LoadTest(base_url, seed, max_attempts)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(test.customer, range(customers)))
+            duration = time.perf_counter() - started
+            consistency = test.verify()
+        finally:
+            server.shutdown()
+            basic_seating.configure_storage(original_data_dir)
+
+    attempts = test.outcomes['booked'] + test.outcomes['conflict_retry']
+    return {
+        "customers": customers,
+        "concurrency": concurrency,
+        "hall": f"{rows}x{columns}",
+        "durationSeconds": round(duration, 3),
+        "bookingsPerSecond": round(test.outcomes['booked'] / duration, 1) if duration else 0.0,
+        "requestsPerSecond": round(sum(len(v) for k, v in test.latencies.items() if k != 'booking flow') / duration, 1),
+        "outcomes": dict(test.outcomes),
+        "conflictRate": round(test.outcomes['conflict_retry'] / attempts, 4) if attempts else 0.0,
+        "latencyMs": {
+            name: {
+                "p50": round(percentile(samples, 0.50) * 1000, 2),
+                "p99": round(percentile(samples, 0.99) * 1000, 2),
+                "mean": round(statistics.fmean(samples) * 1000, 2),
+                "count": len(samples)
+            }
+            for name, samples in test.latencies.items()
+        },
+        "consistency": consistency
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate an on-sale rush against the booking API")
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--hall', type=lambda v: parse_halls(v)[0], default=(30, 24), help="ROWSxCOLUMNS")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--max-attempts', type=int, default=3, help="searches per customer after conflicts")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.customers, args.concurrency, args.hall, args.seed, args.max_attempts)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Hall {report['hall']}, {report['customers']} customers, concurrency {report['concurrency']}")
+        print(f"Duration:        {report['durationSeconds']} s")
+        print(f"Throughput:      {report['bookingsPerSecond']} bookings/s, {report['requestsPerSecond']} requests/s")
+        print(f"Outcomes:        {report['outcomes']}")
+        print(f"Conflict rate:   {report['conflictRate']:.2%}")
+        for name, stats in report["latencyMs"].items():
+            print(f"{name:<22} p50 {stats['p50']:8.2f} ms   p99 {stats['p99']:8.2f} ms   ({stats['count']} samples)")
+        print(f"Consistency:     {report['consistency']}")
+
+    return 0 if report["consistency"]["consistent"] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
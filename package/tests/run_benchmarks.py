@@ -0,0 +1,306 @@
+"""
+Benchmark suite for the seating engine and HTTP endpoints
+
+Runs every benchmark over a grid of hall sizes and occupancy levels and saves
+the results as JSON (one file per commit) so regressions are visible when two
+result files are compared.
+
+Usage:
+    python -m tests.run_benchmarks
+    python -m tests.run_benchmarks --halls 15x12,50x40 --occupancy 0,0.9
+    python -m tests.run_benchmarks --compare tests/benchmark_results/<old>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import compile_layout, hall_config
+from src.models.seat_heap import SeatHeap
+from src.models.seat_state import encode_statuses
+from src.models.seating import SeatingModel
+from src.routes import seating as basic_seating
+from src.routes import improved_seating
+
+DEFAULT_HALLS = [(15, 12), (30, 24), (50, 40), (100, 80)]
+DEFAULT_OCCUPANCY = [0.0, 0.5, 0.9]
+DEFAULT_GROUP_SIZES = [2, 4]
+# Showings in a multiplex day for the cross-showing search benchmark
+MULTIPLEX_SHOWINGS = 60
+# Archived showings aggregated by the occupancy archive benchmarks
+ARCHIVED_SHOWINGS = 1000
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'benchmark_results')
+
+
+def make_seats(config):
+    """Create an empty hall for the given configuration"""
+    return compile_layout(config).build_seats()
+
+
+def occupy(seats, fraction, seed=42):
+    """Book a deterministic random fraction of the seats"""
+    rng = random.Random(seed)
+    all_seats = [seat for row in seats for seat in row]
+    for seat in rng.sample(all_seats, int(len(all_seats) * fraction)):
+        seat["status"] = "booked"
+    return seats
+
+
+def find_free_run(seats, length):
+    """Find `length` adjacent available seats for validation benchmarks"""
+    for row in seats:
+        for j in range(len(row) - length + 1):
+            if all(seat["status"] == "available" for seat in row[j:j + length]):
+                return [{"row": seat["row"], "col": seat["col"]} for seat in row[j:j + length]]
+    return [{"row": 0, "col": 0}]
+
+
+def measure(fn, min_time=0.2, max_iterations=10000):
+    """
+    Time repeated calls of `fn`
+
+    Calls are repeated until `min_time` seconds have elapsed, so slow
+    benchmarks (e.g. the improved algorithm on arena-sized halls) run once
+    while fast ones collect enough samples for a stable median.
+    """
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_iterations:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        if time.perf_counter() - started >= min_time:
+            break
+    return {
+        "iterations": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000
+    }
+
+
+def engine_benchmarks(config, seats, group_sizes):
+    """Benchmarks that call the seating engine directly"""
+    middle_row = config["rows"] // 2
+    selection = find_free_run(seats, 3)
+    cases = []
+    for group_size in group_sizes:
+        cases.append((f"basic.find_best_seats_for_group[{group_size}]",
+                      lambda g=group_size: basic_seating.find_best_seats_for_group(seats, config, g, "any")))
+        cases.append((f"improved.find_best_seats_for_group[{group_size}]",
+                      lambda g=group_size: improved_seating.find_best_seats_for_group(seats, config, g, "any")))
+    cases.append(("basic.find_best_seats_for_group[vip]",
+                  lambda: basic_seating.find_best_seats_for_group(seats, config, 2, "vip")))
+    heap = SeatHeap(compile_layout(config), encode_statuses(seats))
+    cases.append(("seat_heap.best_seats[2]",
+                  lambda: heap.best_seats(2, "any")))
+    cases += archive_benchmarks(config, seats)
+    cases += buffer_benchmarks(config, seats)
+    cases.append(("layout.build_seats",
+                  lambda: compile_layout(config).build_seats()))
+    cases.append(("validate_seat_selection",
+                  lambda: SeatingModel.validate_seat_selection(seats, selection)))
+    cases.append(("would_create_single_gap",
+                  lambda: SeatingModel.would_create_single_gap(seats, middle_row, selection)))
+    return cases
+
+
+def create_multiplex_day(config, level):
+    """Create MULTIPLEX_SHOWINGS showings of the hall, each with its own bookings"""
+    layout = compile_layout(config)
+    for i in range(MULTIPLEX_SHOWINGS):
+        statuses = encode_statuses(occupy(make_seats(config), level, seed=i))
+        meta = {"film": f"Film {i % 10}", "startsAt": f"2026-10-18T{12 + i // 6:02d}:{i % 6 * 10:02d}"}
+        basic_seating.create_showing(f"multiplex-{i}", layout, statuses, meta)
+
+
+def archive_benchmarks(config, seats):
+    """Aggregations over ARCHIVED_SHOWINGS showings shaped like this hall"""
+    import numpy as np
+    from src.models.occupancy_archive import fill_curve, heatmap, sell_through
+
+    layout = compile_layout(config)
+    rng = np.random.default_rng(42)
+    statuses = np.frombuffer(encode_statuses(seats), dtype=np.uint8)
+    statuses = np.stack([rng.permutation(statuses) for _ in range(ARCHIVED_SHOWINGS)])
+    sold_after = np.where(statuses == 1, rng.random(statuses.shape) * 7 * 86400, np.nan).astype(np.float32)
+    return [
+        (f"archive.heatmap[{ARCHIVED_SHOWINGS}]", lambda: heatmap(layout, statuses)),
+        (f"archive.sell_through[{ARCHIVED_SHOWINGS}]", lambda: sell_through(layout, sold_after)),
+        (f"archive.fill_curve[{ARCHIVED_SHOWINGS}]", lambda: fill_curve(statuses, sold_after, 3600, 168)),
+    ]
+
+
+def buffer_benchmarks(config, seats):
+    """Distancing buffers of this hall: full rebuild, one committed change and a buffered search"""
+    import numpy as np
+    from src.models.seat_buffer import BufferMask, with_buffers
+    from src.models.showing_search import best_windows
+
+    layout = compile_layout(dict(config, buffer={"seats": 1, "rows": 1}))
+    statuses = encode_statuses(seats)
+    mask = BufferMask(layout, statuses)
+    seat = find_free_run(seats, 1)[0]
+    index = layout.index(seat["row"], seat["col"])
+    toggle = [1]
+
+    def apply_change():
+        toggle[0] ^= 1
+        mask.apply([(index, toggle[0])])
+
+    grid = np.frombuffer(statuses, dtype=np.uint8).reshape(1, layout.rows, layout.columns)
+    return [
+        ("seat_buffer.rebuild", lambda: mask.rebuild(statuses)),
+        ("seat_buffer.apply[1]", apply_change),
+        ("seat_buffer.best_seats[4]", lambda: best_windows(layout, with_buffers(layout, grid), 4)),
+    ]
+
+
+def http_benchmarks(client, seats):
+    """Benchmarks that go through the full Flask request path"""
+    seat = find_free_run(seats, 1)[0]
+    toggle = {"booked": False}
+
+    def book_and_release():
+        # Alternate so the hall occupancy stays constant across iterations
+        toggle["booked"] = not toggle["booked"]
+        status = "booked" if toggle["booked"] else "available"
+        client.post('/api/seats', json=[dict(seat, status=status)])
+
+    return [
+        ("http.GET /api/seats", lambda: client.get('/api/seats')),
+        ("http.GET /api/stats", lambda: client.get('/api/stats')),
+        ("http.GET /api/config", lambda: client.get('/api/config')),
+        ("http.POST /api/best-seats", lambda: client.post('/api/best-seats', json={"groupSize": 4, "seatType": "any"})),
+        ("http.POST /api/best-seats[2]", lambda: client.post('/api/best-seats', json={"groupSize": 2, "seatType": "any"})),
+        ("http.POST /api/seats", book_and_release),
+        (f"http.POST /api/search[{MULTIPLEX_SHOWINGS}]",
+         lambda: client.post('/api/search', json={"groupSize": 4, "seatType": "any"})),
+    ]
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or 'unknown'"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(halls, occupancy_levels, group_sizes, min_time, include_http=True, verbose=True):
+    """Run the benchmark grid and return the list of result records"""
+    from src.main import app
+
+    client = app.test_client()
+    original_data_dir = basic_seating.DATA_DIR
+    results = []
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Point the blueprint at a scratch data directory so src/data is untouched
+        basic_seating.configure_storage(data_dir)
+        try:
+            for rows, columns in halls:
+                config = hall_config(rows, columns)
+                for level in occupancy_levels:
+                    seats = occupy(make_seats(config), level)
+                    cases = engine_benchmarks(config, seats, group_sizes)
+                    if include_http:
+                        basic_seating.save_seating_data({
+                            "config": config,
+                            "pricing": {"normal": 10.00, "vip": 15.00, "accessible": 10.00, "discount": 7.50},
+                            "seats": seats
+                        })
+                        create_multiplex_day(config, level)
+                        cases += http_benchmarks(client, seats)
+
+                    for name, fn in cases:
+                        record = {"name": name, "hall": f"{rows}x{columns}", "occupancy": level}
+                        record.update(measure(fn, min_time=min_time))
+                        results.append(record)
+                        if verbose:
+                            print(f"{name:<45} {record['hall']:>7} {level:>5.0%} "
+                                  f"median {record['median_ms']:10.3f} ms  ({record['iterations']} runs)")
+        finally:
+            basic_seating.configure_storage(original_data_dir)
+
+    return results
+
+
+def compare(current, baseline):
+    """Print the median ratio of each benchmark against a baseline result file"""
+    baseline_index = {(r["name"], r["hall"], r["occupancy"]): r for r in baseline["results"]}
+    print(f"\nComparison against {baseline['meta']['commit']} (ratio > 1 means slower):")
+    for record in current["results"]:
+        old = baseline_index.get((record["name"], record["hall"], record["occupancy"]))
+        if old is None or old["median_ms"] == 0:
+            continue
+        ratio = record["median_ms"] / old["median_ms"]
+        flag = '  <-- regression' if ratio > 1.25 else ''
+        print(f"{record['name']:<45} {record['hall']:>7} {record['occupancy']:>5.0%} x{ratio:6.2f}{flag}")
+
+
+def parse_halls(value):
+    return [tuple(int(n) for n in hall.split('x')) for hall in value.split(',')]
+
+
+def parse_floats(value):
+    return [float(n) for n in value.split(',')]
+
+
+def parse_ints(value):
+    return [int(n) for n in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cinema seating engine")
+    parser.add_argument('--halls', type=parse_halls, default=DEFAULT_HALLS,
+                        help="comma separated ROWSxCOLUMNS list (default: 15x12,30x24,50x40,100x80)")
+    parser.add_argument('--occupancy', type=parse_floats, default=DEFAULT_OCCUPANCY,
+                        help="comma separated booked fractions (default: 0,0.5,0.9)")
+    parser.add_argument('--group-sizes', type=parse_ints, default=DEFAULT_GROUP_SIZES)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="minimum seconds spent on each benchmark")
+    parser.add_argument('--no-http', action='store_true', help="skip the Flask request path benchmarks")
+    parser.add_argument('--output', help="result file (default: tests/benchmark_results/<commit>.json)")
+    parser.add_argument('--compare', help="baseline result file to compare against")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_time": args.min_time
+        },
+        "results": run(args.halls, args.occupancy, args.group_sizes, args.min_time,
+                       include_http=not args.no_http)
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
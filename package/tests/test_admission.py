@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+from flask import Blueprint, Flask, jsonify
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import admission
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestWaitingRoom(unittest.TestCase):
+    """Test suite for the waiting room admission control"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.room = admission.WaitingRoom(rate=2, target_latency=0.1, burst=2, clock=self.clock)
+
+    def test_idle_room_admits_immediately(self):
+        """Test that visitors within the burst are admitted on their first request"""
+        for _ in range(2):
+            admitted, token, position = self.room.enter()
+            self.assertTrue(admitted)
+            self.assertEqual(position, 0)
+
+        admitted, token, position = self.room.enter()
+        self.assertFalse(admitted)
+        self.assertEqual(position, 1)
+
+    def test_queued_visitors_are_admitted_in_order(self):
+        """Test that tokens keep their place and are admitted at the configured rate"""
+        for _ in range(2):
+            self.room.enter()
+        tokens = [self.room.enter()[1] for _ in range(4)]
+        self.assertEqual([self.room.enter(token)[2] for token in tokens], [1, 2, 3, 4])
+
+        self.clock.now += 1.0
+        results = [self.room.enter(token) for token in tokens]
+        self.assertEqual([admitted for admitted, _, _ in results], [True, True, False, False])
+        self.assertEqual(self.room.retry_after(results[3][2]), 1)
+        self.assertEqual(self.room.waiting(), 2)
+
+    def test_rate_follows_latency(self):
+        """Test that the admission rate backs off on slow requests and recovers on fast ones"""
+        self.clock.now += admission.ADJUST_INTERVAL
+        self.room.observe(1.0)
+        self.assertAlmostEqual(self.room.rate, 2 * admission.RATE_BACKOFF)
+
+        for _ in range(20):
+            self.clock.now += admission.ADJUST_INTERVAL
+            self.room.observe(0.001)
+        self.assertGreater(self.room.rate, 2)
+
+class TestWaitingRoomHooks(unittest.TestCase):
+    """Test suite for the waiting room request hooks"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.room = admission.WaitingRoom(rate=1, burst=1, clock=self.clock)
+        blueprint = Blueprint('test_api', __name__)
+
+        @blueprint.route('/seats')
+        def seats():
+            return jsonify([])
+
+        @blueprint.route('/config')
+        def config():
+            return jsonify({})
+
+        with mock.patch.object(admission, 'ENABLED', True):
+            admission.install(blueprint, self.room)
+        app = Flask(__name__)
+        app.register_blueprint(blueprint, url_prefix='/api')
+        self.client = app.test_client()
+
+    def test_excess_visitors_get_a_queue_token(self):
+        """Test that queued visitors get a cheap 503 and are admitted with their token later"""
+        first = self.client.get('/api/seats')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(admission.TOKEN_HEADER, first.headers)
+
+        queued = self.client.get('/api/seats')
+        self.assertEqual(queued.status_code, 503)
+        self.assertEqual(queued.get_json()["position"], 1)
+        self.assertEqual(queued.headers['Retry-After'], '1')
+        token = queued.headers[admission.TOKEN_HEADER]
+
+        self.clock.now += 1.0
+        admitted = self.client.get('/api/seats', headers={admission.TOKEN_HEADER: token})
+        self.assertEqual(admitted.status_code, 200)
+
+    def test_unguarded_endpoints_pass_through(self):
+        """Test that only the seat and best-seat endpoints are queued"""
+        self.client.get('/api/seats')
+        self.assertEqual(self.client.get('/api/seats').status_code, 503)
+        self.assertEqual(self.client.get('/api/config').status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.booking_writer import BookingConflict, ShowingWriter, WriterLocked
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seat_state import AVAILABLE, BOOKED, VERSION, VERSION_OFFSET, SeatStateError, SeatStateFile
+
+class TestShowingWriter(unittest.TestCase):
+    """Test suite for the single-writer booking path"""
+
+    def setUp(self):
+        """Create a showing with its writer in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, 'showing.seats')
+        self.journal_path = os.path.join(self.tmp.name, 'showing.journal')
+        self.state = SeatStateFile.create(self.state_path, compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING))
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+
+    def tearDown(self):
+        self.writer.close()
+        self.state.close()
+        self.tmp.cleanup()
+
+    def read_journal(self):
+        with open(self.journal_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_only_one_of_competing_bookings_succeeds(self):
+        """Test that concurrent bookings of the same seats cannot double-book"""
+        booking = [(7, 4, "booked"), (7, 5, "booked")]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(lambda: self.writer.submit(booking).exception(timeout=5)) for _ in range(20)]
+            errors = [future.result() for future in futures]
+        
+        self.assertEqual(sum(1 for error in errors if error is None), 1, "Exactly one booking should succeed")
+        self.assertTrue(all(isinstance(error, BookingConflict) for error in errors if error is not None))
+        self.assertEqual(self.state.status(7, 4), "booked")
+
+    def test_rejected_request_changes_nothing(self):
+        """Test that a partly conflicting group booking is rejected as a whole"""
+        self.writer.submit([(3, 3, "booked")]).result(timeout=5)
+        
+        with self.assertRaises(BookingConflict) as context:
+            self.writer.submit([(3, 2, "booked"), (3, 3, "booked")]).result(timeout=5)
+        self.assertEqual(context.exception.seats, [{"row": 3, "col": 3}])
+        self.assertEqual(self.state.status(3, 2), "available")
+        
+        with self.assertRaises(SeatStateError):
+            self.writer.submit([(99, 0, "booked")]).result(timeout=5)
+
+    def test_journal_is_replayable(self):
+        """Test that the journal starts with a config line followed by one line per request"""
+        self.writer.submit([(0, 0, "booked")]).result(timeout=5)
+        self.writer.reset().result(timeout=5)
+        
+        entries = self.read_journal()
+        self.assertEqual([entry["op"] for entry in entries], ["config", "update", "reset"])
+        self.assertEqual(entries[0]["config"], DEFAULT_CONFIG)
+        self.assertLess(entries[1]["version"], entries[2]["version"])
+
+    def test_recovery_from_journal(self):
+        """Test that batches missing from the state file are re-applied from the journal"""
+        self.writer.submit([(5, 5, "booked")]).result(timeout=5)
+        self.writer.submit([(5, 6, "disabled")]).result(timeout=5)
+        self.writer.close()
+        
+        # Simulate losing the state file writes that were not flushed yet
+        self.state.restore(0, bytes(self.state.size))
+        self.state.set_checkpoint(0)
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+        
+        self.assertEqual(self.state.status(5, 5), "booked")
+        self.assertEqual(self.state.status(5, 6), "disabled")
+
+    def test_recovery_from_a_torn_write(self):
+        """Test that a batch interrupted between the version bumps is replayed from the journal"""
+        self.writer.submit([(5, 5, "booked")]).result(timeout=5)
+        version = self.state.version
+
+        def crash(writes):
+            # Die after the first version bump and part of the seat writes
+            VERSION.pack_into(self.state._map, VERSION_OFFSET, self.state.version + 1)
+            index, code = writes[0]
+            self.state._map[self.state.seats_offset + index] = code
+            raise RuntimeError("process died")
+        self.state.write_codes = crash
+        with self.assertRaises(RuntimeError):
+            self.writer.submit([(6, 5, "booked"), (6, 6, "booked")]).result(timeout=5)
+        del self.state.write_codes
+        # Stop the writer without a checkpoint; the OS releases a crashed process's lock
+        self.writer.queue.put(None)
+        self.writer.thread.join()
+        self.writer.journal.close()
+        self.writer._lock.close()
+        self.assertEqual(self.state.version, version + 1)
+
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+        self.assertEqual(self.state.version, version + 2)
+        self.assertEqual((self.state.status(6, 5), self.state.status(6, 6)), ("booked", "booked"))
+        self.assertEqual(self.writer.published.version, version + 2)
+        self.assertEqual(self.writer.submit([(6, 7, "booked")]).result(timeout=5), version + 4)
+
+    def test_one_writer_per_showing(self):
+        """Test that a second writer for the same journal is refused until the first one closes"""
+        with self.assertRaises(WriterLocked):
+            ShowingWriter(self.state, self.journal_path, fsync=False)
+        self.writer.submit([(1, 1, "booked")]).result(timeout=5)
+        self.assertEqual([entry["op"] for entry in self.read_journal()], ["config", "update"])
+
+        self.writer.close()
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+        self.assertEqual(self.writer.submit([(1, 2, "booked")]).result(timeout=5), self.state.version)
+
+    def test_writes_to_a_showing_owned_elsewhere_are_refused(self):
+        """Test that the API answers 503 while another owner holds the showing's writer"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            state = seating.get_showing_state()
+            owner = ShowingWriter(state, seating.journal_path(state.name), fsync=False)
+            try:
+                response = client.post('/api/seats', json=[{"row": 4, "col": 4, "status": "booked"}])
+                self.assertEqual(response.status_code, 503)
+                self.assertIn('Retry-After', response.headers)
+                self.assertFalse(response.get_json()["success"])
+            finally:
+                owner.close()
+            response = client.post('/api/seats', json=[{"row": 4, "col": 4, "status": "booked"}])
+            self.assertEqual(response.status_code, 200)
+        finally:
+            seating.configure_storage(original_data_dir)
+
+    def test_writer_reloads_a_state_file_written_elsewhere(self):
+        """Test that a writer checks its next batch against writes it didn't make"""
+        rebuilds = []
+        self.writer.listeners.append(lambda changes, statuses: rebuilds.append(changes is None))
+        other = SeatStateFile(self.state_path, writable=True)
+        try:
+            other.write_codes([(7 * self.state.layout.columns + 4, BOOKED)])
+        finally:
+            other.close()
+
+        with self.assertRaises(BookingConflict):
+            self.writer.submit([(7, 4, "booked")]).result(timeout=5)
+        self.assertEqual(rebuilds, [True])
+        self.assertEqual(self.writer.published.version, self.state.version)
+        self.assertEqual(self.writer.published.statuses[7 * self.state.layout.columns + 4], BOOKED)
+
+    def test_reads_see_writes_of_the_owning_process(self):
+        """Test that a process that doesn't own the writer still serves the current seat map"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            state = seating.get_showing_state()
+            owner = ShowingWriter(state, seating.journal_path(state.name), fsync=False)
+            try:
+                best = client.post('/api/best-seats', json={"groupSize": 1}).get_json()
+                row, col = best[0]["row"], best[0]["col"]
+                self.assertEqual(client.get('/api/seats').get_json()[row][col]["status"], "available")
+
+                owner.submit([(row, col, "booked")]).result(timeout=5)
+                response = client.get('/api/seats')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers[seating.SEATS_VERSION_HEADER], str(state.version))
+                self.assertEqual(response.get_json()[row][col]["status"], "booked")
+                best = client.post('/api/best-seats', json={"groupSize": 1}).get_json()
+                self.assertNotEqual((best[0]["row"], best[0]["col"]), (row, col))
+            finally:
+                owner.close()
+        finally:
+            seating.configure_storage(original_data_dir)
+
+    def test_backlogged_writer_answers_503(self):
+        """Test that a write the writer doesn't confirm in time gets a JSON 503 rather than a 500"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir, original_timeout = seating.DATA_DIR, seating.WRITE_TIMEOUT
+        seating.configure_storage(self.tmp.name)
+        release = threading.Event()
+        try:
+            writer = seating.get_writer(seating.get_showing_state())
+            writer.listeners.append(lambda changes, statuses: release.wait(5))
+            seating.WRITE_TIMEOUT = 0.05
+            response = client.post('/api/seats', json=[{"row": 4, "col": 4, "status": "booked"}])
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('Retry-After', response.headers)
+            self.assertIn("may still be applied", response.get_json()["error"])
+        finally:
+            release.set()
+            seating.WRITE_TIMEOUT = original_timeout
+            seating.configure_storage(original_data_dir)
+
+    def test_snapshots_are_published_per_batch(self):
+        """Test that each batch publishes a new immutable snapshot matching the state file"""
+        before = self.writer.published
+        version = self.writer.submit([(2, 2, "booked")]).result(timeout=5)
+        after = self.writer.published
+
+        self.assertEqual(after.version, version)
+        self.assertEqual(after.statuses, self.state.snapshot()[1])
+        self.assertEqual(before.statuses[self.state.layout.index(2, 2)], AVAILABLE)
+        self.assertEqual(after.statuses[self.state.layout.index(2, 2)], BOOKED)
+        self.assertIs(after.derive("count", lambda: after.statuses.count(BOOKED)), after.derive("count", list))
+
+    def test_readers_never_see_part_of_a_batch(self):
+        """Test that lock-free readers see a group booking either whole or not at all"""
+        group = [(7, col) for col in range(6)]
+        indices = [self.state.layout.index(row, col) for row, col in group]
+        stop = threading.Event()
+        torn, versions = [], [0]
+
+        def read():
+            while not stop.is_set():
+                snapshot = self.writer.published
+                if len({snapshot.statuses[index] for index in indices}) != 1:
+                    torn.append(snapshot.version)
+                if snapshot.version != versions[-1]:
+                    versions.append(snapshot.version)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for _ in range(200):
+                self.writer.submit([(row, col, "booked") for row, col in group]).result(timeout=5)
+                self.writer.submit([(row, col, "available") for row, col in group]).result(timeout=5)
+        finally:
+            stop.set()
+            reader.join()
+
+        self.assertEqual(torn, [])
+        self.assertEqual(versions, sorted(versions))
+
+    def test_reads_are_served_from_the_published_snapshot(self):
+        """Test that seat map and stats reads name the version they were served from"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            version = client.post('/api/seats', json=[{"row": 4, "col": 4, "status": "booked"}]).get_json()["version"]
+            first, second = client.get('/api/seats'), client.get('/api/seats')
+            self.assertEqual(first.headers[seating.SEATS_VERSION_HEADER], str(version))
+            self.assertEqual(first.get_data(), second.get_data())
+            self.assertEqual(first.get_json()[4][4]["status"], "booked")
+            stats = client.get('/api/stats').get_json()
+            self.assertEqual((stats["version"], stats["bookedSeats"]), (version, 1))
+        finally:
+            seating.configure_storage(original_data_dir)
+
+if __name__ == '__main__':
+    unittest.main()
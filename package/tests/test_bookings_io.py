@@ -0,0 +1,149 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import bookings_io
+from src.models.booking_writer import ShowingWriter
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seat_state import SeatStateFile
+
+class TestBookingsIO(unittest.TestCase):
+    """Test suite for streaming booking exports and bulk imports"""
+
+    def setUp(self):
+        """Point the seating blueprint at an empty data directory"""
+        from src.main import app
+        from src.routes import seating
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        self.client = app.test_client()
+        self.showings_dir = os.path.join(self.tmp.name, 'showings')
+
+    def tearDown(self):
+        from src.routes import seating
+        seating.configure_storage(self.original_data_dir)
+        self.tmp.cleanup()
+
+    def write_showing(self, showing_id, bookings):
+        """Commit each list of (row, col, status) updates through a writer of a new showing"""
+        os.makedirs(self.showings_dir, exist_ok=True)
+        layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        state = SeatStateFile.create(os.path.join(self.showings_dir, f'{showing_id}.seats'), layout,
+                                     meta={"film": "Film", "startsAt": "2025-06-01T20:00"})
+        writer = ShowingWriter(state, os.path.join(self.showings_dir, f'{showing_id}.journal'), fsync=False)
+        try:
+            for updates in bookings:
+                writer.submit(updates).result(timeout=5)
+            writer.reset().result(timeout=5)
+        finally:
+            writer.close()
+            state.close()
+
+    def test_events_follow_the_journal(self):
+        """Test booked/released events, including the releases of a reset"""
+        self.write_showing("a", [[(7, 6, "booked"), (7, 7, "booked")], [(7, 7, "available")]])
+        events = list(bookings_io.booking_events(self.showings_dir))
+
+        self.assertEqual([(event["event"], event["seat"]) for event in events],
+                         [("booked", "H7"), ("booked", "H8"), ("released", "H8"), ("released", "H7")])
+        self.assertEqual(events[0]["film"], "Film")
+        self.assertEqual(events[0]["price"], compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING).price(7, 6))
+        self.assertEqual(list(bookings_io.booking_events(self.showings_dir, showing="b")), [])
+        self.assertEqual(list(bookings_io.booking_events(self.showings_dir, start=4e9)), [])
+
+    def test_export_streams_ndjson_and_csv(self):
+        """Test the export endpoint in both formats and its time window"""
+        self.client.post('/api/seats', json=[{"row": 2, "col": 3, "status": "booked"}])
+        response = self.client.get('/api/bookings/export')
+        self.assertTrue(response.is_streamed)
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([(event["showing"], event["seat"]) for event in events], [("default", "C4")])
+
+        rows = list(csv.DictReader(io.StringIO(self.client.get('/api/bookings/export?format=csv').get_data(as_text=True))))
+        self.assertEqual(list(rows[0]), list(bookings_io.FIELDS))
+        self.assertEqual(rows[0]["seat"], "C4")
+        self.assertEqual(self.client.get('/api/bookings/export?to=2000-01-01').get_data(), b'')
+        self.assertEqual(self.client.get('/api/bookings/export?from=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/bookings/export?format=xml').status_code, 400)
+
+    def test_import_batches_and_rebuilds_the_heap(self):
+        """Test that an import commits in batches, reports conflicts and keeps best-seats current"""
+        from src.routes import seating
+        self.client.post('/api/seats', json=[{"row": 0, "col": 0, "status": "booked"}])
+        body = ''.join(json.dumps({"showing": "default", "row": row, "col": col}) + '\n'
+                       for row in range(15) for col in range(12) if (row, col) != (11, 7))
+        body += '{"showing": "default", "row": 1}\n{"showing": "nowhere", "row": 0, "col": 0}\n'
+        version = seating.get_showing_state().version
+
+        summary = self.client.post('/api/bookings/import?batchSize=50', data=body,
+                                   content_type='application/x-ndjson').get_json()
+        self.assertEqual(summary["imported"], 178)
+        self.assertEqual(summary["conflicts"], 1)
+        self.assertEqual(summary["failed"], 2)
+        self.assertEqual(summary["showings"], ["default"])
+        # Four batches, one of them retried without its conflicting seat
+        self.assertEqual(seating.get_showing_state().version, version + 2 * 4)
+
+        best = self.client.post('/api/best-seats', json={"groupSize": 1}).get_json()
+        self.assertEqual([(seat["row"], seat["col"]) for seat in best], [(11, 7)])
+        self.assertTrue(seating.heap_is_current(seating.get_showing_state()))
+
+    def test_paused_heap_is_not_served(self):
+        """Test that best-seats skips a heap an import paused and that reattaching catches it up"""
+        from src.routes import seating
+        state = seating.get_showing_state()
+        writer = seating.get_writer(state)
+        heap = seating.get_seat_heap(state)
+        best = self.client.post('/api/best-seats', json={"groupSize": 1}).get_json()
+        row, col = best[0]["row"], best[0]["col"]
+
+        writer.listeners = [listener for listener in writer.listeners if listener != heap.apply]
+        writer.submit([(row, col, "booked")]).result(timeout=5)
+        self.assertFalse(seating.heap_is_current(state))
+        best = self.client.post('/api/best-seats', json={"groupSize": 1}).get_json()
+        self.assertNotEqual((best[0]["row"], best[0]["col"]), (row, col))
+
+        self.assertEqual(writer.add_listener(heap.apply).result(timeout=5), state.version)
+        self.assertTrue(seating.heap_is_current(state))
+        self.assertEqual(heap.best_seats(1), [state.layout.seat(best[0]["row"], best[0]["col"])])
+
+    def test_cli_round_trip(self):
+        """Test exporting a showing to CSV and importing it into an empty data directory"""
+        self.write_showing("a", [[(4, 4, "booked"), (4, 5, "booked")], [(4, 5, "available")]])
+        path = os.path.join(self.tmp.name, 'a.csv')
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            bookings_io.main(['--data-dir', self.tmp.name, 'export', '--format', 'csv', '--showing', 'a'])
+            exported = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        with open(path, 'w') as f:
+            # Replay the history into another showing (a reset released every seat)
+            f.write(exported.replace(',a,', ',b,'))
+
+        from src.routes import seating
+        self.client.post('/api/showings', json={"id": "b"})
+        sys.stdout = io.StringIO()
+        try:
+            self.assertEqual(bookings_io.main(['--data-dir', self.tmp.name, 'import', path]), 0)
+            summary = json.loads(sys.stdout.getvalue())
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(summary["imported"], 4)
+        self.assertEqual(summary["showings"], ["b"])
+        seating.configure_storage(self.tmp.name)
+        seats = self.client.get('/api/seats?showing=b').get_json()
+        self.assertEqual([(seat["row"], seat["col"]) for row in seats for seat in row if seat["status"] == "booked"], [])
+
+if __name__ == '__main__':
+    unittest.main()
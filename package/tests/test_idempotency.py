@@ -0,0 +1,139 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.booking_writer import BookingConflict, ShowingWriter
+from src.models.idempotency import IdempotencyKeyReused, IdempotencyStore, keys_path
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seat_state import SeatStateFile
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestIdempotencyStore(unittest.TestCase):
+    """Test suite for the bounded, TTL-evicted outcome store"""
+
+    def test_entries_expire_and_are_bounded(self):
+        """Test TTL expiry and eviction of the oldest keys"""
+        clock = FakeClock()
+        store = IdempotencyStore(max_keys=2, ttl=60, clock=clock)
+        store.put("a", [[0, 0, "booked"]], {"version": 2})
+        clock.now += 30
+        store.put("b", [[0, 1, "booked"]], {"version": 4})
+        clock.now += 10
+        store.put("c", [[0, 2, "booked"]], {"version": 6})
+
+        self.assertIsNone(store.get("a", [[0, 0, "booked"]]))
+        self.assertEqual(store.get("b", [[0, 1, "booked"]]), {"version": 4})
+        clock.now += 51
+        self.assertIsNone(store.get("b", [[0, 1, "booked"]]))
+        self.assertEqual(len(store), 1)
+
+    def test_reused_key_is_rejected(self):
+        """Test that a key cannot be replayed for a different request"""
+        store = IdempotencyStore()
+        store.put("a", [[0, 0, "booked"]], {"version": 2})
+        with self.assertRaises(IdempotencyKeyReused):
+            store.get("a", [[0, 1, "booked"]])
+
+class TestIdempotentWriter(unittest.TestCase):
+    """Test suite for keyed booking requests through the showing writer"""
+
+    def setUp(self):
+        """Create a showing with its writer in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmp.name, 'showing.journal')
+        self.state = SeatStateFile.create(os.path.join(self.tmp.name, 'showing.seats'),
+                                          compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING))
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+
+    def tearDown(self):
+        self.writer.close()
+        self.state.close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        self.writer = ShowingWriter(self.state, self.journal_path, fsync=False)
+
+    def test_retry_returns_the_original_outcome(self):
+        """Test that a retried booking gets its version back instead of a conflict"""
+        booking = [(7, 4, "booked"), (7, 5, "booked")]
+        version = self.writer.submit(booking, "retry-1").result(timeout=5)
+        self.assertEqual(self.writer.submit(booking, "retry-1").result(timeout=5), version)
+        self.assertEqual(self.state.version, version)
+
+        with self.assertRaises(BookingConflict):
+            self.writer.submit(booking, "retry-2").result(timeout=5)
+        with self.assertRaises(BookingConflict):
+            self.writer.submit(booking, "retry-2").result(timeout=5)
+        with self.assertRaises(IdempotencyKeyReused):
+            self.writer.submit([(0, 0, "booked")], "retry-1").result(timeout=5)
+
+    def test_duplicates_in_one_batch(self):
+        """Test that a retry queued behind the original shares its outcome"""
+        booking = [(3, 3, "selected")]
+        futures = [self.writer.submit(booking, "hold-1") for _ in range(5)]
+        versions = {future.result(timeout=5) for future in futures}
+        self.assertEqual(len(versions), 1)
+        with open(self.journal_path) as f:
+            updates = [json.loads(line) for line in f if '"update"' in line]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0]["idempotencyKey"], "hold-1")
+
+    def test_keys_survive_restart(self):
+        """Test that outcomes are restored from the keys file and the journal tail"""
+        first = self.writer.submit([(1, 1, "booked")], "before-checkpoint").result(timeout=5)
+        self.writer.close()
+        self.assertTrue(os.path.exists(keys_path(self.journal_path)))
+
+        self.reopen()
+        second = self.writer.submit([(1, 2, "booked")], "after-checkpoint").result(timeout=5)
+        with self.assertRaises(BookingConflict):
+            self.writer.submit([(1, 1, "booked")], "rejected").result(timeout=5)
+        # Stop the writer without a checkpoint, as if the process crashed
+        self.writer.queue.put(None)
+        self.writer.thread.join()
+        self.writer.journal.close()
+        # A crashed process's writer lock is released by the OS
+        self.writer._lock.close()
+
+        self.reopen()
+        self.assertEqual(self.writer.submit([(1, 1, "booked")], "before-checkpoint").result(timeout=5), first)
+        self.assertEqual(self.writer.submit([(1, 2, "booked")], "after-checkpoint").result(timeout=5), second)
+        with self.assertRaises(BookingConflict):
+            self.writer.submit([(1, 1, "booked")], "rejected").result(timeout=5)
+
+    def test_endpoint(self):
+        """Test the Idempotency-Key header on POST /api/seats"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            booking = [{"row": 7, "col": 5, "status": "booked"}]
+            headers = {"Idempotency-Key": "checkout-42"}
+            first = client.post('/api/seats', json=booking, headers=headers)
+            retry = client.post('/api/seats', json=booking, headers=headers)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(retry.get_json(), first.get_json())
+
+            other = client.post('/api/seats', json=[{"row": 7, "col": 6, "status": "booked"}], headers=headers)
+            self.assertEqual(other.status_code, 422)
+            unkeyed = client.post('/api/seats', json=booking)
+            self.assertEqual(unkeyed.status_code, 409)
+        finally:
+            seating.configure_storage(original_data_dir)
+
+if __name__ == '__main__':
+    unittest.main()
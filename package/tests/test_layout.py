@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seating import SeatingModel
+
+class TestLayout(unittest.TestCase):
+    """Test suite for the compiled seating layout"""
+
+    def test_seat_types_and_prices_match_config(self):
+        """Test that compiled seat types and prices follow the configuration rules"""
+        layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        accessible = {(seat["row"], seat["col"]) for seat in DEFAULT_CONFIG["accessibleSeats"]}
+        
+        for i in range(layout.rows):
+            for j in range(layout.columns):
+                expected = 'normal'
+                if i in DEFAULT_CONFIG["vipRows"] and j in DEFAULT_CONFIG["vipColumns"]:
+                    expected = 'vip'
+                if (i, j) in accessible:
+                    expected = 'accessible'
+                is_discount = i in DEFAULT_CONFIG["discountRows"]
+                
+                self.assertEqual(layout.seat_type(i, j), expected)
+                self.assertEqual(layout.price(i, j), SeatingModel.calculate_price(expected, is_discount))
+        
+        self.assertEqual(layout.seat_ids[0], "A1")
+        self.assertEqual(layout.segments, ((0, 6), (6, 12)))
+
+    def test_layouts_are_shared_by_config_hash(self):
+        """Test that equal configurations share one compiled layout"""
+        first = compile_layout(DEFAULT_CONFIG)
+        second = compile_layout(dict(DEFAULT_CONFIG))
+        self.assertIs(first, second)
+        
+        other = compile_layout(dict(DEFAULT_CONFIG, aisleAfterColumn=3))
+        self.assertNotEqual(first.hash, other.hash)
+
+    def test_layout_is_immutable(self):
+        """Test that compiled layouts reject attribute changes"""
+        layout = compile_layout(DEFAULT_CONFIG)
+        with self.assertRaises(AttributeError):
+            layout.rows = 3
+
+    def test_build_seats_returns_independent_grids(self):
+        """Test that each built grid can be changed without affecting others"""
+        layout = compile_layout(DEFAULT_CONFIG)
+        seats = layout.build_seats()
+        seats[0][0]["status"] = "booked"
+        
+        self.assertEqual(layout.build_seats()[0][0]["status"], "available")
+
+    def test_arena_layout(self):
+        """Test compiling a 5,000+ seat arena with generated row labels"""
+        config = dict(DEFAULT_CONFIG, rows=80, columns=70, rowLabels=[], aisleAfterColumn=34)
+        layout = compile_layout(config)
+        
+        self.assertEqual(layout.size, 5600)
+        self.assertEqual(layout.row_labels[26], "AA")
+        self.assertEqual(len(layout.build_seats()), 80)
+
+if __name__ == '__main__':
+    unittest.main()
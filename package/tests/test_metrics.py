@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import metrics
+
+class TestMetrics(unittest.TestCase):
+    """Test suite for request instrumentation and the /metrics endpoint"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets render cumulatively with sum and count"""
+        histogram = metrics.Histogram('test_seconds', 'Test histogram', buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage='load')
+        histogram.observe(0.5, stage='load')
+        histogram.observe(2.0, stage='load')
+        
+        text = '\n'.join(histogram.render())
+        self.assertIn('test_seconds_bucket{stage="load",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{stage="load",le="1.0"} 2', text)
+        self.assertIn('test_seconds_bucket{stage="load",le="+Inf"} 3', text)
+        self.assertIn('test_seconds_count{stage="load"} 3', text)
+        self.assertEqual(histogram.count(stage='load'), 3)
+
+    def test_counter_labels(self):
+        """Test that counters keep separate values per label set"""
+        counter = metrics.Counter('test_total', 'Test counter')
+        counter.inc(result='found')
+        counter.inc(2, result='found')
+        counter.inc(result='none')
+        
+        self.assertEqual(counter.value(result='found'), 3)
+        self.assertEqual(counter.value(result='none'), 1)
+
+    def test_render_while_new_labels_are_added(self):
+        """Test that scraping doesn't fail while request threads add label sets"""
+        counter = metrics.Counter('test_total', 'Test counter')
+        histogram = metrics.Histogram('test_seconds', 'Test histogram')
+        stop = threading.Event()
+
+        def add_labels():
+            for i in range(5000):
+                counter.inc(endpoint=f"/e{i}")
+                histogram.observe(0.001, endpoint=f"/e{i}")
+            stop.set()
+
+        # Switch threads often so a scrape overlaps the first increment of a label set
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        writer = threading.Thread(target=add_labels)
+        writer.start()
+        try:
+            while not stop.is_set():
+                counter.render()
+                histogram.render()
+        finally:
+            writer.join()
+            sys.setswitchinterval(interval)
+        self.assertEqual(len(counter.render()), 5002)
+
+    @unittest.skipUnless(metrics.ENABLED, "metrics disabled via SEATING_METRICS=0")
+    def test_metrics_endpoint(self):
+        """Test that API requests show up on the /metrics endpoint"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+        
+        original_data_dir = seating.DATA_DIR
+        with tempfile.TemporaryDirectory() as data_dir:
+            seating.configure_storage(data_dir)
+            try:
+                client.get('/api/stats')
+                response = client.get('/metrics')
+            finally:
+                seating.configure_storage(original_data_dir)
+        
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('seating_request_duration_seconds_count{endpoint="seating.get_stats"', body)
+        self.assertIn('seating_stage_duration_seconds_count{stage="load"}', body)
+        self.assertIn('seating_stage_duration_seconds_count{stage="serialize"}', body)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.booking_writer import ShowingWriter
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.occupancy_archive import OccupancyArchive, fill_curve, heatmap, sell_through
+from src.models.seat_state import BOOKED, DISABLED, SeatStateFile
+
+class TestOccupancyArchive(unittest.TestCase):
+    """Test suite for archiving finished showings and aggregating their occupancy"""
+
+    def setUp(self):
+        """Create an empty archive and a default hall layout"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        self.archive = OccupancyArchive(os.path.join(self.tmp.name, 'archive'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def archive_showing(self, showing_id, bookings, film="Film"):
+        """Book the (row, col) groups in order through a writer, then archive the showing"""
+        state = SeatStateFile.create(os.path.join(self.tmp.name, f'{showing_id}.seats'), self.layout,
+                                     meta={"film": film})
+        journal = os.path.join(self.tmp.name, f'{showing_id}.journal')
+        writer = ShowingWriter(state, journal, fsync=False)
+        try:
+            for updates in bookings:
+                writer.submit(updates).result(timeout=5)
+        finally:
+            writer.close()
+        record = self.archive.archive(showing_id, state, journal)
+        state.close()
+        return record
+
+    def test_archive_keeps_booking_order_and_releases(self):
+        """Test that released seats drop out and booking times follow the journal"""
+        self.archive_showing("a", [[(7, 6, "booked")], [(7, 7, "booked")], [(7, 7, "available")],
+                                   [(0, 0, "booked")]])
+        layout, showings, statuses, sold_after = self.archive.load(self.layout.hash)
+
+        self.assertEqual(len(showings), 1)
+        self.assertEqual(showings[0]["booked"], 2)
+        self.assertEqual(statuses[0, self.layout.index(7, 7)], 0)
+        self.assertTrue(np.isnan(sold_after[0, self.layout.index(7, 7)]))
+        self.assertLessEqual(sold_after[0, self.layout.index(7, 6)], sold_after[0, self.layout.index(0, 0)])
+
+    def test_aggregations_across_showings(self):
+        """Test heatmap, sell-through order and fill curve over several showings"""
+        for showing_id in ("a", "b", "c"):
+            self.archive_showing(showing_id, [[(7, 6, "booked")], [(7, 5, "booked")]])
+        self.archive_showing("d", [[(0, 0, "booked")]], film="Other")
+        self.assertEqual(self.archive.layouts()[0]["showings"], 4)
+
+        layout, showings, statuses, sold_after = self.archive.load(self.layout.hash, film="film")
+        self.assertEqual(len(showings), 3)
+        grid = heatmap(layout, statuses)
+        self.assertEqual(grid[7][6], 1.0)
+        self.assertEqual(grid[0][0], 0.0)
+
+        result = sell_through(layout, sold_after)
+        self.assertEqual(result["firstToSell"][:2], ["H7", "H6"])
+        self.assertEqual(result["meanSalePosition"][7][6], 0.0)
+        self.assertIsNone(result["meanSalePosition"][0][0])
+
+        curve = fill_curve(statuses, sold_after, 3600, 2)
+        self.assertEqual(curve["mean"], [round(2 / 180, 4)] * 2)
+        self.assertEqual(curve["soldOut"], 0)
+
+    def test_archive_appends_and_skips_interrupted_rows(self):
+        """Test that archiving appends rows and a row left without an index line is never read"""
+        self.archive_showing("a", [[(7, 6, "booked")]])
+        directory = self.archive.layout_dir(self.layout.hash)
+        # An archive that died after writing half a column row
+        with open(os.path.join(directory, 'statuses.u8'), 'ab') as f:
+            f.write(bytes([BOOKED]) * 100)
+        self.archive_showing("b", [[(0, 0, "booked")]])
+
+        layout, showings, statuses, sold_after = self.archive.load(self.layout.hash)
+        self.assertEqual([record["showing"] for record in showings], ["a", "b"])
+        self.assertEqual(statuses.shape, (2, self.layout.size))
+        self.assertEqual(int(statuses[1].sum()), BOOKED)
+        self.assertEqual(statuses[1, self.layout.index(0, 0)], BOOKED)
+        self.assertFalse(np.isnan(sold_after[0, self.layout.index(7, 6)]))
+
+    def test_fill_curve_and_sellout(self):
+        """Test bucketed fill rates and time to sellout on synthetic arrays"""
+        statuses = np.array([[BOOKED, BOOKED, DISABLED], [BOOKED, 0, 0]], dtype=np.uint8)
+        sold_after = np.array([[10, 3700, np.nan], [20, np.nan, np.nan]], dtype=np.float32)
+        curve = fill_curve(statuses, sold_after, 3600, 2)
+
+        self.assertEqual(curve["mean"], [round((0.5 + 1 / 3) / 2, 4), round((1 + 1 / 3) / 2, 4)])
+        self.assertEqual(curve["soldOut"], 1)
+        self.assertEqual(curve["medianSecondsToSellout"], 3700.0)
+
+    def test_reset_archives_and_endpoints(self):
+        """Test that an admin reset archives the showing and the aggregation endpoints"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            client.post('/api/seats', json=[{"row": 7, "col": 6, "status": "booked"}])
+            self.assertTrue(client.post('/api/reset').get_json()["success"])
+            self.assertEqual(client.post('/api/archive').status_code, 201)
+
+            layouts = client.get('/api/archive').get_json()
+            self.assertEqual(layouts[0]["showings"], 2)
+            layout_hash = layouts[0]["layoutHash"]
+
+            heat = client.get(f'/api/archive/{layout_hash}/heatmap').get_json()
+            self.assertEqual(heat["soldFraction"][7][6], 0.5)
+            self.assertEqual(client.get(f'/api/archive/{layout_hash}/sell-through').status_code, 200)
+            curve = client.get(f'/api/archive/{layout_hash}/fill-curve?bucket=60&buckets=5').get_json()
+            self.assertEqual(len(curve["mean"]), 5)
+            self.assertEqual(client.get(f'/api/archive/{"0" * 40}/heatmap').status_code, 404)
+        finally:
+            seating.configure_storage(original_data_dir)
+
+    def test_reset_is_archived_only_when_applied(self):
+        """Test that a reset refused by the writer archives nothing"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            client.post('/api/seats', json=[{"row": 7, "col": 6, "status": "booked"}])
+            # Hand the showing's writer to another owner
+            with seating._states_lock:
+                seating.close_showing("default")
+            state = seating.get_showing_state()
+            owner = ShowingWriter(state, seating.journal_path(state.name), fsync=False)
+            try:
+                self.assertEqual(client.post('/api/reset').status_code, 503)
+                self.assertEqual(client.get('/api/archive').get_json(), [])
+            finally:
+                owner.close()
+            self.assertEqual(client.post('/api/reset').status_code, 200)
+            self.assertEqual(client.post('/api/reset').status_code, 200)
+            self.assertEqual(client.get('/api/archive').get_json()[0]["showings"], 1)
+        finally:
+            seating.configure_storage(original_data_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+from flask import Blueprint, Flask, jsonify
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import rate_limit
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestRateLimiter(unittest.TestCase):
+    """Test suite for per-client token buckets"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = rate_limit.RateLimiter(
+            {'read': (10.0, 10.0), 'search': (1.0, 2.0), 'write': (1.0, 1.0)}, max_clients=2, clock=self.clock)
+
+    def test_burst_then_refill(self):
+        """Test that a bucket allows its burst and refills at its rate"""
+        self.assertEqual(self.limiter.acquire('a', 'search'), 0)
+        self.assertEqual(self.limiter.acquire('a', 'search'), 0)
+        self.assertAlmostEqual(self.limiter.acquire('a', 'search'), 1.0)
+
+        self.clock.now += 1.0
+        self.assertEqual(self.limiter.acquire('a', 'search'), 0)
+
+    def test_budgets_and_clients_are_independent(self):
+        """Test that each client has separate read, search and write budgets"""
+        self.limiter.acquire('a', 'write')
+        self.assertGreater(self.limiter.acquire('a', 'write'), 0)
+        self.assertEqual(self.limiter.acquire('a', 'read'), 0)
+        self.assertEqual(self.limiter.acquire('b', 'write'), 0)
+
+    def test_client_state_is_bounded(self):
+        """Test that the least recently seen client is evicted beyond max_clients"""
+        for client in ('a', 'b', 'c'):
+            self.limiter.acquire(client, 'read')
+        self.assertEqual(list(self.limiter.clients), ['b', 'c'])
+
+    def test_parse_budgets(self):
+        """Test overriding budgets from the environment format"""
+        budgets = rate_limit.parse_budgets('search:0.5:3')
+        self.assertEqual(budgets['search'], (0.5, 3.0))
+        self.assertEqual(budgets['read'], rate_limit.DEFAULT_BUDGETS['read'])
+        with self.assertRaises(ValueError):
+            rate_limit.parse_budgets('bogus:1:1')
+
+class TestRateLimitHooks(unittest.TestCase):
+    """Test suite for the rate limiting request hook"""
+
+    def setUp(self):
+        self.limiter = rate_limit.RateLimiter(
+            {'read': (100.0, 100.0), 'search': (0.5, 1.0), 'write': (1.0, 1.0)}, clock=FakeClock())
+        blueprint = Blueprint('test_api', __name__)
+
+        @blueprint.route('/best-seats', methods=['POST'])
+        def best_seats():
+            return jsonify([])
+
+        @blueprint.route('/seats', methods=['GET'])
+        def seats():
+            return jsonify([])
+
+        with mock.patch.object(rate_limit, 'ENABLED', True):
+            rate_limit.install(blueprint, self.limiter)
+        app = Flask(__name__)
+        app.register_blueprint(blueprint, url_prefix='/api')
+        self.client = app.test_client()
+
+    def test_search_budget_returns_429(self):
+        """Test that exhausting the search budget returns 429 with Retry-After"""
+        self.assertEqual(self.client.post('/api/best-seats', json={}).status_code, 200)
+        response = self.client.post('/api/best-seats', json={})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '2')
+        self.assertEqual(self.client.get('/api/seats').status_code, 200)
+
+    def test_api_keys_have_their_own_buckets(self):
+        """Test that clients are told apart by API key"""
+        self.client.post('/api/best-seats', json={})
+        response = self.client.post('/api/best-seats', json={}, headers={rate_limit.API_KEY_HEADER: 'kiosk-1'})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import replay as replay_module
+from src.replay import TrafficRecorder, read_journal, replay
+
+CONFIG = {
+    "rows": 15,
+    "columns": 12,
+    "rowLabels": ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O'],
+    "vipRows": [9, 10, 11],
+    "vipColumns": [2, 3, 4, 5, 6, 7, 8, 9],
+    "accessibleSeats": [
+        {"row": 5, "col": 0}, {"row": 5, "col": 1},
+        {"row": 5, "col": 10}, {"row": 5, "col": 11}
+    ],
+    "discountRows": [0, 1],
+    "aisleAfterColumn": 5
+}
+PRICING = {"normal": 10.00, "vip": 15.00, "accessible": 10.00, "discount": 7.50}
+
+class TestReplay(unittest.TestCase):
+    """Test suite for the booking journal replay tool"""
+
+    def setUp(self):
+        """Write a small journal to a temporary file"""
+        self.entries = [
+            {"op": "config", "config": CONFIG, "pricing": PRICING, "seats": [[7, 5, "booked"]], "ts": 100.0},
+            {"op": "best_seats", "groupSize": 2, "seatType": "any", "ts": 100.1},
+            {"op": "update", "seats": [{"row": 7, "col": 6, "status": "booked"}], "ts": 100.2},
+            {"op": "best_seats", "groupSize": 1, "seatType": "vip", "ts": 100.3},
+            {"op": "reset", "ts": 100.4},
+            {"op": "best_seats", "groupSize": 3, "seatType": "any", "ts": 100.5},
+        ]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'journal.ndjson')
+        with open(self.path, 'w') as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry) + '\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_counts_operations_and_queries(self):
+        """Test that every journal line is replayed against both algorithms"""
+        report = replay(read_journal(self.path))
+        
+        self.assertEqual(report["operations"], len(self.entries))
+        self.assertEqual(report["queries"], 3)
+        for summary in report["engines"].values():
+            self.assertEqual(summary["searches"], 3)
+            self.assertEqual(summary["bookedSeats"], 0, "Reset should leave the hall empty")
+
+    def test_replay_with_booking(self):
+        """Test that --book makes each algorithm book its own allocations"""
+        report = replay(read_journal(self.path), book=True)
+        
+        for summary in report["engines"].values():
+            # The last query (3 seats) is booked after the reset
+            self.assertEqual(summary["bookedSeats"], 3)
+            self.assertEqual(summary["bookedGroups"], 3)
+
+    def test_journal_must_start_with_config(self):
+        """Test that a journal without a config entry is rejected"""
+        with self.assertRaises(ValueError):
+            replay(iter([{"op": "reset"}]))
+
+    def test_recorder_keeps_only_validated_updates(self):
+        """Test that rejected and malformed updates are not recorded as seat changes"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir, original_recorder = seating.DATA_DIR, replay_module._recorder
+        seating.configure_storage(self.tmp.name)
+        replay_module._recorder = TrafficRecorder(os.path.join(self.tmp.name, 'recorded.ndjson'))
+        try:
+            booking = [{"row": 7, "col": 5, "status": "booked"}]
+            self.assertEqual(client.post('/api/seats', json=booking).status_code, 200)
+            self.assertEqual(client.post('/api/seats', json=booking).status_code, 409)
+            self.assertEqual(client.post('/api/seats', json=[{"row": 99, "col": 0, "status": "booked"}]).status_code, 400)
+        finally:
+            seating.configure_storage(original_data_dir)
+            replay_module._recorder = original_recorder
+
+        entries = list(read_journal(os.path.join(self.tmp.name, 'recorded.ndjson')))
+        self.assertEqual([entry["op"] for entry in entries], ["config", "update", "rejected", "rejected"])
+        self.assertEqual(entries[0]["seats"], [], "The config line should hold the seat map the update was checked against")
+        self.assertEqual(replay(iter(entries))["engines"]["basic"]["bookedSeats"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.booking_writer import BookingConflict, ShowingWriter
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seat_buffer import BufferMask, blocked_mask
+from src.models.seat_state import AVAILABLE, BOOKED, SeatStateFile
+
+BUFFER_CONFIG = dict(DEFAULT_CONFIG, buffer={"seats": 2, "rows": 1})
+
+class TestSeatBuffer(unittest.TestCase):
+    """Test suite for distancing buffers around booked seats"""
+
+    def setUp(self):
+        self.layout = compile_layout(BUFFER_CONFIG, DEFAULT_PRICING)
+        self.rng = random.Random(7)
+
+    def random_statuses(self, booked_share):
+        return bytes(BOOKED if self.rng.random() < booked_share else AVAILABLE for _ in range(self.layout.size))
+
+    def expected_blocked(self, statuses):
+        """Blocked seats from each booked seat's buffer zone"""
+        blocked = set()
+        for index, code in enumerate(statuses):
+            if code == BOOKED:
+                blocked.update(other for other in self.layout.buffer_zone(index) if statuses[other] != BOOKED)
+        return sorted(blocked)
+
+    def test_dilation_matches_buffer_zones(self):
+        """Test that the vectorized mask equals the per-seat zones and stops at the aisle"""
+        for share in (0.02, 0.1, 0.3):
+            statuses = self.random_statuses(share)
+            booked = np.frombuffer(statuses, dtype=np.uint8).reshape(self.layout.rows, self.layout.columns) == BOOKED
+            self.assertEqual(np.flatnonzero(blocked_mask(self.layout, booked)).tolist(), self.expected_blocked(statuses))
+
+        # Seat 6 is the last before the aisle: seat 7 stays free
+        zone = self.layout.buffer_zone(self.layout.index(7, 5))
+        self.assertNotIn(self.layout.index(7, 6), zone)
+        self.assertIn(self.layout.index(6, 5), zone)
+        self.assertNotIn(self.layout.index(6, 4), zone)
+
+    def test_incremental_updates_match_rebuild(self):
+        """Test that applying committed changes keeps the mask equal to a full rebuild"""
+        statuses = bytearray(self.random_statuses(0.1))
+        mask = BufferMask(self.layout, statuses)
+        for _ in range(200):
+            changes = [(self.rng.randrange(self.layout.size), self.rng.choice((AVAILABLE, BOOKED)))
+                       for _ in range(self.rng.randint(1, 4))]
+            for index, code in changes:
+                statuses[index] = code
+            mask.apply(changes, statuses)
+            self.assertEqual(mask.blocked_available(statuses).tolist(),
+                             [index for index in self.expected_blocked(statuses) if statuses[index] == AVAILABLE])
+
+    def test_writer_rejects_bookings_inside_a_buffer(self):
+        """Test that a group's own seats don't block each other but another group's buffer does"""
+        with tempfile.TemporaryDirectory() as tmp:
+            state = SeatStateFile.create(os.path.join(tmp, 'a.seats'), self.layout)
+            writer = ShowingWriter(state, os.path.join(tmp, 'a.journal'), fsync=False)
+            try:
+                writer.submit([(7, 0, "booked"), (7, 1, "booked")]).result(timeout=5)
+                with self.assertRaises(BookingConflict) as raised:
+                    writer.submit([(7, 3, "booked"), (7, 4, "booked")]).result(timeout=5)
+                self.assertEqual(raised.exception.seats, [{"row": 7, "col": 3}])
+                with self.assertRaises(BookingConflict):
+                    writer.submit([(8, 1, "booked")]).result(timeout=5)
+                writer.submit([(7, 4, "booked"), (9, 1, "booked")]).result(timeout=5)
+
+                # Releasing a group frees its buffer
+                writer.submit([(7, 0, "available"), (7, 1, "available")]).result(timeout=5)
+                writer.submit([(8, 0, "booked")]).result(timeout=5)
+            finally:
+                writer.close()
+                state.close()
+
+    def test_endpoints_honour_buffers(self):
+        """Test best seats, seat map, stats and cross-showing search of a hall with distancing"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        with tempfile.TemporaryDirectory() as tmp:
+            seating.configure_storage(tmp)
+            try:
+                client.post('/api/showings', json={"id": "distanced", "film": "Film", "config": BUFFER_CONFIG})
+                response = client.post('/api/seats?showing=distanced', json=[{"row": 7, "col": 2, "status": "booked"},
+                                                                              {"row": 7, "col": 3, "status": "booked"}])
+                self.assertEqual(response.status_code, 200)
+
+                stats = client.get('/api/stats?showing=distanced').get_json()
+                self.assertEqual(stats["blockedSeats"], 8)
+                self.assertEqual(stats["availableSeats"], 180 - 2 - 8)
+                seats = client.get('/api/seats?showing=distanced').get_json()
+                self.assertEqual([seat["col"] for seat in seats[7] if seat["status"] == "blocked"], [0, 1, 4, 5])
+
+                for group_size in (1, 4):
+                    best = client.post('/api/best-seats?showing=distanced', json={"groupSize": group_size}).get_json()
+                    self.assertEqual(len(best), group_size)
+                    for seat in best:
+                        self.assertNotEqual(seats[seat["row"]][seat["col"]]["status"], "blocked")
+                    # The suggested block can actually be booked
+                    self.assertEqual(client.post('/api/seats?showing=distanced', json=[
+                        dict(row=seat["row"], col=seat["col"], status="booked") for seat in best]).status_code, 200)
+
+                seats = client.get('/api/seats?showing=distanced').get_json()
+                results = client.post('/api/search', json={"groupSize": 6, "film": "Film"}).get_json()["results"]
+                self.assertEqual([result["showing"] for result in results], ["distanced"])
+                self.assertEqual({seats[seat["row"]][seat["col"]]["status"] for seat in results[0]["seats"]},
+                                 {"available"})
+            finally:
+                seating.configure_storage(original_data_dir)
+
+if __name__ == '__main__':
+    unittest.main()
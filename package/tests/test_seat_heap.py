@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models.seat_heap import SeatHeap
+from src.models.seat_state import AVAILABLE, BOOKED, DISABLED, STATUSES
+from src.routes.seating import find_best_seats_for_group
+
+class TestSeatHeap(unittest.TestCase):
+    """Test suite for desirability-ranked single and pair allocation"""
+
+    def setUp(self):
+        """Create a heap for the default hall with every seat available"""
+        self.layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        self.heap = SeatHeap(self.layout, bytes(self.layout.size))
+
+    def book(self, *seats):
+        self.heap.apply([(self.layout.index(row, col), BOOKED) for row, col in seats])
+
+    def test_best_single_and_pair_match_the_full_search(self):
+        """Test that an empty hall offers the middle of the run nearest the centre of the middle row"""
+        single = self.heap.best_seats(1)
+        self.assertEqual([s["id"] for s in single], ["H9"])
+
+        pair = self.heap.best_seats(2)
+        self.assertEqual([s["id"] for s in pair], ["H9", "H10"])
+
+        vip = self.heap.best_seats(1, "vip")
+        self.assertEqual([s["id"] for s in vip], ["J8"])
+
+    def test_random_seat_maps_agree_with_the_full_search(self):
+        """Test that singles and pairs get the seats find_best_seats_for_group picks"""
+        rng = random.Random(36)
+        for _ in range(300):
+            occupancy = rng.random()
+            statuses = bytes(rng.choice((BOOKED, DISABLED)) if rng.random() < occupancy else AVAILABLE
+                             for _ in range(self.layout.size))
+            # Half the maps reach their state through committed changes rather than a rebuild
+            if rng.random() < 0.5:
+                heap = SeatHeap(self.layout, statuses)
+            else:
+                heap = SeatHeap(self.layout, bytes(self.layout.size))
+                heap.apply([(index, code) for index, code in enumerate(statuses) if code != AVAILABLE])
+            seats = self.layout.build_seats()
+            for index, code in enumerate(statuses):
+                seats[index // self.layout.columns][index % self.layout.columns]["status"] = STATUSES[code]
+            for group_size in (1, 2):
+                for seat_type in ('any', 'vip', 'accessible', 'normal'):
+                    expected = find_best_seats_for_group(seats, self.layout.config, group_size, seat_type)
+                    self.assertEqual([s["id"] for s in heap.best_seats(group_size, seat_type)],
+                                     [s["id"] for s in expected], (group_size, seat_type, occupancy))
+
+    def test_pairs_never_span_the_aisle(self):
+        """Test that pairs stay within one aisle segment"""
+        # Book everything except the two seats on either side of the aisle in row 7
+        self.book(*[(r, c) for r in range(self.layout.rows) for c in range(self.layout.columns)
+                    if (r, c) not in ((7, 5), (7, 6))])
+        self.assertEqual(self.heap.best_seats(2), [])
+        self.assertEqual(len(self.heap.best_seats(1)), 1)
+
+    def test_booked_seats_are_skipped_and_released_seats_return(self):
+        """Test lazy deletion on booking and re-insertion on release"""
+        self.book((7, 8))
+        # H7-H8 is now the run nearest the centre
+        self.assertEqual([s["id"] for s in self.heap.best_seats(1)], ["H7"])
+
+        self.book(*[(7, c) for c in range(self.layout.columns)])
+        self.assertEqual([s["id"] for s in self.heap.best_seats(1)], ["G9"])
+
+        self.heap.apply([(self.layout.index(7, 8), AVAILABLE)])
+        self.assertEqual([s["id"] for s in self.heap.best_seats(1)], ["H9"])
+
+    def test_seat_type_falls_back_to_any(self):
+        """Test typed searches and the fallback when no seat of that type is left"""
+        vip = self.heap.best_seats(2, "vip")
+        self.assertTrue(all(seat["type"] == "vip" for seat in vip))
+
+        accessible = [(5, 0), (5, 1), (5, 10), (5, 11)]
+        self.book(*accessible)
+        self.assertEqual(self.heap.best_seats(1, "accessible")[0]["type"], "normal")
+
+    def test_reset_rebuilds(self):
+        """Test that a full rewrite rebuilds the heaps"""
+        self.book(*[(7, c) for c in range(self.layout.columns)])
+        self.heap.apply(None, bytes(self.layout.size))
+        self.assertEqual(self.heap.best_seats(1)[0]["id"], "H9")
+
+class TestBestSeatsEndpoint(unittest.TestCase):
+    """Test suite for /api/best-seats served from the heap"""
+
+    def setUp(self):
+        from src.main import app
+        from src.routes import seating
+        self.seating = seating
+        self.original_data_dir = seating.DATA_DIR
+        self.tmp = tempfile.TemporaryDirectory()
+        seating.configure_storage(self.tmp.name)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.seating.configure_storage(self.original_data_dir)
+        self.tmp.cleanup()
+
+    def test_bookings_update_the_heap(self):
+        """Test that a booked pair is not offered again"""
+        first = self.client.post('/api/best-seats', json={"groupSize": 2}).get_json()
+        booking = [{"row": s["row"], "col": s["col"], "status": "booked"} for s in first]
+        self.assertEqual(self.client.post('/api/seats', json=booking).status_code, 200)
+
+        second = self.client.post('/api/best-seats', json={"groupSize": 2}).get_json()
+        self.assertEqual(len(second), 2)
+        self.assertFalse({s["id"] for s in first} & {s["id"] for s in second})
+
+        self.client.post('/api/reset')
+        again = self.client.post('/api/best-seats', json={"groupSize": 2}).get_json()
+        self.assertEqual([s["id"] for s in again], [s["id"] for s in first])
+
+if __name__ == '__main__':
+    unittest.main()
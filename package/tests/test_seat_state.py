@@ -0,0 +1,184 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout
+from src.models import seat_state
+from src.models.seat_state import (VERSION, VERSION_OFFSET, SeatStateError, SeatStateFile, TornWrite, json_to_state,
+                                   state_to_json)
+
+class TestSeatState(unittest.TestCase):
+    """Test suite for memory-mapped binary seat state files"""
+
+    def setUp(self):
+        """Create a state file for the default hall in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'showing.seats')
+        self.layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        self.state = SeatStateFile.create(self.path, self.layout, meta={"film": "Test"})
+
+    def tearDown(self):
+        self.state.close()
+        self.tmp.cleanup()
+
+    def test_single_seat_update_bumps_version(self):
+        """Test that a seat update changes one byte and the version"""
+        version = self.state.version
+        self.state.set_status(7, 5, "booked")
+        
+        self.assertEqual(self.state.status(7, 5), "booked")
+        self.assertEqual(self.state.status(7, 6), "available")
+        self.assertGreater(self.state.version, version)
+        self.assertEqual(self.state.version % 2, 0, "Version should be even when no write is in progress")
+
+    def test_readers_see_writes_without_reloading(self):
+        """Test that a separate read-only mapping sees updates immediately"""
+        with SeatStateFile(self.path) as reader:
+            self.state.set_statuses([(0, 0, "booked"), (0, 1, "disabled")])
+            version, statuses = reader.snapshot()
+            
+            self.assertEqual(version, self.state.version)
+            self.assertEqual(statuses[0], 1)
+            self.assertEqual(statuses[1], 2)
+            self.assertEqual(reader.meta, {"film": "Test"})
+            with self.assertRaises(SeatStateError):
+                reader.set_status(0, 2, "booked")
+
+    def test_invalid_updates_are_rejected(self):
+        """Test that out-of-range seats and unknown statuses are rejected"""
+        with self.assertRaises(SeatStateError):
+            self.state.set_status(99, 0, "booked")
+        with self.assertRaises(SeatStateError):
+            self.state.set_status(0, 0, "sold")
+
+    def test_torn_write_is_reported_and_repaired(self):
+        """Test that a version left odd by a crash fails snapshots instead of hanging them"""
+        self.state.set_status(0, 0, "booked")
+        # Crash between the two version bumps of the next write
+        VERSION.pack_into(self.state._map, VERSION_OFFSET, self.state.version + 1)
+        original_timeout = seat_state.SNAPSHOT_TIMEOUT
+        seat_state.SNAPSHOT_TIMEOUT = 0.01
+        try:
+            with self.assertRaises(TornWrite):
+                self.state.snapshot()
+        finally:
+            seat_state.SNAPSHOT_TIMEOUT = original_timeout
+
+        self.assertTrue(self.state.repair_torn_write())
+        self.assertFalse(self.state.repair_torn_write())
+        self.assertEqual(self.state.snapshot()[0], 2)
+
+    def test_json_round_trip(self):
+        """Test converting seating.json to a state file and back"""
+        seats = self.layout.build_seats()
+        seats[3][4]["status"] = "booked"
+        json_path = os.path.join(self.tmp.name, 'seating.json')
+        with open(json_path, 'w') as f:
+            json.dump({"config": DEFAULT_CONFIG, "pricing": DEFAULT_PRICING, "seats": seats}, f)
+        
+        state_path = os.path.join(self.tmp.name, 'converted.seats')
+        json_to_state(json_path, state_path)
+        out_path = os.path.join(self.tmp.name, 'out.json')
+        state_to_json(state_path, out_path)
+        
+        with open(out_path) as f:
+            data = json.load(f)
+        self.assertEqual(data["seats"], seats)
+        self.assertEqual(data["config"], DEFAULT_CONFIG)
+
+    def test_corrupt_file_is_rejected(self):
+        """Test that files that are not seat state files are rejected"""
+        bad_path = os.path.join(self.tmp.name, 'bad.seats')
+        with open(bad_path, 'wb') as f:
+            f.write(b'not a seat map' * 10)
+        with self.assertRaises(SeatStateError):
+            SeatStateFile(bad_path)
+
+class TestShowingsAPI(unittest.TestCase):
+    """Test suite for per-showing seat maps through the HTTP API"""
+
+    def setUp(self):
+        from src.main import app
+        from src.routes import seating
+        self.seating = seating
+        self.client = app.test_client()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+
+    def tearDown(self):
+        self.seating.configure_storage(self.original_data_dir)
+        self.tmp.cleanup()
+
+    def test_showings_have_independent_seat_maps(self):
+        """Test creating a showing and booking seats in it"""
+        response = self.client.post('/api/showings', json={"id": "late-show", "film": "Premiere"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.post('/api/showings', json={"id": "late-show"}).status_code, 409)
+        
+        self.client.post('/api/seats?showing=late-show', json=[{"row": 7, "col": 5, "status": "booked"}])
+        
+        self.assertEqual(self.client.get('/api/stats?showing=late-show').json["bookedSeats"], 1)
+        self.assertEqual(self.client.get('/api/stats').json["bookedSeats"], 0)
+        ids = [showing["id"] for showing in self.client.get('/api/showings').json]
+        self.assertEqual(ids, ["default", "late-show"])
+
+    def test_idle_showings_are_closed(self):
+        """Test that a process keeps a bounded number of showings open and reads start no writers"""
+        seating = self.seating
+        original_limit = seating.MAX_OPEN_SHOWINGS
+        seating.MAX_OPEN_SHOWINGS = 3
+        try:
+            for i in range(8):
+                self.assertEqual(self.client.post('/api/showings', json={"id": f"s{i}", "film": "A"}).status_code, 201)
+            self.assertLessEqual(len(seating._states), 3)
+
+            booked = [{"row": 7, "col": 5, "status": "booked"}]
+            self.assertEqual(self.client.post('/api/seats?showing=s0', json=booked).status_code, 200)
+            for i in range(1, 8):
+                self.assertEqual(self.client.get(f'/api/seats?showing=s{i}').status_code, 200)
+                self.assertNotIn(f"s{i}", seating._writers)
+            self.assertNotIn("s0", seating._states)
+            self.assertLessEqual(len(seating._states), 3)
+
+            # Listing and searching read every showing without keeping it open
+            opened = set(seating._states)
+            ids = [showing["id"] for showing in self.client.get('/api/showings').json]
+            self.assertEqual(ids, ["default"] + [f"s{i}" for i in range(8)])
+            search = self.client.post('/api/search', json={"groupSize": 2, "film": "A"}).json
+            self.assertEqual(search["showingsSearched"], 8)
+            self.assertLessEqual(set(seating._states), opened | {"default"})
+
+            # A closed showing reopens with its bookings
+            self.assertEqual(self.client.get('/api/stats?showing=s0').json["bookedSeats"], 1)
+        finally:
+            seating.MAX_OPEN_SHOWINGS = original_limit
+
+    def test_showings_in_use_are_not_closed(self):
+        """Test that a showing used by a request in progress stays open"""
+        from src.main import app
+        seating = self.seating
+        original_limit = seating.MAX_OPEN_SHOWINGS
+        seating.MAX_OPEN_SHOWINGS = 1
+        try:
+            self.client.post('/api/showings', json={"id": "other"})
+            with app.test_request_context():
+                state = seating.get_showing_state()
+                self.assertIsNotNone(seating.get_showing_state("other"))
+                self.assertIs(seating._states.get("default"), state)
+            self.assertIsNotNone(seating.get_showing_state("other"))
+            self.assertNotIn("default", seating._states)
+        finally:
+            seating.MAX_OPEN_SHOWINGS = original_limit
+
+    def test_unknown_showing(self):
+        """Test that requests for unknown showings return 404"""
+        self.assertEqual(self.client.get('/api/seats?showing=nope').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
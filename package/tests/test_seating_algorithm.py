@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 # Import the seating module
 from routes.seating import find_best_seats_for_group, find_consecutive_available_seats
 from models.seating import SeatingModel
+from models.layout import compile_layout
 
 class TestSeatingAlgorithm(unittest.TestCase):
     """Test suite for the cinema seating algorithm"""
@@ -32,36 +33,7 @@ class TestSeatingAlgorithm(unittest.TestCase):
         }
         
         # Create an empty theater with all seats available
-        self.seats = []
-        for i in range(self.config["rows"]):
-            row = []
-            for j in range(self.config["columns"]):
-                # Determine seat type
-                seat_type = 'normal'
-                
-                # Check if VIP
-                if i in self.config["vipRows"] and j in self.config["vipColumns"]:
-                    seat_type = 'vip'
-                
-                # Check if accessible
-                is_accessible = any(seat["row"] == i and seat["col"] == j for seat in self.config["accessibleSeats"])
-                if is_accessible:
-                    seat_type = 'accessible'
-                
-                # Check if discount
-                is_discount = i in self.config["discountRows"]
-                
-                # Create seat object
-                row.append({
-                    "id": f"{self.config['rowLabels'][i]}{j + 1}",
-                    "row": i,
-                    "col": j,
-                    "type": seat_type,
-                    "status": "available",
-                    "isDiscount": is_discount,
-                    "price": SeatingModel.calculate_price(seat_type, is_discount)
-                })
-            self.seats.append(row)
+        self.seats = compile_layout(self.config).build_seats()
 
     def test_find_best_seats_for_small_group(self):
         """Test finding best seats for a small group (2 people)"""
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+from flask import Flask
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.shard_router import ShardRouter, create_router_blueprint, shard_for
+
+class TestShardRouter(unittest.TestCase):
+    """Test suite for forwarding API requests to shard worker processes"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start two workers on a temporary data directory behind a router app"""
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.router = ShardRouter(2, data_dir=cls.tmp.name)
+        app = Flask(__name__)
+        app.register_blueprint(create_router_blueprint(cls.router), url_prefix='/api')
+        cls.client = app.test_client()
+
+        # Two showing ids owned by different workers
+        ids = [f"show-{i}" for i in range(10)]
+        cls.showings = [next(i for i in ids if shard_for(i, 2) == shard) for shard in range(2)]
+        for showing_id in cls.showings:
+            response = cls.client.post('/api/showings', json={"id": showing_id, "film": "Test"})
+            assert response.status_code == 201, response.get_data()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.router.close()
+        cls.tmp.cleanup()
+
+    def test_listing_merges_every_shard(self):
+        """Test that GET /api/showings lists each showing once across workers"""
+        ids = [showing["id"] for showing in self.client.get('/api/showings').get_json()]
+        self.assertEqual(ids, sorted(set(ids)))
+        for showing_id in self.showings + ["default"]:
+            self.assertIn(showing_id, ids)
+
+    def test_bookings_are_applied_by_the_owning_worker(self):
+        """Test that bookings and conflicts go through each showing's worker"""
+        for showing_id in self.showings:
+            booking = [{"row": 7, "col": 5, "status": "booked"}]
+            first = self.client.post(f'/api/seats?showing={showing_id}', json=booking)
+            second = self.client.post(f'/api/seats?showing={showing_id}', json=booking)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(second.status_code, 409)
+
+            seats = self.client.get(f'/api/seats?showing={showing_id}').get_json()
+            self.assertEqual(seats[7][5]["status"], "booked")
+            self.assertTrue(self.client.post(f'/api/reset?showing={showing_id}').get_json()["success"])
+
+    def test_import_and_export_span_every_shard(self):
+        """Test that a bulk import reaches each owner and the export streams from the router"""
+        body = ''.join(f'{{"showing": "{showing_id}", "row": 14, "col": 0}}\n' for showing_id in self.showings)
+        summary = self.client.post('/api/bookings/import', data=body).get_json()
+        self.assertEqual(summary["imported"], 2)
+        self.assertEqual(summary["showings"], sorted(self.showings))
+
+        response = self.client.get('/api/bookings/export')
+        self.assertTrue(response.is_streamed)
+        exported = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        for showing_id in self.showings:
+            self.assertIn((showing_id, "booked", 14, 0),
+                          [(event["showing"], event["event"], event["row"], event["col"]) for event in exported])
+            self.assertTrue(self.client.post(f'/api/reset?showing={showing_id}').get_json()["success"])
+
+    def test_search_merges_every_shard(self):
+        """Test that POST /api/search ranks showings owned by different workers"""
+        response = self.client.post('/api/search', json={"groupSize": 2, "film": "Test"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(result["showing"] for result in response.get_json()["results"]),
+                         sorted(self.showings))
+
+    def test_dead_worker_is_reported_as_unavailable(self):
+        """Test that the merged listing answers 502 when a worker has died"""
+        with tempfile.TemporaryDirectory() as tmp:
+            router = ShardRouter(2, data_dir=tmp)
+            try:
+                app = Flask(__name__)
+                app.register_blueprint(create_router_blueprint(router), url_prefix='/api')
+                client = app.test_client()
+                self.assertEqual(client.get('/api/showings').status_code, 200)
+
+                router.processes[1].terminate()
+                router.processes[1].join(timeout=5)
+                response = client.get('/api/showings')
+                self.assertEqual(response.status_code, 502)
+                self.assertIn("Shard worker 1 is unavailable", response.get_json()["error"])
+            finally:
+                router.close()
+
+    def test_unknown_showing_is_not_found(self):
+        """Test that worker error responses are relayed unchanged"""
+        response = self.client.get('/api/seats?showing=missing')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("Unknown showing", response.get_json()["error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, SEAT_TYPES, compile_layout
+from src.models.seat_state import AVAILABLE, BOOKED, SeatStateFile
+from src.models.showing_search import best_windows, search_showings
+
+class TestShowingSearch(unittest.TestCase):
+    """Test suite for the vectorized cross-showing seat search"""
+
+    def setUp(self):
+        """Create state files for a few showings of the default hall"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        self.states = []
+
+    def tearDown(self):
+        for _, state in self.states:
+            state.close()
+        self.tmp.cleanup()
+
+    def showing(self, showing_id, booked=(), meta=None, layout=None):
+        layout = layout or self.layout
+        statuses = bytearray(layout.size)
+        for row, col in booked:
+            statuses[layout.index(row, col)] = BOOKED
+        state = SeatStateFile.create(os.path.join(self.tmp.name, f"{showing_id}.seats"), layout, statuses, meta)
+        self.states.append((showing_id, state))
+        return state
+
+    def best_window(self, statuses, group_size, seat_type):
+        """Brute-force best window: row distance from the middle, then centre distance, then seat order"""
+        layout = self.layout
+        candidates = []
+        for row in range(layout.rows):
+            for start, end in layout.segments:
+                for col in range(start, end - group_size + 1):
+                    index = layout.index(row, col)
+                    seats = range(index, index + group_size)
+                    if all(statuses[i] == AVAILABLE for i in seats) and \
+                            (seat_type == 'any' or all(layout.type_codes[i] == SEAT_TYPES.index(seat_type) for i in seats)):
+                        candidates.append((abs(layout.rows // 2 - row),
+                                           abs(2 * col + group_size - 1 - 2 * (layout.columns // 2)), index))
+        return min(candidates)[2] if candidates else None
+
+    def test_matches_the_window_score(self):
+        """Test that the vectorized search picks the best window by its static score"""
+        rng = random.Random(7)
+        stacked = []
+        for _ in range(20):
+            statuses = bytes(BOOKED if rng.random() < 0.8 else AVAILABLE for _ in range(self.layout.size))
+            stacked.append(statuses)
+        array = np.frombuffer(b''.join(stacked), dtype=np.uint8).reshape(20, self.layout.rows, self.layout.columns)
+
+        for group_size in (1, 2, 3):
+            for seat_type in ('any', 'vip'):
+                _, first_seats = best_windows(self.layout, array, group_size, seat_type)
+                for statuses, first in zip(stacked, first_seats.tolist()):
+                    expected = self.best_window(statuses, group_size, seat_type)
+                    if expected is not None:
+                        self.assertEqual(first, expected)
+
+    def test_ranks_by_seat_quality_then_start_time(self):
+        """Test that better seats win and equal seats go to the earlier showing"""
+        middle = [(7, c) for c in range(self.layout.columns)]
+        self.showing("late", meta={"film": "A", "startsAt": "2026-10-18T21:00"})
+        self.showing("early", meta={"film": "A", "startsAt": "2026-10-18T18:00"})
+        self.showing("full-middle", booked=middle, meta={"film": "A", "startsAt": "2026-10-18T17:00"})
+
+        results = search_showings(self.states, 4)
+        self.assertEqual([result["showing"] for result in results], ["early", "late", "full-middle"])
+        self.assertEqual([(s["row"], s["col"]) for s in results[0]["seats"]], [(7, 6), (7, 7), (7, 8), (7, 9)])
+        self.assertEqual(results[2]["rowDistance"], 1)
+
+    def test_blocks_never_span_the_aisle_and_full_showings_are_dropped(self):
+        """Test aisle handling and showings without a block"""
+        everything = [(r, c) for r in range(self.layout.rows) for c in range(self.layout.columns)]
+        self.showing("aisle", booked=[seat for seat in everything if seat not in ((7, 4), (7, 5), (7, 6), (7, 7))])
+        self.showing("full", booked=everything)
+
+        results = search_showings(self.states, 3)
+        self.assertEqual(results, [])
+        results = search_showings(self.states, 2)
+        self.assertEqual([result["showing"] for result in results], ["aisle"])
+
+    def test_seat_type_falls_back_and_ranks_last(self):
+        """Test that showings without the requested type rank after typed matches"""
+        vip_rows = [(r, c) for r in (9, 10, 11) for c in range(self.layout.columns)]
+        self.showing("no-vip", booked=vip_rows)
+        self.showing("vip")
+
+        results = search_showings(self.states, 2, "vip")
+        self.assertEqual([result["showing"] for result in results], ["vip", "no-vip"])
+        self.assertTrue(results[0]["typeMatched"])
+        self.assertFalse(results[1]["typeMatched"])
+        self.assertTrue(all(seat["type"] == "vip" for seat in results[0]["seats"]))
+
+    def test_mixed_layouts(self):
+        """Test that showings of different halls are searched together"""
+        small = compile_layout({**DEFAULT_CONFIG, "rows": 5, "columns": 8, "aisleAfterColumn": 3}, DEFAULT_PRICING)
+        self.showing("small", layout=small)
+        self.showing("large")
+
+        results = search_showings(self.states, 5)
+        self.assertEqual([result["showing"] for result in results], ["large"])
+        self.assertEqual(len(search_showings(self.states, 2)), 2)
+
+    def test_search_endpoint(self):
+        """Test POST /api/search filtering and validation"""
+        from src.main import app
+        from src.routes import seating
+        client = app.test_client()
+
+        original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        try:
+            for showing_id, film, starts_at in (("a1", "Arrival", "2026-10-18T18:00"),
+                                                ("a2", "Arrival", "2026-10-18T21:00"),
+                                                ("b1", "Brazil", "2026-10-18T19:00")):
+                client.post('/api/showings', json={"id": showing_id, "film": film, "startsAt": starts_at})
+            client.post('/api/seats?showing=a1', json=[{"row": 7, "col": c, "status": "booked"}
+                                                         for c in range(12)])
+
+            response = client.post('/api/search', json={"groupSize": 3, "film": "arrival",
+                                                         "from": "2026-10-18T17:00", "to": "2026-10-18T23:00"})
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertEqual(body["showingsSearched"], 2)
+            self.assertEqual([result["showing"] for result in body["results"]], ["a2", "a1"])
+
+            self.assertEqual(client.post('/api/search', json={"groupSize": 0}).status_code, 400)
+            self.assertEqual(client.post('/api/search', json={"groupSize": 2, "from": "tonight"}).status_code, 400)
+        finally:
+            seating.configure_storage(original_data_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.models.layout import DEFAULT_CONFIG, DEFAULT_PRICING, compile_layout, hall_config
+from src.simulator import Showing, arrivals, simulate, simulate_showing, stranded_seats
+
+class TestSimulator(unittest.TestCase):
+    """Test suite for the allocation policy simulator"""
+
+    def test_showings_are_reproducible_per_seed(self):
+        """Test that a seed fixes the arrival stream and therefore the outcome"""
+        self.assertEqual(arrivals(7, 180), arrivals(7, 180))
+        self.assertNotEqual(arrivals(7, 180), arrivals(8, 180))
+
+        first = simulate_showing('basic', DEFAULT_CONFIG, DEFAULT_PRICING, 7)
+        second = simulate_showing('basic', DEFAULT_CONFIG, DEFAULT_PRICING, 7)
+        first.pop("searchSeconds"), second.pop("searchSeconds")
+        self.assertEqual(first, second)
+
+    def test_showing_metrics_are_consistent(self):
+        """Test that every arriving group is either seated or turned away and revenue matches the seats"""
+        result = simulate_showing('windows', DEFAULT_CONFIG, DEFAULT_PRICING, 3)
+        self.assertEqual(result["seatedGroups"] + result["turnedAway"], result["groups"])
+        self.assertAlmostEqual(result["occupancyRate"], result["bookedSeats"] / 180 * 100, places=1)
+        self.assertGreaterEqual(result["revenue"], result["bookedSeats"] * DEFAULT_PRICING["discount"])
+
+    def test_stranded_and_gap_rules(self):
+        """Test that stranded seats stop at the aisle and the gap rule only flags new gaps"""
+        layout = compile_layout(DEFAULT_CONFIG, DEFAULT_PRICING)
+        showing = Showing(layout)
+        showing.book([{"row": 0, "col": 1}, {"row": 0, "col": 4}])
+        # A1 (against the wall) and F1 (against the aisle) are stranded
+        self.assertEqual(stranded_seats(layout, showing.statuses), 2)
+        self.assertTrue(showing.leaves_gap([{"row": 0, "col": 3}]))
+        self.assertFalse(showing.leaves_gap([{"row": 0, "col": 2}, {"row": 0, "col": 3}]))
+
+    def test_heap_policy_matches_the_deployed_search(self):
+        """Test that the heap policy seats groups exactly like the basic search it stands in for"""
+        heap = simulate_showing('heap', DEFAULT_CONFIG, DEFAULT_PRICING, 5)
+        basic = simulate_showing('basic', DEFAULT_CONFIG, DEFAULT_PRICING, 5)
+        heap.pop("searchSeconds"), basic.pop("searchSeconds")
+        heap.pop("policy"), basic.pop("policy")
+        self.assertEqual(heap, basic)
+
+    def test_policies_are_compared_across_worker_processes(self):
+        """Test that a pooled run reports every policy over the same showings"""
+        report = simulate(['basic', 'basic-nogap'], showings=4, config=hall_config(6, 8), workers=2)
+        self.assertEqual(report["hall"], "6x8")
+        self.assertEqual(set(report["policies"]), {'basic', 'basic-nogap'})
+        for summary in report["policies"].values():
+            self.assertEqual(summary["showings"], 4)
+            self.assertLessEqual(summary["occupancyPercentiles"]["p5"], summary["occupancyPercentiles"]["p95"])
+            self.assertGreater(summary["allocationsPerSecond"], 0)
+
+        inline = simulate(['basic'], showings=4, config=hall_config(6, 8), workers=1)
+        self.assertEqual(inline["policies"]["basic"]["occupancyRate"], report["policies"]["basic"]["occupancyRate"])
+
+        with self.assertRaises(ValueError):
+            simulate(['first-come'], showings=1, workers=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+# Seconds from starting the import of src.main to the first /api/seats response
+# in a fresh interpreter (typically well under a second; importing SQLAlchemy
+# for the user endpoints is most of it)
+STARTUP_BUDGET = 2.0
+
+STARTUP_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from src.main import app
+imported = time.perf_counter()
+data_dir_after_import = os.path.exists(os.environ['SEATING_DATA_DIR'])
+response = app.test_client().get('/api/seats')
+print(json.dumps({
+    "importSeconds": imported - started,
+    "firstResponseSeconds": time.perf_counter() - started,
+    "status": response.status_code,
+    "rows": len(response.get_json()),
+    "dataDirAfterImport": data_dir_after_import
+}))
+"""
+
+class TestStartup(unittest.TestCase):
+    """Test suite for cold start time and lazy storage initialization"""
+
+    def start(self, data_dir):
+        env = dict(os.environ, SEATING_DATA_DIR=data_dir, SEATING_JOURNAL_FSYNC='0')
+        output = subprocess.check_output([sys.executable, '-c', STARTUP_SCRIPT, PACKAGE_DIR], env=env, timeout=60)
+        return json.loads(output.decode().strip().splitlines()[-1])
+
+    def test_import_to_first_response_within_budget(self):
+        """Test that a fresh worker answers its first request within the startup budget"""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            cold = self.start(data_dir)
+            # A second start finds the prebuilt binary state of the default showing
+            warm = self.start(data_dir)
+
+        for result in (cold, warm):
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["rows"], 15)
+            self.assertLess(result["firstResponseSeconds"], STARTUP_BUDGET,
+                            f"Startup took {result['firstResponseSeconds']:.3f}s")
+
+    def test_import_writes_nothing(self):
+        """Test that importing the app does not create the data directory"""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            result = self.start(data_dir)
+            self.assertFalse(result["dataDirAfterImport"])
+            self.assertTrue(os.path.exists(os.path.join(data_dir, 'showings', 'default.seats')))
+
+if __name__ == '__main__':
+    unittest.main()
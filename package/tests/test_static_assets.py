@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+
+from flask import Flask, request
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src import static_assets
+
+class TestStaticAssets(unittest.TestCase):
+    """Test suite for the fingerprinted, precompressed static asset pipeline"""
+
+    def setUp(self):
+        """Build a copy of src/static and serve it from memory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, 'static')
+        shutil.copytree(static_assets.STATIC_DIR, self.static_dir,
+                        ignore=shutil.ignore_patterns(static_assets.DIST_NAME))
+        self.manifest = static_assets.build(self.static_dir)
+        assets = static_assets.load_assets(self.static_dir)
+
+        app = Flask(__name__)
+
+        @app.route('/', defaults={'path': ''})
+        @app.route('/<path:path>')
+        def serve(path):
+            return assets.response(path, request)
+
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_fingerprints_and_rewrites_references(self):
+        """Test that CSS/JS get hashed names and index.html points at them"""
+        script = self.manifest["assets"]["js/seating.js"]["path"]
+        self.assertRegex(script, r'^dist/js/seating\.[0-9a-f]{12}\.js$')
+        index = self.client.get('/').get_data(as_text=True)
+        self.assertIn(f'src="{script}"', index)
+        self.assertNotIn('src="js/seating.js"', index)
+
+    def test_fingerprinted_assets_are_immutable_and_precompressed(self):
+        """Test cache headers and gzip negotiation for hashed assets"""
+        path = self.manifest["assets"]["css/styles.css"]["path"]
+        plain = self.client.get(f'/{path}')
+        compressed = self.client.get(f'/{path}', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertIn('immutable', plain.headers['Cache-Control'])
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.get_data()), plain.get_data())
+        self.assertEqual(compressed.headers['Vary'], 'Accept-Encoding')
+
+    def test_conditional_requests(self):
+        """Test that a matching If-None-Match gets an empty 304"""
+        first = self.client.get('/index.html')
+        self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+        second = self.client.get('/index.html', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.get_data(), b'')
+
+    def test_etags_are_per_encoding(self):
+        """Test that gzip and identity variants validate with different ETags"""
+        plain = self.client.get('/index.html')
+        compressed = self.client.get('/index.html', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotEqual(plain.headers['ETag'], compressed.headers['ETag'])
+        self.assertEqual(compressed.headers['Vary'], 'Accept-Encoding')
+
+        # A cached identity body must not validate a gzip request, and vice versa
+        cross = self.client.get('/index.html', headers={'Accept-Encoding': 'gzip',
+                                                        'If-None-Match': plain.headers['ETag']})
+        self.assertEqual(cross.status_code, 200)
+        same = self.client.get('/index.html', headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': compressed.headers['ETag']})
+        self.assertEqual(same.status_code, 304)
+
+    def test_sources_newer_than_the_build_are_served_directly(self):
+        """Test that editing a source file without rebuilding disables the stale build"""
+        self.assertEqual(static_assets.stale_sources(self.static_dir), [])
+        source = os.path.join(self.static_dir, 'js', 'seating.js')
+        built_at = os.path.getmtime(os.path.join(self.static_dir, static_assets.DIST_NAME,
+                                                 static_assets.MANIFEST_NAME))
+        os.utime(source, (built_at + 10, built_at + 10))
+
+        self.assertEqual(static_assets.stale_sources(self.static_dir), ['js/seating.js'])
+        self.assertIsNone(static_assets.load_assets(self.static_dir))
+
+    def test_unknown_paths_get_index(self):
+        """Test the client-side routing fallback"""
+        response = self.client.get('/showings/tonight')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('<title>Cinema Seating System</title>', response.get_data(as_text=True))
+
+    def test_minifiers(self):
+        """Test that minification only drops comments and whitespace"""
+        self.assertEqual(static_assets.minify_css("/* c */ .a  {\n  color : red;\n}\n"), ".a{color:red}")
+        js = "// header\nfunction f() {\n    /* block\n       comment */\n    return 'a // b';\n}\n"
+        self.assertEqual(static_assets.minify_js(js), "function f() {\nreturn 'a // b';\n}\n")
+
+if __name__ == '__main__':
+    unittest.main()
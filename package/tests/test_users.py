@@ -0,0 +1,144 @@
+import unittest
+import sys
+import os
+import tempfile
+
+from sqlalchemy import event
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+class TestUserBookings(unittest.TestCase):
+    """Test suite for users, their booking history and keyset pagination"""
+
+    def setUp(self):
+        """Build an app on a temporary data directory and database"""
+        from src.main import create_app
+        from src.routes import seating
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_data_dir = seating.DATA_DIR
+        seating.configure_storage(self.tmp.name)
+        os.environ['SEATING_DATABASE_URL'] = f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}"
+        try:
+            self.app = create_app()
+        finally:
+            del os.environ['SEATING_DATABASE_URL']
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        from src.models.user import db
+        from src.routes import seating
+
+        with self.app.app_context():
+            db.engine.dispose()
+        seating.configure_storage(self.original_data_dir)
+        self.tmp.cleanup()
+
+    def create_user(self, name):
+        response = self.client.post('/api/users', json={"username": name, "email": f"{name}@example.com"})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()["id"]
+
+    def book(self, user_id, *seats, showing="default", key=None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return self.client.post(f'/api/seats?showing={showing}&user={user_id}', headers=headers,
+                                json=[{"row": row, "col": col, "status": "booked"} for row, col in seats])
+
+    def test_users_are_keyset_paginated(self):
+        """Test that listing users pages by id with a next cursor"""
+        ids = [self.create_user(f"user{i}") for i in range(5)]
+        first = self.client.get('/api/users?limit=2').get_json()
+        self.assertEqual([user["id"] for user in first["users"]], ids[:2])
+
+        seen = [user["id"] for user in first["users"]]
+        cursor = first["nextCursor"]
+        while cursor is not None:
+            page = self.client.get(f'/api/users?limit=2&after={cursor}').get_json()
+            seen.extend(user["id"] for user in page["users"])
+            cursor = page["nextCursor"]
+        self.assertEqual(seen, ids)
+
+    def test_bookings_are_recorded_for_the_user(self):
+        """Test that ?user= ties a booking to a user and retries record it once"""
+        user_id = self.create_user("alice")
+        response = self.book(user_id, (7, 5), (7, 6), key="checkout-1")
+        self.assertEqual(response.status_code, 200)
+        booking_id = response.get_json()["bookingId"]
+        retry = self.book(user_id, (7, 5), (7, 6), key="checkout-1")
+        self.assertEqual(retry.get_json()["bookingId"], booking_id)
+
+        history = self.client.get(f'/api/users/{user_id}/bookings').get_json()
+        self.assertEqual(len(history["bookings"]), 1)
+        self.assertEqual([seat["id"] for seat in history["bookings"][0]["seats"]], ["H6", "H7"])
+        self.assertEqual(self.book(999, (0, 0)).status_code, 404)
+
+    def test_history_pages_newest_first_without_n_plus_one(self):
+        """Test booking history pagination and that seats load in one query per page"""
+        user_id = self.create_user("bob")
+        for col in range(6):
+            self.assertEqual(self.book(user_id, (2, col), (3, col)).status_code, 200)
+
+        from src.models.user import db
+        with self.app.app_context():
+            engine = db.engine
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            page = self.client.get(f'/api/users/{user_id}/bookings?limit=4').get_json()
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+
+        self.assertEqual(len(page["bookings"]), 4)
+        self.assertEqual([booking["seats"][0]["col"] for booking in page["bookings"]], [5, 4, 3, 2])
+        # User lookup, bookings page and one bulk load of their seats
+        self.assertEqual(len(statements), 3, statements)
+
+        rest = self.client.get(f'/api/users/{user_id}/bookings?limit=4&before={page["nextCursor"]}').get_json()
+        self.assertEqual([booking["seats"][0]["col"] for booking in rest["bookings"]], [1, 0])
+        self.assertIsNone(rest["nextCursor"])
+
+    def test_bookings_by_showing(self):
+        """Test listing and filtering bookings by showing"""
+        user_id = self.create_user("carol")
+        self.client.post('/api/showings', json={"id": "late"})
+        self.book(user_id, (1, 1))
+        self.book(user_id, (1, 1), showing="late")
+
+        late = self.client.get('/api/bookings?showing=late').get_json()["bookings"]
+        self.assertEqual([booking["showing"] for booking in late], ["late"])
+        filtered = self.client.get(f'/api/users/{user_id}/bookings?showing=default').get_json()["bookings"]
+        self.assertEqual([booking["showing"] for booking in filtered], ["default"])
+
+    def test_malformed_page_params_are_rejected(self):
+        """Test that a bad limit or cursor is a 400 rather than a silent default"""
+        user_id = self.create_user("dave")
+        for query in ('limit=0', 'limit=201', 'limit=ten', 'after=x'):
+            response = self.client.get(f'/api/users?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+        self.assertEqual(self.client.get(f'/api/users/{user_id}/bookings?limit=-1').status_code, 400)
+        self.assertEqual(self.client.get('/api/bookings?showing=default&before=1.5').status_code, 400)
+        self.assertEqual(self.client.get('/api/users?limit=200').status_code, 200)
+
+    def test_concurrent_retry_returns_the_recorded_booking(self):
+        """Test that losing the idempotency-key race returns the other request's booking"""
+        from unittest import mock
+        from src.routes import user as user_routes
+
+        user_id = self.create_user("erin")
+        seats = [{"row": 0, "col": 0, "id": "A1"}]
+        with self.app.app_context():
+            first = user_routes.record_booking(user_id, "default", seats, 2, "checkout-9")
+            # The second retry looked before the first committed
+            lookups = [None]
+            original = user_routes.keyed_booking
+            with mock.patch.object(user_routes, 'keyed_booking',
+                                   side_effect=lambda *args: lookups.pop() if lookups else original(*args)):
+                second = user_routes.record_booking(user_id, "default", seats, 2, "checkout-9")
+            self.assertEqual(second.id, first.id)
+            self.assertEqual(user_routes.Booking.query.filter_by(user_id=user_id).count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()